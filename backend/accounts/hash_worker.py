@@ -0,0 +1,23 @@
+# backend/accounts/hash_worker.py
+"""
+hash_worker.py — Entry points for provisioning's hashing processes.
+
+The pool in provisioning.py uses "spawn", so each worker unpickles these
+functions by importing this module in a blank interpreter.  It must
+therefore import nothing that needs the app registry (models, anything that
+imports models) at module level: init() runs django.setup() first.
+"""
+
+import os
+
+
+def init() -> None:
+    """Pool initializer: configure Django in the fresh interpreter."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    django.setup()
+
+
+def hash_password(raw: str) -> str:
+    from django.contrib.auth.hashers import make_password
+    return make_password(raw)
@@ -0,0 +1,123 @@
+# backend/accounts/hashing.py
+"""
+hashing.py — Bounded thread pool for password hashing in async auth views.
+
+PBKDF2 is deliberately slow (tens of ms per check).  Run inline in an async
+view it blocks the event loop — and with it every WebSocket on the worker —
+and run through sync_to_async it serialises behind the single thread that
+also carries every ORM call.  When a whole class logs in at once, logins
+queued behind each other either way.
+
+Hashing therefore runs on its own pool of AUTH_HASH_WORKERS threads
+(hashlib releases the GIL, so they really run in parallel).  At most
+AUTH_HASH_QUEUE calls may wait for a thread; beyond that HashingBusy is
+raised and the view answers 503 instead of piling up unbounded work.
+
+Logins go through django.contrib.auth.authenticate() on this pool
+(authenticate()), so AUTHENTICATION_BACKENDS, hash upgrades and the
+user_login_failed signal behave exactly as in a sync view.
+
+Hash time, queue depth and end-to-end login latency are reported through
+reactions/metrics.py under "auth".
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections
+
+from reactions import metrics
+
+log = logging.getLogger(__name__)
+
+_HASH_ALPHA = 0.2     # EWMA weight for per-call hash time
+
+_executor = None
+_waiting  = 0
+_stats    = {"hashed": 0, "rejected": 0, "hash_ms": 0.0}
+_logins   = deque(maxlen=200)    # recent login latencies, seconds
+
+
+class HashingBusy(Exception):
+    """More than AUTH_HASH_QUEUE hashing calls are already waiting."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS,
+                                       thread_name_prefix="auth-hash")
+    return _executor
+
+
+async def _run(fn, *args):
+    global _waiting
+    if _waiting >= settings.AUTH_HASH_WORKERS + settings.AUTH_HASH_QUEUE:
+        _stats["rejected"] += 1
+        log.warning("[AUTH] hashing queue full (%d waiting) — rejecting", _waiting)
+        raise HashingBusy()
+    _waiting += 1
+    t0 = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _waiting -= 1
+        _stats["hashed"] += 1
+        _stats["hash_ms"] = ((1 - _HASH_ALPHA) * _stats["hash_ms"]
+                             + _HASH_ALPHA * (time.perf_counter() - t0) * 1000)
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+async def hash_password(raw: str) -> str:
+    return await _run(make_password, raw)
+
+
+def _authenticate(request, username: str, password: str):
+    try:
+        return auth.authenticate(request, username=username, password=password)
+    finally:
+        # Pool threads outlive the request; honour CONN_MAX_AGE for their
+        # database connections as the request/response cycle would.
+        close_old_connections()
+
+
+async def authenticate(request, username: str, password: str):
+    """
+    django.contrib.auth.authenticate() on the hashing pool: the user (with
+    .backend set, ready for login()) or None.
+    """
+    return await _run(_authenticate, request, username, password)
+
+
+def record_login(seconds: float) -> None:
+    _logins.append(seconds)
+    metrics.maybe_publish()
+
+
+def _percentile(ordered, pct):
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000, 1)
+
+
+def snapshot() -> dict:
+    ordered = sorted(_logins)
+    return {
+        "workers":        settings.AUTH_HASH_WORKERS,
+        "waiting":        _waiting,
+        "hashed":         _stats["hashed"],
+        "rejected":       _stats["rejected"],
+        "hash_ms":        round(_stats["hash_ms"], 1),
+        "logins":         len(ordered),
+        "login_p50_ms":   _percentile(ordered, 50) if ordered else 0.0,
+        "login_p95_ms":   _percentile(ordered, 95) if ordered else 0.0,
+        "login_max_ms":   round(ordered[-1] * 1000, 1) if ordered else 0.0,
+    }
+
+
+metrics.register("auth", snapshot)
@@ -0,0 +1,83 @@
+# backend/accounts/management/commands/bench_login.py
+"""
+Measure login latency when a whole class logs in at once.
+
+    python manage.py bench_login --burst 40
+
+Creates a throw-away user, fires --burst concurrent POSTs at the login view
+through Django's ASGI handler (sessions, middleware and all), and reports
+per-login latency percentiles and throughput.  The user is deleted again
+afterwards.  Run it against the settings you deploy with — e.g. REDIS_URL
+set for the cached_db session engine, AUTH_HASH_WORKERS as in production.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+from accounts import hashing
+
+_PASSWORD = "bench-login-Pa55word!"
+
+
+async def _login(username: str) -> tuple[float, int]:
+    client = AsyncClient()
+    t0 = time.perf_counter()
+    response = await client.post(
+        "/api/accounts/login/",
+        data=json.dumps({"username": username, "password": _PASSWORD}),
+        content_type="application/json",
+    )
+    return time.perf_counter() - t0, response.status_code
+
+
+async def _burst(username: str, count: int) -> tuple[list, float]:
+    start   = time.perf_counter()
+    results = await asyncio.gather(*(_login(username) for _ in range(count)))
+    return results, time.perf_counter() - start
+
+
+def _pct(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+class Command(BaseCommand):
+    help = "Benchmark login latency under a burst of concurrent logins."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--burst", type=int, default=40, help="Concurrent logins per round.")
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **opts):
+        username = f"bench-login-{os.getpid()}"
+        User.objects.create_user(username=username, password=_PASSWORD)
+        try:
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                for i in range(opts["rounds"]):
+                    results, wall = asyncio.run(_burst(username, opts["burst"]))
+                    self._report(i + 1, results, wall)
+        finally:
+            User.objects.filter(username=username).delete()
+
+        s = hashing.snapshot()
+        self.stdout.write(
+            f"hash pool: workers={s['workers']} hashed={s['hashed']} "
+            f"rejected={s['rejected']} hash≈{s['hash_ms']}ms"
+        )
+
+    def _report(self, round_no, results, wall):
+        ok      = sorted(t for t, status in results if status == 200)
+        failed  = len(results) - len(ok)
+        if not ok:
+            self.stdout.write(f"round {round_no}: all {failed} logins failed")
+            return
+        self.stdout.write(
+            f"round {round_no}: ok={len(ok):<4} failed={failed:<4} "
+            f"wall={wall * 1000:.0f}ms  logins/s={len(ok) / wall:.1f}  "
+            f"p50={_pct(ok, 50):.0f}ms  p95={_pct(ok, 95):.0f}ms  max={ok[-1] * 1000:.0f}ms"
+        )
@@ -0,0 +1,61 @@
+# backend/accounts/management/commands/provision_students.py
+"""
+Create student accounts from a roster file.
+
+    python manage.py provision_students roster.csv --output passwords.csv
+
+The roster is CSV with a header row (username, optional email, optional
+password) or JSON — a list of {"username", "email", "password"} objects.
+Students without a password get a generated one; --output writes every row's
+result, including generated passwords, as CSV to hand out.  See
+accounts/provisioning.py.
+"""
+
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import RosterError, parse_roster, provision
+
+
+class Command(BaseCommand):
+    help = "Bulk-create student accounts from a CSV or JSON roster."
+
+    def add_arguments(self, parser):
+        parser.add_argument("roster", help="Roster file, or - for stdin.")
+        parser.add_argument("--format", choices=("auto", "csv", "json"), default="auto")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Hashing processes (default AUTH_PROVISION_WORKERS).")
+        parser.add_argument("--output", default=None, help="Write per-row results as CSV.")
+
+    def handle(self, *args, **opts):
+        try:
+            if opts["roster"] == "-":
+                text = sys.stdin.read()
+            else:
+                with open(opts["roster"], encoding="utf-8-sig") as f:
+                    text = f.read()
+            rows = parse_roster(text, opts["format"])
+        except (OSError, RosterError) as exc:
+            raise CommandError(str(exc))
+        if not rows:
+            raise CommandError("Roster is empty.")
+
+        t0      = time.perf_counter()
+        results = provision(rows, workers=opts["workers"])
+        elapsed = time.perf_counter() - t0
+
+        for r in results:
+            if r["status"] != "created":
+                self.stderr.write(f"row {r['row']:<5} {r['username'] or '-':<24} {r['error']}")
+        created = sum(1 for r in results if r["status"] == "created")
+        self.stdout.write(f"{created}/{len(results)} accounts created in {elapsed:.1f}s")
+
+        if opts["output"]:
+            with open(opts["output"], "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["row", "username", "status", "password", "error"])
+                writer.writeheader()
+                writer.writerows(results)
+            self.stdout.write(f"results written to {opts['output']}")
@@ -0,0 +1,236 @@
+# backend/accounts/provisioning.py
+"""
+provisioning.py — Create a whole class roster of student accounts at once.
+
+Registering students one by one costs a round trip, a uniqueness query and a
+PBKDF2 hash per student, all sequential.  provision() does a roster in bulk:
+
+  1. validate every row and find duplicates inside the roster itself
+  2. ONE query for usernames / emails that already exist
+  3. hash all passwords in parallel on a process pool (hashing is CPU-bound)
+     — one pool per process, started on first use and kept for later rosters
+  4. bulk_create() the users in batches of AUTH_PROVISION_BATCH
+
+Rows without a password get a generated one, returned in that row's result
+so the teacher can hand it out.  Every row gets a result:
+
+    {"row": 3, "username": "amara", "status": "created", "password": "…"}
+    {"row": 4, "username": "amara", "status": "error",   "error": "Duplicate username in roster."}
+
+At most AUTH_PROVISION_CONCURRENCY rosters are provisioned at once per
+process; another request meanwhile gets ProvisioningBusy (503 from the view)
+rather than a second roster competing for the same CPUs.
+
+Used by POST /api/accounts/bulk-register/ and `manage.py provision_students`.
+"""
+
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from . import hash_worker
+
+log = logging.getLogger(__name__)
+
+FIELDS = ("username", "email", "password")
+
+_pool      = None            # ProcessPoolExecutor, created by the first roster
+_pool_size = 0
+_pool_lock = threading.Lock()
+_slots     = threading.BoundedSemaphore(settings.AUTH_PROVISION_CONCURRENCY)
+
+
+class RosterError(ValueError):
+    """The roster could not be parsed at all."""
+
+
+class ProvisioningBusy(Exception):
+    """AUTH_PROVISION_CONCURRENCY rosters are already being provisioned."""
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+
+def parse_roster(text: str, fmt: str = "auto") -> list[dict]:
+    """
+    Rows from a CSV (header row with username[,email][,password]) or a JSON
+    list of objects / {"students": [...]}.  *fmt* is "csv", "json" or "auto".
+    """
+    if fmt == "auto":
+        fmt = "json" if text.lstrip()[:1] in ("[", "{") else "csv"
+    if fmt == "json":
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise RosterError(f"Invalid JSON: {exc}") from None
+        if isinstance(data, dict):
+            data = data.get("students")
+        if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+            raise RosterError("JSON roster must be a list of student objects.")
+        rows = data
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or "username" not in [f.strip().lower() for f in reader.fieldnames]:
+            raise RosterError("CSV roster needs a header row with a 'username' column.")
+        rows = [{(k or "").strip().lower(): v for k, v in r.items()} for r in reader]
+    return [{f: str(r.get(f) or "").strip() for f in FIELDS} for r in rows]
+
+
+# ── Hashing (process pool) ────────────────────────────────────────────────────
+
+def _get_pool(workers: int) -> tuple[ProcessPoolExecutor, int]:
+    # Spawning a worker means a fresh interpreter and django.setup(), so the
+    # pool is started once and reused; its size is fixed by the first call.
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None:
+            # "spawn", not fork: the caller may be an ASGI worker with live threads.
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=hash_worker.init)
+            _pool_size = workers
+        return _pool, _pool_size
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _hash_all(passwords: list[str], workers: int) -> list[str]:
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(p) for p in passwords]
+    pool, size = _get_pool(workers)
+    try:
+        return list(pool.map(hash_worker.hash_password, passwords,
+                             chunksize=max(1, len(passwords) // (size * 4))))
+    except BrokenProcessPool:
+        # A worker died — it could not start, or was killed.  Fail the roster
+        # loudly rather than quietly hash it on one core, and start a fresh
+        # pool for the next one.
+        log.exception("[PROVISION] hashing pool broke")
+        _reset_pool()
+        raise
+
+
+# ── Provisioning ──────────────────────────────────────────────────────────────
+
+def _validate(row: dict) -> str | None:
+    if not row["username"]:
+        return "Username is required."
+    if len(row["username"]) > 150:
+        return "Username is too long."
+    try:
+        User.username_validator(row["username"])
+        if row["email"]:
+            validate_email(row["email"])
+    except ValidationError as exc:
+        return exc.messages[0]
+    return None
+
+
+def _insert(users: list, results: dict) -> None:
+    for start in range(0, len(users), settings.AUTH_PROVISION_BATCH):
+        batch = users[start:start + settings.AUTH_PROVISION_BATCH]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([u for _, u in batch])
+        except IntegrityError:
+            # Someone registered one of these names since the uniqueness
+            # query — fall back to row by row so the others still go in.
+            for i, user in batch:
+                try:
+                    with transaction.atomic():
+                        user.save()
+                except IntegrityError:
+                    results[i] = {"status": "error", "error": "Username already taken."}
+                    continue
+                results[i]["status"] = "created"
+            continue
+        for i, _ in batch:
+            results[i]["status"] = "created"
+
+
+def provision(rows: list[dict], workers: int | None = None) -> list[dict]:
+    """
+    Create accounts for *rows* (see parse_roster); one result per row, in
+    order.  Raises ProvisioningBusy when too many rosters are in progress.
+    """
+    if not _slots.acquire(blocking=False):
+        raise ProvisioningBusy()
+    try:
+        return _provision(rows, workers)
+    finally:
+        _slots.release()
+
+
+def _provision(rows: list[dict], workers: int | None) -> list[dict]:
+    t0      = time.perf_counter()
+    workers = workers or settings.AUTH_PROVISION_WORKERS
+    results = {}
+    seen_u, seen_e = set(), set()
+
+    for i, row in enumerate(rows):
+        row["username"] = User.normalize_username(row["username"])
+        row["email"]    = User.objects.normalize_email(row["email"])
+        error = _validate(row)
+        if not error and row["username"] in seen_u:
+            error = "Duplicate username in roster."
+        if not error and row["email"] and row["email"] in seen_e:
+            error = "Duplicate email in roster."
+        if error:
+            results[i] = {"status": "error", "error": error}
+            continue
+        seen_u.add(row["username"])
+        if row["email"]:
+            seen_e.add(row["email"])
+        results[i] = {"status": "pending"}
+
+    # One query for every existing username / email in the roster.
+    taken_u, taken_e = set(), set()
+    if seen_u:
+        match = Q(username__in=seen_u) | Q(email__in=seen_e) if seen_e else Q(username__in=seen_u)
+        for username, email in User.objects.filter(match).values_list("username", "email"):
+            taken_u.add(username)
+            taken_e.add(email)
+
+    todo = []
+    for i, row in enumerate(rows):
+        if results[i]["status"] != "pending":
+            continue
+        if row["username"] in taken_u:
+            results[i] = {"status": "error", "error": "Username already taken."}
+        elif row["email"] and row["email"] in taken_e:
+            results[i] = {"status": "error", "error": "Email already registered."}
+        else:
+            if not row["password"]:
+                row["password"] = results[i]["password"] = secrets.token_urlsafe(9)
+            todo.append(i)
+
+    hashed = _hash_all([rows[i]["password"] for i in todo], workers)
+    t_hash = time.perf_counter()
+    _insert([(i, User(username=rows[i]["username"], email=rows[i]["email"], password=h))
+             for i, h in zip(todo, hashed)], results)
+
+    created = sum(1 for r in results.values() if r["status"] == "created")
+    log.info("[PROVISION] %d rows → %d created, %d errors  (hash %.1fs, total %.1fs, %d workers)",
+             len(rows), created, len(rows) - created, t_hash - t0,
+             time.perf_counter() - t0, workers)
+    return [{"row": i + 1, "username": rows[i]["username"], **results[i]} for i in range(len(rows))]
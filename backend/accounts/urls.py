@@ -5,5 +5,6 @@ urlpatterns = [
     path("register/", views.register_view, name="register"),
     path("login/", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
+    path("bulk-register/", views.bulk_register_view, name="bulk_register"),
     path("check-session/", views.check_session_view, name="check_session"),
 ]
\ No newline at end of file
@@ -1,42 +1,80 @@
 # accounts/views.py
 # This file is inside your `accounts` app folder. REPLACE the existing accounts/views.py with this.
+#
+# These views are async: under ASGI they no longer hold a worker thread while
+# PBKDF2 runs.  Hashing — including authenticate() — goes to the bounded pool
+# in accounts/hashing.py and ORM / session calls use Django's async ORM or
+# sync_to_async.
 
+import functools
 import json
-from django.contrib.auth.models import User
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-from django.contrib.auth import authenticate, login, logout
-
+import time
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def register_view(request):
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import login, logout
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.db.models import Q
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from .hashing import HashingBusy, authenticate, hash_password, record_login
+from .provisioning import ProvisioningBusy, RosterError, parse_roster, provision
+
+
+def _async_view(methods, csrf_exempt=False):
+    # Django 4.2's @csrf_exempt / @require_http_methods wrap views in a sync
+    # function, which would hide the coroutine from the ASGI handler.
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            try:
+                return await view(request, *args, **kwargs)
+            except HashingBusy:
+                response = JsonResponse({"error": "Server busy, please retry."}, status=503)
+                response["Retry-After"] = "1"
+                return response
+        wrapper.csrf_exempt = csrf_exempt
+        return wrapper
+    return decorator
+
+
+@_async_view(["POST"], csrf_exempt=True)
+async def register_view(request):
     try:
         data = json.loads(request.body)
-        username = data.get("username", "").strip()
-        email = data.get("email", "").strip()
+        username = User.normalize_username(data.get("username", "").strip())
+        email = User.objects.normalize_email(data.get("email", "").strip())
         password = data.get("password", "")
 
         if not username or not password:
             return JsonResponse({"error": "Username and password are required."}, status=400)
 
-        if User.objects.filter(username=username).exists():
+        # One query for both uniqueness checks.
+        match = Q(username=username) | Q(email=email) if email else Q(username=username)
+        taken = [row async for row in User.objects.filter(match).values_list("username", "email")]
+        if any(u == username for u, _ in taken):
             return JsonResponse({"error": "Username already taken."}, status=400)
-
-        if email and User.objects.filter(email=email).exists():
+        if taken:
             return JsonResponse({"error": "Email already registered."}, status=400)
 
-        user = User.objects.create_user(username=username, email=email, password=password)
+        user = User(username=username, email=email,
+                    password=await hash_password(password))
+        try:
+            await user.asave()
+        except IntegrityError:      # lost a race with a concurrent registration
+            return JsonResponse({"error": "Username already taken."}, status=400)
         return JsonResponse({"message": "Registration successful.", "username": user.username}, status=201)
 
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON."}, status=400)
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def login_view(request):
+@_async_view(["POST"], csrf_exempt=True)
+async def login_view(request):
+    started = time.perf_counter()
     try:
         data = json.loads(request.body)
         username = data.get("username", "").strip()
@@ -45,11 +83,14 @@ def login_view(request):
         if not username or not password:
             return JsonResponse({"error": "Username and password are required."}, status=400)
 
-        user = authenticate(request, username=username, password=password)
+        # The configured backends, off-loop; ModelBackend hashes for unknown
+        # usernames too, so they take as long as wrong passwords.
+        user = await authenticate(request, username, password)
         if user is None:
             return JsonResponse({"error": "Invalid credentials."}, status=401)
 
-        login(request, user)
+        await sync_to_async(login)(request, user)
+        record_login(time.perf_counter() - started)
         return JsonResponse({
             "message": "Login successful.",
             "username": user.username,
@@ -60,19 +101,65 @@ def login_view(request):
         return JsonResponse({"error": "Invalid JSON."}, status=400)
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def logout_view(request):
-    logout(request)
+@_async_view(["POST"], csrf_exempt=True)
+async def logout_view(request):
+    await sync_to_async(logout)(request)
     return JsonResponse({"message": "Logged out successfully."})
 
 
-@require_http_methods(["GET"])
-def check_session_view(request):
-    if request.user.is_authenticated:
+_ROSTER_TYPES = {"application/json": "json", "text/csv": "csv"}
+
+
+@_async_view(["POST"])
+async def bulk_register_view(request):
+    # Roster as JSON ({"students": [...]}) or CSV (text/csv); staff only.
+    # Authenticated by the staff session cookie (SameSite=None), so it is NOT
+    # CSRF-exempt — callers send the X-CSRFToken header — and only takes
+    # content types a cross-site <form> cannot send.
+    is_staff = await sync_to_async(lambda: request.user.is_staff)()
+    if not is_staff:
+        return JsonResponse({"error": "Staff login required."}, status=403)
+    fmt = _ROSTER_TYPES.get(request.content_type)
+    if fmt is None:
+        return JsonResponse({"error": "Send the roster as application/json or text/csv."},
+                            status=415)
+    try:
+        rows = parse_roster(request.body.decode("utf-8-sig"), fmt)
+    except (RosterError, UnicodeDecodeError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    if not rows:
+        return JsonResponse({"error": "Roster is empty."}, status=400)
+    if len(rows) > settings.AUTH_PROVISION_MAX_ROWS:
+        return JsonResponse({"error": f"At most {settings.AUTH_PROVISION_MAX_ROWS} students per request."},
+                            status=400)
+
+    # Off the shared sync thread: a big roster takes seconds and would stall
+    # every other request's ORM calls behind it.
+    try:
+        results = await sync_to_async(provision, thread_sensitive=False)(rows)
+    except ProvisioningBusy:
+        response = JsonResponse({"error": "Another roster is being created, please retry."},
+                                status=503)
+        response["Retry-After"] = "5"
+        return response
+    created = sum(1 for r in results if r["status"] == "created")
+    return JsonResponse({"created": created, "failed": len(results) - created, "results": results},
+                        status=201 if created else 400)
+
+
+def _session_user(request):
+    user = request.user
+    return (user.username, user.email) if user.is_authenticated else None
+
+
+@_async_view(["GET"])
+async def check_session_view(request):
+    # request.user is lazy; resolving it reads the session and the user row.
+    current = await sync_to_async(_session_user)(request)
+    if current:
         return JsonResponse({
             "is_authenticated": True,
-            "username": request.user.username,
-            "email": request.user.email,
+            "username": current[0],
+            "email": current[1],
         })
     return JsonResponse({"is_authenticated": False, "username": None, "email": None})
@@ -1,14 +1,26 @@
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+# Initialise Django (settings + app registry) before importing anything that
+# reads settings at import time, e.g. reactions.routing.
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ChannelNameRouter, ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from channels.sessions import SessionMiddlewareStack
+from django.conf import settings
 import reactions.routing
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# The CV stack is imported lazily (reactions/cv_stack.py).  Processes that
+# host lab sessions can load it at startup instead of on the first connect.
+if settings.LAB_WARMUP:
+    from reactions import cv_stack
+    cv_stack.warm_up_in_background()
 
 application = ProtocolTypeRouter({
-    'http': get_asgi_application(),
+    'http': django_asgi_app,
     'websocket': SessionMiddlewareStack(
         AuthMiddlewareStack(
             URLRouter(
@@ -16,4 +28,5 @@ application = ProtocolTypeRouter({
             )
         )
     ),
-})
\ No newline at end of file
+    'channel': ChannelNameRouter(reactions.routing.channel_routes),
+})
@@ -38,6 +38,7 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -114,6 +115,133 @@ else:
         }
     }
 
+# ── Lab frame pipeline ────────────────────────────────────────────────────────
+# When True, each LabConsumer overlaps decode / hand-tracking / encode across
+# consecutive frames (reactions/pipeline.py).  Higher fps per session on
+# multi-core boxes (e.g. the single-student kiosk) at ~1 frame extra latency.
+LAB_PIPELINED = os.getenv('LAB_PIPELINED', 'False') == 'True'
+
+# ── Fair-share frame scheduler ────────────────────────────────────────────────
+# When True, inline sessions in one process are served round-robin / weighted
+# fair-share against a global frames-per-second budget (reactions/scheduler.py)
+# instead of first-come-first-served.  Per-session fps caps step down through
+# LAB_FPS_TIERS as more sessions share the budget.
+LAB_SCHEDULER             = os.getenv('LAB_SCHEDULER', 'False') == 'True'
+LAB_FPS_BUDGET            = float(os.getenv('LAB_FPS_BUDGET', '60'))
+LAB_FPS_TIERS             = (30, 20, 15, 10, 5)
+LAB_SCHEDULER_CONCURRENCY = int(os.getenv('LAB_SCHEDULER_CONCURRENCY', str(os.cpu_count() or 1)))
+
+# ── Admission control ─────────────────────────────────────────────────────────
+# When True, a process only admits as many lab sessions as its cores can
+# render at LAB_TARGET_FPS, based on measured CPU cost per frame
+# (reactions/admission.py).  Extra clients wait in a FIFO queue of up to
+# LAB_ADMISSION_QUEUE entries; beyond that they are closed with code 4503.
+LAB_ADMISSION          = os.getenv('LAB_ADMISSION', 'False') == 'True'
+LAB_TARGET_FPS         = float(os.getenv('LAB_TARGET_FPS', '15'))   # browser uploads every 66 ms
+LAB_CPU_UTILISATION    = float(os.getenv('LAB_CPU_UTILISATION', '0.85'))
+LAB_INITIAL_FRAME_COST = 0.030   # CPU seconds per frame until measured
+LAB_ADMISSION_QUEUE    = int(os.getenv('LAB_ADMISSION_QUEUE', '20'))
+
+# ── Dedicated CV workers ──────────────────────────────────────────────────────
+# When > 0, LabConsumer does no vision work itself: frames are relayed over
+# the channel layer to N background workers (reactions/workers.py), launched
+# with `python manage.py run_cv_workers`.  Requires the Redis channel layer —
+# InMemoryChannelLayer cannot cross process boundaries.
+LAB_CV_WORKERS        = int(os.getenv('LAB_CV_WORKERS', '0'))
+LAB_CV_CHANNEL_PREFIX = 'lab-cv-'
+
+# Hand decoded frames to same-host CV workers through shared-memory ring
+# buffers (reactions/frame_transport.py) instead of JPEG bytes over Redis.
+# Falls back to bytes automatically when the worker is on another node.
+LAB_SHM_TRANSPORT = os.getenv('LAB_SHM_TRANSPORT', 'True') == 'True'
+LAB_SHM_SLOTS     = 3
+
+# ── CV stack startup ──────────────────────────────────────────────────────────
+# OpenCV / MediaPipe are imported on first use (reactions/cv_stack.py), so
+# HTTP-only workers and management commands never load them.  Set
+# LAB_WARMUP=True on processes that host lab sessions to import them and run
+# one blank frame at startup instead of on the first student's connect.
+# run_cv_workers always warms its workers up.
+LAB_WARMUP = os.getenv('LAB_WARMUP', 'False') == 'True'
+
+# ── Hand tracking ─────────────────────────────────────────────────────────────
+# Default hand-detection backend for new lab sessions
+# (opencv_modules/tracker_backends.py): "solutions" (MediaPipe Hands),
+# "tasks" (MediaPipe Tasks HandLandmarker, live-stream mode; needs
+# LAB_HAND_MODEL) or "contour" (skin-colour blob, no ML — cheapest, least
+# robust).  Sessions can switch with a "set_tracker" WebSocket message;
+# compare them on recorded footage with `manage.py bench_lab --trackers`.
+LAB_TRACKER    = os.getenv('LAB_TRACKER', 'solutions')
+LAB_HAND_MODEL = os.getenv('LAB_HAND_MODEL', str(BASE_DIR / 'models' / 'hand_landmarker.task'))
+
+# ── Reconnect snapshots ───────────────────────────────────────────────────────
+# Each lab's simulation state (liquid level, paper colour, reaction flag) is
+# written to the cache as a small binary record at most every
+# LAB_SNAPSHOT_INTERVAL seconds while it changes.  A reconnect from the same
+# browser session within LAB_RESUME_GRACE seconds continues from it
+# (reactions/resume.py); 0 disables.
+LAB_RESUME_GRACE      = int(os.getenv('LAB_RESUME_GRACE', '300'))
+LAB_SNAPSHOT_INTERVAL = float(os.getenv('LAB_SNAPSHOT_INTERVAL', '1.0'))
+
+# ── Idle sessions ─────────────────────────────────────────────────────────────
+# A lab that processes no frame for LAB_IDLE_RELEASE seconds (tab in the
+# background, camera paused) hands its hand tracker back to a pool and drops
+# its overlay buffers; the next frame takes them back (reactions/reaper.py).
+# Up to LAB_TRACKER_POOL released trackers per backend are kept for reuse.
+# LAB_IDLE_RELEASE=0 disables.
+LAB_IDLE_RELEASE = float(os.getenv('LAB_IDLE_RELEASE', '30'))
+LAB_TRACKER_POOL = int(os.getenv('LAB_TRACKER_POOL', '2'))
+
+# ── Profiling ─────────────────────────────────────────────────────────────────
+# LAB_PROFILE="sample:300" or "cprofile:300" profiles the first 300 frames of
+# every new lab session; staff can also profile one lab on demand with a
+# "profile" WebSocket message (reactions/profiling.py).  Results are written
+# to LAB_PROFILE_DIR — list them with `manage.py lab_profiles`.
+LAB_PROFILE            = os.getenv('LAB_PROFILE', '')
+LAB_PROFILE_DIR        = Path(os.getenv('LAB_PROFILE_DIR', str(BASE_DIR / 'profiles')))
+LAB_PROFILE_INTERVAL   = 0.002    # seconds between stack samples
+LAB_PROFILE_MAX_FRAMES = 3000
+
+# ── Render resolution ─────────────────────────────────────────────────────────
+# Internal size lab frames are rendered at, e.g. "320x240" to save CPU or
+# "1280x720" for quality.  Empty = render at whatever size the browser sends.
+# The scene is laid out in normalised coordinates (opencv_modules/scene.py),
+# so any size keeps layout and pour physics consistent.
+_render_size    = os.getenv('LAB_RENDER_SIZE', '').lower()
+LAB_RENDER_SIZE = tuple(int(v) for v in _render_size.split('x')) if _render_size else None
+LAB_RENDER_MIN  = (160, 120)
+LAB_RENDER_MAX  = (1920, 1080)
+
+# ── Outbound backpressure ─────────────────────────────────────────────────────
+# A lab connection counts as "behind" — and skips rendering new frames — while
+# a rendered frame is still waiting to be written or more than this many
+# bytes are sent but not yet acknowledged by the browser (reactions/outbound.py).
+LAB_OUTBOUND_MAX_BYTES = int(os.getenv('LAB_OUTBOUND_MAX_BYTES', str(256 * 1024)))
+
+# ── Spectators ────────────────────────────────────────────────────────────────
+# Read-only viewers on ws/lab/watch/<lab id>/ (reactions/spectate.py) get the
+# owner's already-encoded frames through a channel-layer group, at most
+# LAB_SPECTATE_FPS per second, so viewers add no CV or encode work.  Viewers
+# need a staff login or the owner's watch token, valid LAB_SPECTATE_TOKEN_TTL s.
+LAB_SPECTATE_FPS       = int(os.getenv('LAB_SPECTATE_FPS', '15'))
+LAB_SPECTATORS_MAX     = int(os.getenv('LAB_SPECTATORS_MAX', '60'))
+LAB_SPECTATE_TOKEN_TTL = int(os.getenv('LAB_SPECTATE_TOKEN_TTL', str(4 * 3600)))
+
+# ── Authentication ────────────────────────────────────────────────────────────
+# Password hashing for the async auth views runs on a bounded thread pool
+# (accounts/hashing.py).  Once AUTH_HASH_QUEUE calls are already waiting for
+# a thread, further logins get 503 + Retry-After instead of queueing forever.
+AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', str(os.cpu_count() or 1)))
+AUTH_HASH_QUEUE   = int(os.getenv('AUTH_HASH_QUEUE', '64'))
+
+# Bulk roster provisioning (accounts/provisioning.py) hashes on a shared
+# process pool of AUTH_PROVISION_WORKERS and inserts AUTH_PROVISION_BATCH users
+# per query; at most AUTH_PROVISION_CONCURRENCY rosters run at once per process.
+AUTH_PROVISION_WORKERS     = int(os.getenv('AUTH_PROVISION_WORKERS', str(os.cpu_count() or 1)))
+AUTH_PROVISION_BATCH       = 200
+AUTH_PROVISION_MAX_ROWS    = int(os.getenv('AUTH_PROVISION_MAX_ROWS', '2000'))
+AUTH_PROVISION_CONCURRENCY = int(os.getenv('AUTH_PROVISION_CONCURRENCY', '1'))
+
 # ── Database ──────────────────────────────────────────────────────────────────
 _db_url = os.getenv('DATABASE_URL')
 if _db_url:
@@ -174,6 +302,13 @@ CORS_ALLOW_HEADERS    = list(default_headers) + ['ngrok-skip-browser-warning']
 
 CSRF_TRUSTED_ORIGINS = _all_origins
 
+# Sessions are read from Redis and written through to the DB, so the HTTP
+# views and every WebSocket connect (SessionMiddlewareStack) skip the
+# session table on reads.  Only with Redis: a per-process LocMemCache would
+# keep serving sessions another process has already logged out.
+if REDIS_URL:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 SESSION_COOKIE_SAMESITE = 'None'
 SESSION_COOKIE_SECURE   = True
 CSRF_COOKIE_SAMESITE    = 'None'
@@ -184,9 +319,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
 }
 
+# ── Flight recorder ───────────────────────────────────────────────────────────
+# Every lab session keeps its last LAB_FLIGHT_FRAMES frames of stage timings
+# and simulation state in memory (reactions/telemetry.py) and logs them only
+# when a frame takes longer than LAB_SLOW_FRAME_MS in process(), a frame
+# fails to decode or the socket closes abnormally.
+LAB_FLIGHT_FRAMES = int(os.getenv('LAB_FLIGHT_FRAMES', '120'))
+LAB_SLOW_FRAME_MS = float(os.getenv('LAB_SLOW_FRAME_MS', '250'))
+
 # ── Logging ───────────────────────────────────────────────────────────────────
-# Exposes DEBUG-level logs from the consumer so you can see the reaction
-# check lines in your Render / Railway log viewer.
+# The per-frame loggers (consumer, lab session, shared state) default to INFO;
+# set LAB_HOT_LOG_LEVEL=DEBUG to see the [SIM] / [POUR] / [STATE] lines in your
+# Render / Railway log viewer.  Even then they are rate-limited per event
+# (reactions/telemetry.py), so they cannot dominate frame time.
+_HOT_LOG_LEVEL = os.getenv('LAB_HOT_LOG_LEVEL', 'INFO')
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -200,15 +347,100 @@ LOGGING = {
         },
     },
     "loggers": {
+        "accounts.hashing": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "accounts.provisioning": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
         "reactions.consumers": {
+            "handlers":  ["console"],
+            "level":     _HOT_LOG_LEVEL,
+            "propagate": False,
+        },
+        "reactions.cv_stack": {
             "handlers":  ["console"],
             "level":     "DEBUG",
             "propagate": False,
         },
-        "reactions.stream_state": {
+        "reactions.lab_session": {
+            "handlers":  ["console"],
+            "level":     _HOT_LOG_LEVEL,
+            "propagate": False,
+        },
+        "reactions.pipeline": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.workers": {
             "handlers":  ["console"],
             "level":     "DEBUG",
             "propagate": False,
         },
+        "reactions.scheduler": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.admission": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.profiling": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.telemetry": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.resume": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.reaper": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.qos": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.outbound": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.spectate": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.frame_transport": {
+            "handlers":  ["console"],
+            "level":     _HOT_LOG_LEVEL,
+            "propagate": False,
+        },
+        "reactions.metrics": {
+            "handlers":  ["console"],
+            "level":     "DEBUG",
+            "propagate": False,
+        },
+        "reactions.stream_state": {
+            "handlers":  ["console"],
+            "level":     _HOT_LOG_LEVEL,
+            "propagate": False,
+        },
     },
 }
\ No newline at end of file
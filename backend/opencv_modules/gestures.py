@@ -0,0 +1,123 @@
+# opencv_modules/gestures.py
+"""
+gestures.py — Hand features from a (21, 3) landmark array in one pass.
+
+HandTracker used to read landmarks 0 and 12 field by field off MediaPipe's
+protobuf objects and only ever produced a tilt angle.  Backends now hand over
+a float32 array (tracker_backends.Detection.landmarks, MediaPipe's 21-point
+layout, normalised x / y / z) and GestureExtractor turns it into every
+feature at once with a handful of NumPy ops:
+
+    tilt      pour angle in degrees, 0..90 (the rule HandTracker always used)
+    pinch     thumb-tip ↔ index-tip distance in palm lengths (~0.2 pinched)
+    extended  number of extended fingers, thumb excluded (0..4)
+    state     "open" / "grip" / None when unknown
+    velocity  palm-centre velocity (x, y) in frame heights per second
+    speed     |velocity|
+
+Distances are measured with x scaled by the frame's aspect ratio, so they do
+not depend on resolution or orientation.  Backends without landmarks (the
+contour fallback) still get tilt and velocity from their wrist / tip points.
+
+The extractor only needs an array, so the consumer, main_demo and a future
+client-side landmark feed can share it; a new gesture (grab the tube, shake)
+is a few lines over the arrays already computed here.
+"""
+
+import math
+import time
+
+import numpy as np
+
+WRIST     = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+MIDDLE_MCP, MIDDLE_TIP = 9, 12
+FINGER_TIPS = np.array((8, 12, 16, 20))     # index … pinky
+FINGER_PIPS = np.array((6, 10, 14, 18))
+PALM        = np.array((0, 5, 9, 13, 17))
+
+MIN_TILT     = 10.0     # degrees; smaller tilts read as upright
+EXTENDED_MIN = 3        # extended fingers for "open"
+GRIP_MAX     = 1        # … and at most this many for "grip"
+
+
+def tilt_angle(wrist, tip, aspect: float = 1.0) -> float:
+    """Pour angle 0..90 from normalised wrist → fingertip points."""
+    dx = (tip[0] - wrist[0]) * aspect
+    dy = wrist[1] - tip[1]
+    if dx >= 0:
+        return 0
+    angle = max(0, min(90, 180 - abs(math.degrees(math.atan2(dy, dx)))))
+    return 0 if angle < MIN_TILT else angle
+
+
+class GestureFeatures:
+
+    __slots__ = ("tilt", "pinch", "extended", "state", "velocity", "speed")
+
+    def __init__(self, tilt, pinch, extended, state, velocity, speed):
+        self.tilt     = tilt
+        self.pinch    = pinch
+        self.extended = extended
+        self.state    = state
+        self.velocity = velocity
+        self.speed    = speed
+
+    def as_dict(self) -> dict:
+        return {
+            "tilt":     round(self.tilt, 1),
+            "pinch":    None if self.pinch is None else round(self.pinch, 2),
+            "extended": self.extended,
+            "state":    self.state,
+            "speed":    round(self.speed, 2),
+        }
+
+
+class GestureExtractor:
+    """Per-hand extractor; keeps the previous palm centre for velocity."""
+
+    def __init__(self):
+        self._centre = None
+        self._at     = None
+
+    def reset(self) -> None:
+        self._centre = None
+        self._at     = None
+
+    def update(self, detection, aspect: float = 1.0, now: float | None = None):
+        """GestureFeatures for *detection*, or None (and reset) when there is none."""
+        if detection is None:
+            self.reset()
+            return None
+        now = time.monotonic() if now is None else now
+        scale = np.array((aspect, 1.0), dtype=np.float32)
+
+        lm = detection.landmarks
+        if lm is not None:
+            pts    = lm[:, :2] * scale
+            palm   = float(np.linalg.norm(pts[MIDDLE_MCP] - pts[WRIST])) or 1e-6
+            centre = pts[PALM].mean(axis=0)
+            pinch  = float(np.linalg.norm(pts[THUMB_TIP] - pts[INDEX_TIP])) / palm
+            # A finger is extended when its tip is farther from the wrist than
+            # its middle joint.
+            tips   = np.linalg.norm(pts[FINGER_TIPS] - pts[WRIST], axis=1)
+            pips   = np.linalg.norm(pts[FINGER_PIPS] - pts[WRIST], axis=1)
+            extended = int(np.count_nonzero(tips > pips * 1.1))
+            state  = ("open" if extended >= EXTENDED_MIN else
+                      "grip" if extended <= GRIP_MAX else None)
+        else:
+            centre = (np.asarray(detection.wrist, dtype=np.float32) * scale
+                      + np.asarray(detection.tip, dtype=np.float32) * scale) / 2
+            pinch, extended, state = None, None, None
+
+        velocity = (0.0, 0.0)
+        if self._centre is not None and now > self._at:
+            v = (centre - self._centre) / (now - self._at)
+            velocity = (float(v[0]), float(v[1]))
+        self._centre, self._at = centre, now
+
+        return GestureFeatures(
+            tilt_angle(detection.wrist, detection.tip, aspect),
+            pinch, extended, state, velocity, math.hypot(*velocity),
+        )
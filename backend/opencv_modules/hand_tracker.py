@@ -1,79 +1,94 @@
 # opencv_modules/hand_tracker.py
 
-import cv2
-import mediapipe as mp
-import math
+from gestures import GestureExtractor
+from sim_clock import REFERENCE_FPS, ease
+from tracker_backends import create_backend
 
 class HandTracker:
-    def __init__(self, mode=False, max_hands=1, detection_confidence=0.5, tracking_confidence=0.5):
+    def __init__(self, mode=False, max_hands=1, detection_confidence=0.5, tracking_confidence=0.5,
+                 backend="solutions", **backend_options):
         self.mode = mode
         self.max_hands = max_hands
         self.detection_confidence = detection_confidence
         self.tracking_confidence = tracking_confidence
         self.prev_angle = 0
-        self.alpha = 0.2
+        self.alpha = 0.2            # smoothing per reference frame — see step()
+        self.target_angle = None    # latest measurement from measure_angle()
 
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        # Detection backend — see tracker_backends.py.
+        self.backend = create_backend(
+            backend,
             static_image_mode=self.mode,
-            max_num_hands=self.max_hands,
-            min_detection_confidence=self.detection_confidence,
-            min_tracking_confidence=self.tracking_confidence
+            max_hands=self.max_hands,
+            detection_confidence=self.detection_confidence,
+            tracking_confidence=self.tracking_confidence,
+            **backend_options,
         )
-        self.mp_draw = mp.solutions.drawing_utils
+        self.results = None         # None until the first find_hands(), then [Detection] or []
+        self.gestures = GestureExtractor()
+        self.features = None        # GestureFeatures of the last find_hands() — gestures.py
+
+    @property
+    def backend_name(self):
+        return self.backend.name
+
+    @property
+    def detection(self):
+        """Latest Detection, or None when no hand was found."""
+        return self.results[0] if self.results else None
+
+    @property
+    def landmarks(self):
+        """(21, 3) float32 array of the latest hand, or None."""
+        detection = self.detection
+        return detection.landmarks if detection is not None else None
+
+    def reset(self):
+        """Forget the current hand and smoothing, e.g. before reuse by another session."""
+        self.prev_angle = 0
+        self.target_angle = None
         self.results = None
+        self.features = None
+        self.gestures.reset()
 
     def close(self):
-        """Explicitly release MediaPipe C++ resources. Call in finally block."""
-        self.hands.close()
-
-    def get_hand_angle(self, frame):
-        if not self.results or not self.results.multi_hand_landmarks:
+        """Explicitly release backend (MediaPipe C++) resources. Call in finally block."""
+        self.backend.close()
+
+    def get_hand_angle(self, frame, dt=1.0 / REFERENCE_FPS):
+        """Measure the hand in *frame* and smooth over *dt* seconds."""
+        self.measure_angle(frame)
+        return self.step(dt)
+
+    def step(self, dt):
+        """
+        Smooth toward the last measured angle over *dt* seconds and return it,
+        or None when no hand is visible.  Reused landmarks (skipped inference)
+        keep converging at the same real-time rate.
+        """
+        if self.target_angle is None:
             return None
+        self.prev_angle += (self.target_angle - self.prev_angle) * ease(self.alpha, dt)
+        return self.prev_angle
 
-        hand = self.results.multi_hand_landmarks[0]
-
-        h, w, _ = frame.shape
-
-        wrist = hand.landmark[0]
-        fingertip = hand.landmark[12]
-
-        wrist_x = wrist.x * w
-        wrist_y = wrist.y * h
-        fingertip_x = fingertip.x * w
-        fingertip_y = fingertip.y * h
-
-        dx = fingertip_x - wrist_x
-        dy = wrist_y - fingertip_y
-
-        raw_angle = math.degrees(math.atan2(dy, dx))
-
-        if dx >= 0:
-            target_angle = 0
-        else:
-            target_angle = max(0, min(90, 180 - abs(raw_angle)))
-
-        if target_angle < 10:
-            target_angle = 0
-
-        smoothed = self.alpha * target_angle + (1 - self.alpha) * self.prev_angle
-        self.prev_angle = smoothed
-
-        return smoothed
+    def measure_angle(self, frame=None):
+        """
+        Unsmoothed tilt target from the current landmarks (None = no hand).
+        Computed once per detection by find_hands(); *frame* is unused.
+        """
+        self.target_angle = self.features.tilt if self.features is not None else None
+        return self.target_angle
 
     def is_pouring(self, angle):
         """Returns True if hand is tilted enough to pour"""
         return angle is not None and angle < 50
 
     def find_hands(self, frame, draw=True):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(rgb_frame)
-
-        if self.results.multi_hand_landmarks and draw:
-            for hand_landmarks in self.results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS
-                )
-        return frame
\ No newline at end of file
+        detection = self.backend.detect(frame)
+        self.results = [detection] if detection is not None else []
+        h, w = frame.shape[:2]
+        self.features = self.gestures.update(detection, w / h)
+
+        if detection is not None and draw:
+            self.backend.draw(frame, detection)
+        return frame
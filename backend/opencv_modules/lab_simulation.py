@@ -0,0 +1,196 @@
+# opencv_modules/lab_simulation.py
+"""
+lab_simulation.py — Render-free core of the virtual litmus experiment.
+
+LabSimulation owns the tube, the paper and the reaction state and advances
+them from hand angles and elapsed time alone:
+
+    sim    = LabSimulation(chemical_type="base", reaction_type="red_litmus")
+    events = sim.step(dt, hand_angle)      # no frame, no OpenCV calls
+
+Every call returns a list of events:
+
+    {"type": "pour_started"}           tube tilted past the pour angle
+    {"type": "pour_stopped"}           tube levelled again
+    {"type": "tube_empty"}             the last of the liquid ran out
+    {"type": "reaction_complete", "reaction_type": ..., "chemical_type": ...}
+
+snapshot() / restore() round-trip the whole state through a JSON-safe dict,
+for replay, tests, persistence and client-rendered modes.
+
+Rendering is an optional view: ``sim.tube.draw(frame)`` and
+``sim.paper.draw(frame)`` render the current state onto a frame of the size
+the scene was laid out for (relayout() changes it).  The reaction rule and
+colours come from reaction_engine, so the simulation and both OpenCV paths
+(LabSession, main_demo) can never disagree.
+"""
+
+from reaction_engine import (
+    CHEMICAL_COLORS,
+    REACTION_RESULT_COLOR,
+    apply_paper_init,
+    get_pour_coordinates,
+    is_reactive_pair,
+)
+from scene import REFERENCE_SIZE, build_scene, place_scene
+from test_tube import POUR_ANGLE
+
+SNAPSHOT_VERSION = 1
+
+
+class LabSimulation:
+
+    def __init__(self, chemical_type="neutral", reaction_type="red_litmus",
+                 width=REFERENCE_SIZE[0], height=REFERENCE_SIZE[1]):
+        self.chemical_type = chemical_type
+        self.reaction_type = reaction_type
+        self.reacted       = False
+        self.time          = 0.0
+        self.size          = (width, height)
+
+        self.tube, self.paper = build_scene(width, height)
+        self.tube.liquid_color = CHEMICAL_COLORS.get(chemical_type, CHEMICAL_COLORS["neutral"])
+        apply_paper_init(self.paper, reaction_type)
+
+    # ── Controls ──────────────────────────────────────────────────────────────
+
+    def set_chemical(self, chemical_type: str) -> None:
+        """Switch the liquid being poured; allows a new reaction."""
+        self.chemical_type     = chemical_type
+        self.reacted           = False
+        self.tube.liquid_color = CHEMICAL_COLORS.get(chemical_type, CHEMICAL_COLORS["neutral"])
+
+    def set_reaction(self, reaction_type: str) -> None:
+        """Swap the litmus paper; resets its colour and wet spots."""
+        if reaction_type == self.reaction_type:
+            return
+        self.reaction_type = reaction_type
+        self.reacted       = False
+        apply_paper_init(self.paper, reaction_type)
+
+    def relayout(self, width: int, height: int) -> None:
+        """Lay the scene out for a new render size, keeping all state."""
+        if (width, height) != self.size:
+            place_scene(self.tube, self.paper, width, height)
+            self.size = (width, height)
+
+    # ── Simulation ────────────────────────────────────────────────────────────
+
+    def step(self, dt: float, hand_angle=None) -> list[dict]:
+        """
+        Advance by *dt* seconds with the (smoothed) hand tilt in degrees, or
+        None when no hand is visible.  Returns the events that occurred.
+        """
+        events     = []
+        was_full   = self.tube.liquid_level > 0
+        was_poured = self.tube.is_pouring
+
+        self.time += dt
+        self.tube.set_angle(hand_angle)
+        self.tube.step(dt)
+        self.paper.step(dt)
+
+        pouring = self.tube.is_pouring and self.tube.liquid_level > 0
+        if pouring and not was_poured:
+            events.append({"type": "pour_started"})
+        elif was_poured and not self.tube.is_pouring:
+            events.append({"type": "pour_stopped"})
+        if was_full and self.tube.liquid_level <= 0:
+            events.append({"type": "tube_empty"})
+
+        if pouring:
+            end_x, splash_y = self.pour_point()
+            self.paper.receive_liquid(end_x, splash_y, self.tube.liquid_color, dt)
+
+            # No check_hit — any active pour of a reactive chemical reacts;
+            # see the reactions/consumers.py module docstring.
+            if not self.reacted and is_reactive_pair(self.reaction_type, self.chemical_type):
+                self.trigger_reaction()
+                events.append({
+                    "type":          "reaction_complete",
+                    "reaction_type": self.reaction_type,
+                    "chemical_type": self.chemical_type,
+                })
+
+        return events
+
+    def trigger_reaction(self) -> None:
+        self.reacted = True
+        # Set paper target colour immediately so the next paper.step() eases toward it.
+        self.paper.target_color = list(REACTION_RESULT_COLOR[self.reaction_type])
+
+    def pour_point(self) -> tuple[int, int]:
+        """Where the stream lands, in frame pixels of the current layout."""
+        return get_pour_coordinates(self.tube)
+
+    def signature(self) -> tuple:
+        """
+        Everything the tube / paper overlay depends on, quantised to what a
+        redraw could actually show.  Two equal signatures draw identical
+        pixels, so a renderer can reuse its previous overlay.
+        """
+        tube, paper = self.tube, self.paper
+        pouring = tube.display_angle > POUR_ANGLE and tube.liquid_level > 0
+        return (
+            tube.x, tube.y, tube.width, tube.height, tube.scale,
+            round(tube.display_angle, 1),
+            int(tube.height * tube.liquid_level),
+            tuple(tube.liquid_color),
+            # The pour animates with simulated time, and only while visible.
+            (round(tube.sim_time, 3), tube.show_particles) if pouring else None,
+            paper.x, paper.y, paper.width, paper.height,
+            tuple(int(c) for c in paper.current_color),
+            tuple((s["x"], s["y"], int(s["radius"])) for s in paper.wet_spots),
+        )
+
+    # ── Snapshots ─────────────────────────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        tube, paper = self.tube, self.paper
+        return {
+            "version":       SNAPSHOT_VERSION,
+            "chemical_type": self.chemical_type,
+            "reaction_type": self.reaction_type,
+            "reacted":       self.reacted,
+            "time":          self.time,
+            "size":          list(self.size),
+            "tube": {
+                "liquid_level":  tube.liquid_level,
+                "liquid_color":  list(tube.liquid_color),
+                "display_angle": tube.display_angle,
+                "current_angle": tube.current_angle,
+                "is_pouring":    tube.is_pouring,
+                "sim_time":      tube.sim_time,
+            },
+            "paper": {
+                "base_color":    list(paper.base_color),
+                "current_color": list(paper.current_color),
+                "target_color":  list(paper.target_color),
+                "wet_spots":     [dict(s, color=list(s["color"])) for s in paper.wet_spots],
+            },
+        }
+
+    @classmethod
+    def restore(cls, snap: dict) -> "LabSimulation":
+        """Rebuild a simulation from snapshot(); raises ValueError if incompatible."""
+        if snap.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {snap.get('version')!r}")
+        width, height = snap["size"]
+        sim = cls(snap["chemical_type"], snap["reaction_type"], width, height)
+        sim.reacted = snap["reacted"]
+        sim.time    = snap["time"]
+
+        t = snap["tube"]
+        sim.tube.liquid_level  = t["liquid_level"]
+        sim.tube.liquid_color  = tuple(t["liquid_color"])
+        sim.tube.display_angle = t["display_angle"]
+        sim.tube.current_angle = t["current_angle"]
+        sim.tube.is_pouring    = t["is_pouring"]
+        sim.tube.sim_time      = t["sim_time"]
+
+        p = snap["paper"]
+        sim.paper.base_color    = tuple(p["base_color"])
+        sim.paper.current_color = list(p["current_color"])
+        sim.paper.target_color  = list(p["target_color"])
+        sim.paper.wet_spots     = [dict(s, color=tuple(s["color"])) for s in p["wet_spots"]]
+        return sim
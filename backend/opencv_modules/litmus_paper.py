@@ -4,12 +4,23 @@ import cv2
 import numpy as np
 import math
 
+from sim_clock import REFERENCE_FPS, ease
+
+# Simulation rates — per second, see sim_clock.py.
+COLOR_EASE   = 0.15                   # fraction of the colour gap closed per reference frame
+SPOT_GROWTH  = 0.4 * REFERENCE_FPS    # wet-spot radius growth, reference px per second
+SPOT_RATE    = REFERENCE_FPS          # wet spots laid down per second of pouring
+WET_DARKEN   = 0.85                   # target colour multiplier per wet spot
+
+
 class LitmusPaper:
-    def __init__(self, x=320, y=420, width=80, height=120):
+    def __init__(self, x=320, y=420, width=80, height=120, scale=1.0):
         self.x = x
         self.y = y
         self.width = width
         self.height = height
+        # Pixels per reference (640x480) pixel — see scene.py.
+        self.scale = scale
 
         # Litmus starts neutral — light yellow/cream
         self.base_color    = (210, 230, 240)  # BGR cream
@@ -21,33 +32,63 @@ class LitmusPaper:
         self.is_being_hit = False
         self.hit_x = 0
         self.hit_y = 0
+        self._spot_debt = 0.0       # fractional wet spots owed by receive_liquid()
+
+    def _px(self, v):
+        return max(1, int(round(v * self.scale)))
 
-    def receive_liquid(self, drop_x, drop_y, liquid_color):
+    def relocate(self, x, y, width, height, scale):
         """
-        Record a wet spot where liquid landed.
+        Move/resize to a new render resolution.  Wet spots keep their relative
+        position on the paper and their relative size.
+        """
+        for spot in self.wet_spots:
+            spot['x'] = x + int((spot['x'] - self.x) * width / max(self.width, 1))
+            spot['y'] = y + int((spot['y'] - self.y) * height / max(self.height, 1))
+            ratio = scale / self.scale
+            spot['radius']     *= ratio
+            spot['max_radius'] *= ratio
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.scale = scale
+
+    def receive_liquid(self, drop_x, drop_y, liquid_color, dt=1.0 / REFERENCE_FPS):
+        """
+        Record wet spots where liquid landed during the last *dt* seconds.
         Does NOT shift paper hue — chemistry color changes are set externally
         by the OpenCV loop via paper.target_color.
         liquid_color should be a near-colorless value like (245, 245, 245).
         """
-        if self.x < drop_x < self.x + self.width and self.y < drop_y < self.y + self.height:
+        if not (self.x < drop_x < self.x + self.width and self.y < drop_y < self.y + self.height):
+            return
+        self._spot_debt += SPOT_RATE * dt
+        while self._spot_debt >= 1.0:
+            self._spot_debt -= 1.0
             self.wet_spots.append({
                 'x': drop_x,
                 'y': drop_y,
-                'radius': 2,
-                'max_radius': 22,
+                'radius': 2 * self.scale,
+                'max_radius': 22 * self.scale,
                 'color': liquid_color,
                 'alpha': 1.0
             })
             # Only apply a subtle darkening to simulate wetness — no hue shift
             for i in range(3):
-                self.target_color[i] = int(self.target_color[i] * 0.85)
+                self.target_color[i] = int(self.target_color[i] * WET_DARKEN)
 
-    def draw(self, frame):
+    def step(self, dt):
+        """Advance colour change and wet-spot spread by *dt* seconds."""
         # Faster lerp toward target color so change is visible immediately
+        k = ease(COLOR_EASE, dt)
         for i in range(3):
-            self.current_color[i] += int(
-                (self.target_color[i] - self.current_color[i]) * 0.15
-            )
+            self.current_color[i] += (self.target_color[i] - self.current_color[i]) * k
+
+        growth = SPOT_GROWTH * self.scale * dt
+        for spot in self.wet_spots:
+            if spot['radius'] < spot['max_radius']:
+                spot['radius'] = min(spot['max_radius'], spot['radius'] + growth)
+
+    def draw(self, frame):
+        """Render the current state; call step() first to advance it."""
         self._draw_paper_3d(frame)
         self._draw_wet_spots(frame)
         self._draw_paper_lines(frame)
@@ -55,21 +96,23 @@ class LitmusPaper:
 
     def _draw_paper_3d(self, frame):
         x, y, w, h = self.x, self.y, self.width, self.height
+        px = self._px
+        d  = px(5)   # paper thickness
 
         # ---- SHADOW beneath paper ----
         shadow_pts = np.array([
-            [x + 6,     y + h + 4],
-            [x + w + 6, y + h + 4],
-            [x + w + 4, y + h + 8],
-            [x + 4,     y + h + 8],
+            [x + px(6),     y + h + px(4)],
+            [x + w + px(6), y + h + px(4)],
+            [x + w + px(4), y + h + px(8)],
+            [x + px(4),     y + h + px(8)],
         ], np.int32)
         cv2.fillPoly(frame, [shadow_pts], (30, 30, 30))
 
         # ---- RIGHT side face (thickness illusion) ----
         right_face = np.array([
             [x + w,     y],
-            [x + w + 5, y + 3],
-            [x + w + 5, y + h + 3],
+            [x + w + d, y + px(3)],
+            [x + w + d, y + h + px(3)],
             [x + w,     y + h],
         ], np.int32)
         dark_color = tuple(int(c * 0.55) for c in self.current_color)
@@ -79,8 +122,8 @@ class LitmusPaper:
         bottom_face = np.array([
             [x,         y + h],
             [x + w,     y + h],
-            [x + w + 5, y + h + 3],
-            [x + 5,     y + h + 3],
+            [x + w + d, y + h + px(3)],
+            [x + d,     y + h + px(3)],
         ], np.int32)
         darker_color = tuple(int(c * 0.45) for c in self.current_color)
         cv2.fillPoly(frame, [bottom_face], darker_color)
@@ -95,7 +138,7 @@ class LitmusPaper:
 
         # ---- HIGHLIGHT: thin bright strip on left edge ----
         highlight = tuple(min(255, int(c * 1.25)) for c in self.current_color)
-        cv2.line(frame, (x, y), (x, y + h), highlight, 2)
+        cv2.line(frame, (x, y), (x, y + h), highlight, px(2))
 
         # ---- TOP edge highlight ----
         cv2.line(frame, (x, y), (x + w, y), highlight, 1)
@@ -112,10 +155,6 @@ class LitmusPaper:
             if r < 1:
                 continue
 
-            # Expand spot over time
-            if spot['radius'] < spot['max_radius']:
-                spot['radius'] += 0.4
-
             # Clip to paper bounds
             clip_x1 = max(self.x, cx - r)
             clip_x2 = min(self.x + self.width, cx + r)
@@ -137,9 +176,9 @@ class LitmusPaper:
             # Outer dark ring
             cv2.circle(frame, (cx, cy), r,     dark,  -1)
             # Mid color fill
-            cv2.circle(frame, (cx, cy), max(1, r - 2), color, -1)
+            cv2.circle(frame, (cx, cy), max(1, r - self._px(2)), color, -1)
             # Bright wet center
-            cv2.circle(frame, (cx, cy), max(1, r - 5), bright, -1)
+            cv2.circle(frame, (cx, cy), max(1, r - self._px(5)), bright, -1)
 
             # Clip anything outside paper back to paper color
             inv_mask = cv2.bitwise_not(mask)
@@ -157,6 +196,6 @@ class LitmusPaper:
         for i in range(1, 6):
             y_line = self.y + int(i * self.height / 6)
             cv2.line(frame,
-                     (self.x + 4,          y_line),
-                     (self.x + self.width - 4, y_line),
+                     (self.x + self._px(4),              y_line),
+                     (self.x + self.width - self._px(4), y_line),
                      line_color, 1)
\ No newline at end of file
@@ -1,17 +1,31 @@
 # opencv_modules/main_demo.py
+"""
+main_demo.py — Desktop / classroom-kiosk version of the virtual lab.
+
+    python main_demo.py              threaded capture / process / display
+    python main_demo.py --serial     original single loop
+
+Both modes draw an fps / latency readout (hide it with --no-perf).
+--tracker picks the hand detector: solutions (default), tasks or contour.
+
+    python main_demo.py --input clip.mp4 --timeline "0=H2O,3=NaOH" --output out.mp4
+
+runs the same pipeline headless over a video file or image directory, as fast
+as the CPU allows, and prints throughput, per-stage timings and events.
+"""
+
+import argparse
+import os
+import threading
+import time
 
 import cv2
 from hand_tracker import HandTracker
-from test_tube import TestTube
-from litmus_paper import LitmusPaper
-from reaction_engine import (           # ← single source of truth
-    CHEMICAL_COLORS,
-    REACTION_RESULT_COLOR,
-    REACTION_BANNER,
-    apply_paper_init,
-    get_pour_coordinates,
-    is_reactive_pair,
-)
+from lab_simulation import LabSimulation
+from sim_clock import SimClock
+from reaction_engine import REACTION_BANNER   # ← single source of truth
+from tracker_backends import BACKENDS
+from video_pipeline import FrameGrabber, LatestSlot, RateMeter, draw_perf_overlay
 
 # ── Chemical catalogue ───────────────────────────────────────────────────────
 # 'type' keys must match the CHEMICAL_COLORS / REACTIVE_PAIRS keys in
@@ -118,87 +132,370 @@ def on_mouse(event, x, y, flags, param):
         ui_state['reset']       = True
 
 
-# ── Main loop ────────────────────────────────────────────────────────────────
+# ── Lab state + per-frame work ───────────────────────────────────────────────
+
+class KioskLab:
+    """Tracker, simulation and UI state shared by the serial and threaded loops."""
+
+    STAGES = ('flip', 'track', 'simulate', 'draw', 'ui')
+
+    def __init__(self, frame_w, frame_h, mirror=True, tracker='solutions', hand_model=None):
+        self.frame_w  = frame_w
+        self.frame_h  = frame_h
+        self.mirror   = mirror
+        self.tracker  = HandTracker(backend=tracker, model_path=hand_model)
+        self.clock    = SimClock()
+        self.events   = []                                  # events of the last frame
+        self.stage_time = {stage: 0.0 for stage in self.STAGES}   # cumulative seconds
+        self.buttons  = get_buttons()
+        self.ui_state = {
+            'active_id':   'H2O',
+            'litmus_type': 'red_litmus',   # unified key format (matches reaction_engine)
+            'reset':       False,
+        }
+        self.sim = self.new_simulation()
+
+    def new_simulation(self):
+        # Laid out for the camera's frame size; canonical paper reset included.
+        return LabSimulation(CHEMICALS[self.ui_state['active_id']]['type'],
+                             self.ui_state['litmus_type'], self.frame_w, self.frame_h)
+
+    def select(self, chemical_id=None, litmus_type=None):
+        """Same effect as clicking a chemical / the litmus toggle."""
+        if chemical_id is not None and chemical_id != self.ui_state['active_id']:
+            self.ui_state['active_id'] = chemical_id
+            self.ui_state['reset']     = True
+        if litmus_type is not None and litmus_type != self.ui_state['litmus_type']:
+            self.ui_state['litmus_type'] = litmus_type
+            self.ui_state['reset']       = True
+
+    def process(self, frame, now=None):
+        """
+        Track, simulate and draw one raw camera frame; returns the rendered
+        frame.  *now* is the frame's timestamp in seconds (wall clock if None).
+        """
+        timer = _StageTimer(self.stage_time)
+        if self.mirror:
+            frame = cv2.flip(frame, 1)
+        dt    = self.clock.tick(now)
+        timer.lap('flip')
 
-def main():
-    cap     = cv2.VideoCapture(0)
-    tracker = HandTracker()
+        # ── Reset on chemical or litmus change ────────────────────────────────
+        if self.ui_state['reset']:
+            self.ui_state['reset'] = False
+            self.sim               = self.new_simulation()
+        sim = self.sim
 
-    ui_state = {
-        'active_id':   'H2O',
-        'litmus_type': 'red_litmus',   # unified key format (matches reaction_engine)
-        'reset':       False,
-    }
+        # ── Hand tracking ─────────────────────────────────────────────────────
+        frame = self.tracker.find_hands(frame)
+        angle = self.tracker.get_hand_angle(frame, dt)
+        timer.lap('track')
+
+        # ── Simulate (pour → reaction), then draw ─────────────────────────────
+        # Desktop demo: react as soon as the right chemical is being poured —
+        # LabSimulation does no coordinate hit-check on either path.
+        self.events = sim.step(dt, angle)
+        timer.lap('simulate')
+        frame = sim.paper.draw(frame)
+        frame = sim.tube.draw(frame)
+        timer.lap('draw')
 
-    buttons = get_buttons()
-    tube    = TestTube(x=350, y=150, width=60, height=200)
-    paper   = LitmusPaper(x=310, y=420, width=90, height=130)
-    apply_paper_init(paper, ui_state['litmus_type'])
-    reacted = False
+        # ── UI ────────────────────────────────────────────────────────────────
+        draw_buttons(frame, self.buttons, self.ui_state['active_id'])
+        draw_litmus_button(frame, sim.reaction_type)
+        draw_reaction_banner(frame, sim.reaction_type, sim.chemical_type, sim.reacted)
+        timer.lap('ui')
+        return frame
 
-    cv2.namedWindow('Virtual Chemistry Lab')
-    cv2.setMouseCallback('Virtual Chemistry Lab', on_mouse,
-                         {'state': ui_state, 'buttons': buttons})
+    def close(self):
+        self.tracker.close()
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
 
-        frame = cv2.flip(frame, 1)
+class _StageTimer:
 
-        # ── Reset on chemical or litmus change ────────────────────────────────
-        if ui_state['reset']:
-            ui_state['reset'] = False
-            reacted           = False
-            tube              = TestTube(x=350, y=150, width=60, height=200)
-            paper             = LitmusPaper(x=310, y=420, width=90, height=130)
-            apply_paper_init(paper, ui_state['litmus_type'])  # canonical reset
+    def __init__(self, totals):
+        self.totals = totals
+        self.t      = time.perf_counter()
 
-        litmus_type   = ui_state['litmus_type']
-        chem          = CHEMICALS[ui_state['active_id']]
-        chemical_type = chem['type']
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.totals[stage] = self.totals.get(stage, 0.0) + now - self.t
+        self.t = now
 
-        # Sync tube liquid colour from shared palette
-        tube.liquid_color = CHEMICAL_COLORS.get(chemical_type, CHEMICAL_COLORS['neutral'])
 
-        # ── Hand tracking ─────────────────────────────────────────────────────
-        frame = tracker.find_hands(frame)
-        angle = tracker.get_hand_angle(frame)
-        tube.set_angle(angle)
-
-        # ── Draw ──────────────────────────────────────────────────────────────
-        frame = paper.draw(frame)
-        frame = tube.draw(frame)
-
-        # ── Pour → reaction ───────────────────────────────────────────────────
-        if tube.is_pouring and tube.liquid_level > 0:
-            # Shared physics: identical calculation used in consumers.py
-            end_x, splash_y = get_pour_coordinates(tube)
-
-            paper.receive_liquid(end_x, splash_y, tube.liquid_color)
-
-            # Desktop demo: react as soon as the right chemical is being poured.
-            # No coordinate hit-check here — the local webcam path is reliable
-            # enough that any active pour of a reactive chemical should trigger.
-            # (consumers.py keeps check_hit for the noisier WebSocket path.)
-            if not reacted and is_reactive_pair(litmus_type, chemical_type):
-                reacted = True
-                # Set target_color IMMEDIATELY so paper.draw() picks it up next frame.
-                paper.target_color = list(REACTION_RESULT_COLOR[litmus_type])
+# ── Main loops ───────────────────────────────────────────────────────────────
 
-        # ── UI ────────────────────────────────────────────────────────────────
-        draw_buttons(frame, buttons, ui_state['active_id'])
-        draw_litmus_button(frame, litmus_type)
-        draw_reaction_banner(frame, litmus_type, chemical_type, reacted)
+WINDOW = 'Virtual Chemistry Lab'
 
-        cv2.imshow('Virtual Chemistry Lab', frame)
+
+def _open_window(lab):
+    cv2.namedWindow(WINDOW)
+    cv2.setMouseCallback(WINDOW, on_mouse,
+                         {'state': lab.ui_state, 'buttons': lab.buttons})
+
+
+def run_serial(cap, lab, show_perf=True):
+    """Original single loop: read → process → show, one after the other."""
+    rate = RateMeter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        t_capture = time.perf_counter()
+        frame     = lab.process(frame)
+        rate.tick(time.perf_counter() - t_capture)
+
+        if show_perf:
+            draw_perf_overlay(frame, [
+                f"serial  {rate.fps():4.1f} fps",
+                f"latency {rate.latency_ms():4.0f} ms",
+                _gesture_line(lab.tracker.features),
+            ])
+        cv2.imshow(WINDOW, frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-    cap.release()
-    cv2.destroyAllWindows()
+
+def _gesture_line(features):
+    """One readout line from gestures.GestureFeatures."""
+    if features is None:
+        return "hand    -"
+    pinch = "-" if features.pinch is None else f"{features.pinch:.2f}"
+    return (f"hand    {features.state or '?':<4} pinch {pinch}"
+            f"  {features.speed:.1f}/s")
+
+
+def run_threaded(cap, lab, display_fps=60, show_perf=True):
+    """
+    Capture, processing and display on independent cadences — see
+    video_pipeline.py.  Processing always works on the newest camera frame.
+    """
+    grabber  = FrameGrabber(cap).start()
+    rendered = LatestSlot()
+    proc     = RateMeter()
+    stop     = threading.Event()
+
+    def process_loop():
+        seq = 0
+        while not stop.is_set():
+            item, seq = grabber.slot.get_newer(seq, timeout=0.5)
+            if item is None:
+                if grabber.slot.closed:
+                    break
+                continue
+            frame, t_capture = item
+            frame = lab.process(frame)
+            proc.tick(time.perf_counter() - t_capture)
+            rendered.put((frame, t_capture))
+        rendered.close()
+
+    worker = threading.Thread(target=process_loop, name="lab-process", daemon=True)
+    worker.start()
+
+    display  = RateMeter()
+    delay_ms = max(1, int(1000 / display_fps))
+    shown    = 0
+    try:
+        while not rendered.closed:
+            item, seq = rendered.get_newer(shown, timeout=delay_ms / 1000)
+            if item is not None:
+                shown = seq
+                frame, t_capture = item
+                display.tick(time.perf_counter() - t_capture)
+                if show_perf:
+                    frame = frame.copy()   # the process thread may still hold it
+                    draw_perf_overlay(frame, [
+                        f"camera  {grabber.rate.fps():4.1f} fps",
+                        f"process {proc.fps():4.1f} fps",
+                        f"display {display.fps():4.1f} fps",
+                        f"latency {display.latency_ms():4.0f} ms"
+                        f" (p95 {display.latency_ms(95):.0f})",
+                        f"dropped {grabber.slot.dropped}",
+                        _gesture_line(lab.tracker.features),
+                    ])
+                cv2.imshow(WINDOW, frame)
+            if cv2.waitKey(delay_ms) & 0xFF == ord('q'):
+                break
+    finally:
+        stop.set()
+        grabber.stop()
+        worker.join(timeout=2.0)
+
+
+# ── Headless batch mode ──────────────────────────────────────────────────────
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def parse_timeline(spec):
+    """
+    ``"0=H2O+red_litmus,2.5=NaOH,6=blue_litmus"`` → sorted
+    ``[(0.0, 'H2O', 'red_litmus'), (2.5, 'NaOH', None), (6.0, None, 'blue_litmus')]``.
+
+    Each entry is ``SECONDS=SELECTION[+SELECTION]`` where a selection is a
+    chemical id from CHEMICALS or a litmus type from LITMUS_OPTIONS.
+    """
+    timeline = []
+    for entry in filter(None, (e.strip() for e in (spec or '').split(','))):
+        when, _, picks = entry.partition('=')
+        chemical_id = litmus_type = None
+        for pick in picks.split('+'):
+            if pick in CHEMICALS:
+                chemical_id = pick
+            elif pick in LITMUS_OPTIONS:
+                litmus_type = pick
+            else:
+                raise ValueError(f"unknown timeline selection {pick!r} in {entry!r}")
+        timeline.append((float(when), chemical_id, litmus_type))
+    return sorted(timeline, key=lambda e: e[0])
+
+
+def iter_frames(path, fps):
+    """Yield ``(index, timestamp, frame)`` from a video file or an image directory."""
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for i, name in enumerate(names):
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                yield i, i / fps, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"cannot open {path}")
+    try:
+        i = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield i, i / fps, frame
+            i += 1
+    finally:
+        cap.release()
+
+
+def run_headless(args):
+    """
+    Run the kiosk pipeline over a video file / image directory with no window,
+    as fast as the CPU allows.  Simulation time follows the input's frame
+    timestamps, not the wall clock, so results are reproducible.
+    """
+    fps = args.fps
+    if not fps and not os.path.isdir(args.input):
+        probe = cv2.VideoCapture(args.input)
+        fps   = probe.get(cv2.CAP_PROP_FPS) or 0
+        probe.release()
+    fps = fps or 30.0
+
+    timeline = parse_timeline(args.timeline)
+    lab      = None
+    writer   = None
+    read_s   = write_s = 0.0
+    frames   = 0
+    events   = []
+
+    t_start = t_read = time.perf_counter()
+    try:
+        for index, ts, frame in iter_frames(args.input, fps):
+            read_s += time.perf_counter() - t_read
+            if lab is None:
+                h, w = frame.shape[:2]
+                lab  = KioskLab(w, h, mirror=not args.no_flip,
+                                tracker=args.tracker, hand_model=args.hand_model)
+            while timeline and timeline[0][0] <= ts:
+                _, chemical_id, litmus_type = timeline.pop(0)
+                lab.select(chemical_id, litmus_type)
+
+            out = lab.process(frame, now=ts)
+            frames += 1
+            for event in lab.events:
+                events.append((ts, index, event))
+                print(f"  t={ts:7.2f}s  frame={index:<6d} {event['type']}")
+
+            if args.output:
+                t0 = time.perf_counter()
+                if writer is None:
+                    writer = cv2.VideoWriter(args.output, cv2.VideoWriter_fourcc(*'mp4v'),
+                                             fps, (out.shape[1], out.shape[0]))
+                writer.write(out)
+                write_s += time.perf_counter() - t0
+
+            if args.max_frames and frames >= args.max_frames:
+                break
+            t_read = time.perf_counter()
+    finally:
+        if writer is not None:
+            writer.release()
+        if lab is not None:
+            lab.close()
+
+    wall = time.perf_counter() - t_start
+    if not frames:
+        raise SystemExit(f"no frames read from {args.input}")
+
+    stages = {'read': read_s, **lab.stage_time}
+    if args.output:
+        stages['write'] = write_s
+    print(f"\n{frames} frames in {wall:.2f}s  →  {frames / wall:.1f} fps "
+          f"(input {fps:g} fps, {frames / fps:.1f}s of video)")
+    print(f"{'stage':<10}{'ms/frame':>10}{'share':>9}")
+    for stage, total in stages.items():
+        print(f"{stage:<10}{total / frames * 1000:>10.2f}{total / wall:>8.0%}")
+    reactions = [e for e in events if e[2]['type'] == 'reaction_complete']
+    print(f"reactions: {len(reactions)}"
+          + (f"  first at t={reactions[0][0]:.2f}s" if reactions else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GesturEd desktop / kiosk lab demo")
+    parser.add_argument('--camera', type=int, default=0, help="camera index")
+    parser.add_argument('--serial', action='store_true',
+                        help="single read → process → show loop instead of the "
+                             "threaded pipeline")
+    parser.add_argument('--display-fps', type=float, default=60,
+                        help="display refresh cadence in threaded mode")
+    parser.add_argument('--no-perf', action='store_true', help="hide the fps/latency readout")
+    parser.add_argument('--tracker', choices=tuple(BACKENDS), default='solutions',
+                        help="hand-detection backend (tracker_backends.py)")
+    parser.add_argument('--hand-model', default=None,
+                        help="hand_landmarker.task file for --tracker tasks")
+
+    batch = parser.add_argument_group('headless batch mode')
+    batch.add_argument('--input', help="video file or image directory; runs with no window")
+    batch.add_argument('--output', help="write the rendered frames to this video file")
+    batch.add_argument('--fps', type=float, default=0,
+                       help="input frame rate (default: from the video, else 30)")
+    batch.add_argument('--timeline', default='',
+                       help='scripted selections, e.g. "0=H2O+red_litmus,2.5=NaOH"')
+    batch.add_argument('--max-frames', type=int, default=0)
+    batch.add_argument('--no-flip', action='store_true',
+                       help="do not mirror input frames (for unmirrored recordings)")
+    args = parser.parse_args()
+
+    if args.input:
+        run_headless(args)
+        return
+
+    cap = cv2.VideoCapture(args.camera)
+    ret, frame = cap.read()
+    if not ret:
+        return
+    frame_h, frame_w = frame.shape[:2]
+
+    lab = KioskLab(frame_w, frame_h, tracker=args.tracker, hand_model=args.hand_model)
+    _open_window(lab)
+    try:
+        if args.serial:
+            run_serial(cap, lab, show_perf=not args.no_perf)
+        else:
+            run_threaded(cap, lab, display_fps=args.display_fps,
+                         show_perf=not args.no_perf)
+    finally:
+        lab.close()
+        cap.release()
+        cv2.destroyAllWindows()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
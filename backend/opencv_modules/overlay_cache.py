@@ -0,0 +1,91 @@
+# opencv_modules/overlay_cache.py
+"""
+overlay_cache.py — Reuse the tube / paper overlay while the scene is idle.
+
+Most of a lab session is setup time: no hand, the tube upright, the paper
+settled.  The only thing changing is the camera background, yet every frame
+used to redraw the paper gradient row by row, re-rasterise the tube liquid,
+warpAffine it and composite it.
+
+OverlayCache compares LabSimulation.signature() with the previous frame's:
+
+  • changed  → draw straight onto the frame as before (no extra cost).
+  • the same for two frames in a row → render the overlay once onto a black
+    layer, remember its mask and bounding box, and from then on just copy
+    the layer into each new camera frame under the mask.
+
+All overlay drawing is opaque and never uses pure black, so the composited
+frame is pixel-identical to drawing directly.  ``idle_frames`` /
+``frames`` gives the idle-frame ratio.
+
+render() can also fill a *timings* dict with seconds spent on "paper" and
+"tube" (both 0 on a reused frame) and "composite" (copying the cached layer).
+"""
+
+import time
+
+import numpy as np
+
+
+class OverlayCache:
+
+    def __init__(self):
+        self.frames      = 0
+        self.idle_frames = 0
+        self._last_sig   = None
+        self._layer      = None     # (signature, shape, bbox, layer_roi, mask_roi)
+
+    def idle_ratio(self) -> float:
+        return self.idle_frames / self.frames if self.frames else 0.0
+
+    def invalidate(self) -> None:
+        self._last_sig = None
+        self._layer    = None
+
+    def render(self, frame, sim, timings=None):
+        """Draw *sim*'s paper and tube onto *frame*; returns ``(frame, reused)``."""
+        self.frames += 1
+        sig = sim.signature()
+        stable, self._last_sig = sig == self._last_sig, sig
+        if timings is None:
+            timings = {}
+        timings["paper"] = timings["tube"] = timings["composite"] = 0.0
+
+        if not stable:
+            self._layer = None
+            return self._draw(frame, sim, timings), False
+
+        layer = self._layer
+        if layer is None or layer[0] != sig or layer[1] != frame.shape:
+            layer = self._layer = self._build(frame.shape, sig, sim, timings)
+        else:
+            self.idle_frames += 1
+
+        t0 = time.perf_counter()
+        _, _, bbox, layer_roi, mask_roi = layer
+        if bbox is not None:
+            y0, y1, x0, x1 = bbox
+            np.copyto(frame[y0:y1, x0:x1], layer_roi, where=mask_roi)
+        timings["composite"] = time.perf_counter() - t0
+        return frame, True
+
+    @staticmethod
+    def _draw(frame, sim, timings):
+        t0    = time.perf_counter()
+        frame = sim.paper.draw(frame)
+        t1    = time.perf_counter()
+        frame = sim.tube.draw(frame)
+        timings["paper"] = t1 - t0
+        timings["tube"]  = time.perf_counter() - t1
+        return frame
+
+    @classmethod
+    def _build(cls, shape, sig, sim, timings):
+        canvas = cls._draw(np.zeros(shape, dtype=np.uint8), sim, timings)
+        mask   = canvas.any(axis=2)
+        ys, xs = np.nonzero(mask)
+        if not len(ys):
+            return sig, shape, None, None, None
+        y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        return (sig, shape, (y0, y1, x0, x1),
+                canvas[y0:y1, x0:x1].copy(), mask[y0:y1, x0:x1, None].copy())
@@ -49,13 +49,15 @@ REACTION_BANNER: dict[tuple[str, str], str] = {
 
 # ── Physics constants ────────────────────────────────────────────────────────
 # These offset values were empirically tuned in the original demo and are now
-# the single canonical reference for both runtime paths.
-_STREAM_HORIZONTAL_OFFSET = 45   # px: leftward correction after mouth projection
-_STREAM_VERTICAL_DROP     = 215  # px: 130 (arc) + 85 (splash fall)
+# the single canonical reference for both runtime paths.  They are expressed
+# in REFERENCE pixels (a 640×480 frame) and multiplied by the object's
+# ``scale`` (see scene.py), so pour physics is identical at any resolution.
+_STREAM_HORIZONTAL_OFFSET = 45   # ref px: leftward correction after mouth projection
+_STREAM_VERTICAL_DROP     = 215  # ref px: 130 (arc) + 85 (splash fall)
 
 # Extra pixels added on every side of the paper bounding box for hit detection.
 # Raising this value makes pouring feel more forgiving for webcam imprecision.
-HIT_TOLERANCE = 45   # px — increase if reactions still miss on slow hardware
+HIT_TOLERANCE = 45   # ref px — increase if reactions still miss on slow hardware
 
 
 # ── Public API ───────────────────────────────────────────────────────────────
@@ -72,7 +74,8 @@ def get_pour_coordinates(tube) -> tuple[int, int]:
     Parameters
     ----------
     tube : TestTube
-        Must expose ``.x``, ``.y``, ``.width``, and ``.display_angle`` (degrees).
+        Must expose ``.x``, ``.y``, ``.width``, and ``.display_angle`` (degrees);
+        ``.scale`` (pixels per reference pixel) defaults to 1.0.
 
     Returns
     -------
@@ -84,11 +87,13 @@ def get_pour_coordinates(tube) -> tuple[int, int]:
     pivot_y     = tube.y
     mouth_off_x = -(tube.width // 2)
 
+    scale       = getattr(tube, "scale", 1.0)
+
     stream_x = int(pivot_x + mouth_off_x * math.cos(angle_rad))
     stream_y = int(pivot_y + mouth_off_x * math.sin(angle_rad))
 
-    end_x    = stream_x - _STREAM_HORIZONTAL_OFFSET
-    splash_y = stream_y + _STREAM_VERTICAL_DROP
+    end_x    = stream_x - int(round(_STREAM_HORIZONTAL_OFFSET * scale))
+    splash_y = stream_y + int(round(_STREAM_VERTICAL_DROP * scale))
 
     return end_x, splash_y
 
@@ -107,10 +112,12 @@ def check_hit(end_x: int, splash_y: int, paper,
     end_x, splash_y : int
         Impact coordinates from :func:`get_pour_coordinates`.
     paper : LitmusPaper
-        Must expose ``.x``, ``.y``, ``.width``, ``.height``.
+        Must expose ``.x``, ``.y``, ``.width``, ``.height``; ``.scale``
+        defaults to 1.0.
     tolerance : int
-        Extra padding (px) added to every edge of the bounding box.
+        Extra padding (reference px) added to every edge of the bounding box.
     """
+    tolerance = tolerance * getattr(paper, "scale", 1.0)
     return (
         paper.x - tolerance <= end_x    <= paper.x + paper.width  + tolerance and
         paper.y - tolerance <= splash_y <= paper.y + paper.height + tolerance
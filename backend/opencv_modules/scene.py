@@ -0,0 +1,86 @@
+# opencv_modules/scene.py
+"""
+scene.py — Resolution-independent layout for the lab scene.
+
+The tube and paper used to be placed with pixel literals tuned for a 640×480
+frame, so rendering at 320×240 (speed) or 1280×720 (quality) broke both the
+layout and the pour physics.
+
+Geometry now lives in NORMALISED scene coordinates:
+
+  • The scene is a 4:3 box; (0, 0) is its top-left and (1, 1) its
+    bottom-right corner.
+  • Positions are fractions of the box width (x) and height (y).
+  • Lengths (object width/height) are fractions of the box height, so
+    objects keep their aspect ratio.
+
+SceneTransform fits the box into any frame, uniformly scaled and centred
+(letterboxed on wider frames), and exposes ``scale`` — pixels per reference
+pixel — which TestTube, LitmusPaper and reaction_engine multiply their tuned
+pixel constants by.  At 640×480 every value maps back to the original pixel
+numbers exactly.
+"""
+
+from litmus_paper import LitmusPaper
+from test_tube import TestTube
+
+REFERENCE_SIZE = (640, 480)
+
+# Normalised layouts — reproduce TestTube(x=350, y=150, width=60, height=200)
+# and LitmusPaper(x=310, y=420, width=90, height=130) at 640×480.
+TUBE_LAYOUT  = {"x": 350 / 640, "y": 150 / 480, "width": 60 / 480, "height": 200 / 480}
+PAPER_LAYOUT = {"x": 310 / 640, "y": 420 / 480, "width": 90 / 480, "height": 130 / 480}
+
+
+class SceneTransform:
+    """Maps normalised scene coordinates onto a ``width`` × ``height`` frame."""
+
+    def __init__(self, width, height):
+        ref_w, ref_h  = REFERENCE_SIZE
+        self.width    = width
+        self.height   = height
+        self.scale    = min(width / ref_w, height / ref_h)
+        self.box_w    = ref_w * self.scale
+        self.box_h    = ref_h * self.scale
+        self.offset_x = (width  - self.box_w) / 2
+        self.offset_y = (height - self.box_h) / 2
+
+    def x(self, nx):
+        return int(round(self.offset_x + nx * self.box_w))
+
+    def y(self, ny):
+        return int(round(self.offset_y + ny * self.box_h))
+
+    def length(self, n):
+        return int(round(n * self.box_h))
+
+    def to_normalised(self, px, py):
+        return ((px - self.offset_x) / self.box_w,
+                (py - self.offset_y) / self.box_h)
+
+
+def place(obj, layout, transform):
+    """Position a TestTube / LitmusPaper from a normalised *layout*."""
+    obj.relocate(
+        transform.x(layout["x"]),
+        transform.y(layout["y"]),
+        transform.length(layout["width"]),
+        transform.length(layout["height"]),
+        transform.scale,
+    )
+
+
+def place_scene(tube, paper, width, height):
+    """(Re)lay out existing objects for a new render size; keeps their state."""
+    transform = SceneTransform(width, height)
+    place(tube, TUBE_LAYOUT, transform)
+    place(paper, PAPER_LAYOUT, transform)
+    return transform
+
+
+def build_scene(width=REFERENCE_SIZE[0], height=REFERENCE_SIZE[1]):
+    """Fresh ``(tube, paper)`` laid out for a ``width`` × ``height`` frame."""
+    tube  = TestTube()
+    paper = LitmusPaper()
+    place_scene(tube, paper, width, height)
+    return tube, paper
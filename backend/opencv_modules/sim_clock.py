@@ -0,0 +1,48 @@
+# opencv_modules/sim_clock.py
+"""
+sim_clock.py — Time base for the lab simulation.
+
+The tube, paper and hand smoothing were tuned per frame at roughly 30 fps, so
+dropping frames, skipping inference or running at a different fps changed
+how fast the tube tilted, how long a pour lasted and how quickly the paper
+changed colour.
+
+Every object now has a pure ``step(dt)`` that advances its state by *dt*
+seconds, and ``draw(frame)`` only renders.  Rates are per second — the old
+per-frame value × REFERENCE_FPS — and exponential easing goes through
+ease(), so at 30 fps the behaviour is exactly what it was before.
+"""
+
+import time
+
+REFERENCE_FPS = 30.0    # fps the original per-frame constants were tuned at
+MAX_DT        = 0.25    # clamp after stalls so objects don't teleport
+
+
+def ease(per_frame: float, dt: float) -> float:
+    """
+    Fraction of the remaining distance covered in *dt* seconds by an easing
+    that covers *per_frame* of it every reference frame.
+    """
+    return 1.0 - (1.0 - per_frame) ** (dt * REFERENCE_FPS)
+
+
+class SimClock:
+    """Turns successive frame timestamps into clamped simulation steps."""
+
+    def __init__(self, max_dt: float = MAX_DT):
+        self.max_dt = max_dt
+        self._last  = None
+
+    def tick(self, now: float | None = None) -> float:
+        """Seconds since the previous tick; one reference frame on the first."""
+        now = time.monotonic() if now is None else now
+        if self._last is None:
+            dt = 1.0 / REFERENCE_FPS
+        else:
+            dt = min(max(now - self._last, 0.0), self.max_dt)
+        self._last = now
+        return dt
+
+    def reset(self) -> None:
+        self._last = None
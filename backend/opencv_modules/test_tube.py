@@ -2,18 +2,44 @@ import cv2
 import numpy as np
 import math
 
+from pour_particles import PourRenderer
+from sim_clock import REFERENCE_FPS, ease
+
+# Simulation rates — per second, see sim_clock.py.
+ANGLE_EASE  = 0.1                      # fraction of the tilt gap closed per reference frame
+DRAIN_RATE  = 0.0008 * REFERENCE_FPS   # liquid_level lost per second of pouring
+POUR_ANGLE  = 25                       # display angle (deg) at which liquid flows
+
+
 class TestTube:
-    def __init__(self, x=300, y=300, width=60, height=200):
+    def __init__(self, x=300, y=300, width=60, height=200, scale=1.0,
+                 pour_renderer=None):
         self.x = x
         self.y = y
         self.width = width
         self.height = height
+        # Pixels per reference (640x480) pixel — see scene.py.  Every hard-coded
+        # pixel offset below goes through _px() so the tube looks the same at
+        # any render resolution.
+        self.scale = scale
         self.liquid_level = 0.7
         self.liquid_color = (200, 200, 255)
         self.display_angle = 0
         self.current_angle = 0
         self.is_pouring = False
         self.MAX_ANGLE = 90
+        self.sim_time = 0.0         # seconds simulated; drives the drop animation
+        # Animated drops + splash; switched off by the server under load.
+        self.show_particles = True
+        self.pour_renderer = pour_renderer or PourRenderer()
+
+    def _px(self, v):
+        return max(1, int(round(v * self.scale)))
+
+    def relocate(self, x, y, width, height, scale):
+        """Move/resize to a new render resolution, keeping simulation state."""
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.scale = scale
 
     def set_angle(self, angle):
         if angle is None:
@@ -24,20 +50,23 @@ class TestTube:
         self.current_angle = min(angle, self.MAX_ANGLE)
         self.is_pouring = self.current_angle > 40
 
-    def draw(self, frame):
-        self.display_angle += (self.current_angle - self.display_angle) * 0.1
+    def step(self, dt):
+        """Advance tilt, pouring and drain by *dt* seconds.  Draws nothing."""
+        self.sim_time += dt
+        self.display_angle += (self.current_angle - self.display_angle) * ease(ANGLE_EASE, dt)
 
         # Lower threshold — starts pouring at 25 degrees instead of 40
-        if self.display_angle > 25 and self.liquid_level > 0:
+        if self.display_angle > POUR_ANGLE and self.liquid_level > 0:
             self.is_pouring = True
-            self.liquid_level -= 0.0008
-            self.liquid_level = max(0, self.liquid_level)
+            self.liquid_level = max(0, self.liquid_level - DRAIN_RATE * dt)
         else:
             self.is_pouring = False
 
+    def draw(self, frame):
+        """Render the current state; call step() first to advance it."""
         frame = self._draw_rotated(frame)
 
-        if self.display_angle > 25 and self.liquid_level > 0:
+        if self.display_angle > POUR_ANGLE and self.liquid_level > 0:
             self._draw_pouring_effect(frame)
 
         return frame
@@ -71,16 +100,16 @@ class TestTube:
 
         cv2.ellipse(frame,
                     (self.x + self.width // 2, self.y + self.height),
-                    (self.width // 2, 12),
+                    (self.width // 2, self._px(12)),
                     0, 0, 180,
-                    (100, 100, 100), 3)
+                    (100, 100, 100), self._px(3))
 
     def _draw_liquid_with_gravity(self, frame):
         # Negate angle so surface slopes OPPOSITE to tube tilt (stays horizontal in world)
         angle_rad = math.radians(-self.display_angle)
 
-        tube_left  = self.x + 3
-        tube_right = self.x + self.width - 3
+        tube_left  = self.x + self._px(3)
+        tube_right = self.x + self.width - self._px(3)
         tube_bottom = self.y + self.height
         tube_top    = self.y
 
@@ -131,13 +160,13 @@ class TestTube:
         for x in range(tube_left, tube_right):
             y_surface = int(surface_center_y - (x - cx) * surface_slope)
             if tube_top < y_surface < tube_bottom:
-                cv2.circle(frame, (x, y_surface), 1, (220, 220, 255), -1)
+                cv2.circle(frame, (x, y_surface), self._px(1), (220, 220, 255), -1)
 
     def _fill_rounded_bottom(self, frame):
         if self.liquid_level > 0:
             cv2.ellipse(frame,
                         (self.x + self.width // 2, self.y + self.height),
-                        (self.width // 2 - 3, 10),
+                        (self.width // 2 - self._px(3), self._px(10)),
                         0, 0, 180,
                         self.liquid_color, -1)
 
@@ -145,15 +174,14 @@ class TestTube:
         cv2.rectangle(frame,
                       (self.x, self.y),
                       (self.x + self.width, self.y + self.height),
-                      (80, 80, 80), 3)
-        shine_x = self.x + 5
+                      (80, 80, 80), self._px(3))
+        shine_x = self.x + self._px(5)
         cv2.line(frame,
-                 (shine_x, self.y + 10),
-                 (shine_x, self.y + self.height - 20),
-                 (180, 180, 180), 2)
+                 (shine_x, self.y + self._px(10)),
+                 (shine_x, self.y + self.height - self._px(20)),
+                 (180, 180, 180), self._px(2))
 
     def _draw_pouring_effect(self, frame):
-        import time
         angle_rad = math.radians(self.display_angle)
         pivot_x = self.x + self.width // 2
         pivot_y = self.y
@@ -169,60 +197,7 @@ class TestTube:
                     + mouth_offset_x * math.sin(angle_rad)
                     + mouth_offset_y * math.cos(angle_rad))
 
-        # ---- 3D STREAM using bezier curve with gravity ----
-        # Control point curves the stream downward naturally
-        ctrl_x = stream_x - 20
-        ctrl_y = stream_y + 50
-        end_x  = stream_x - 45
-        end_y  = stream_y + 130
-
-        # Draw stream as thick bezier with 3D shading (light center, dark edges)
-        steps = 30
-        prev_x, prev_y = stream_x, stream_y
-
-        for i in range(1, steps + 1):
-            t = i / steps
-            # Quadratic bezier
-            bx = int((1-t)**2 * stream_x + 2*(1-t)*t * ctrl_x + t**2 * end_x)
-            by = int((1-t)**2 * stream_y + 2*(1-t)*t * ctrl_y + t**2 * end_y)
-
-            # Stream gets narrower as it falls (tapers)
-            width = max(1, int(6 * (1 - t * 0.6)))
-
-            # 3D shading: draw dark outer, then bright core
-            dark_color  = tuple(int(c * 0.6) for c in self.liquid_color)
-            bright_color = tuple(min(255, int(c * 1.2)) for c in self.liquid_color)
-
-            cv2.line(frame, (prev_x, prev_y), (bx, by), dark_color, width + 2)
-            cv2.line(frame, (prev_x, prev_y), (bx, by), self.liquid_color, width)
-            cv2.line(frame, (prev_x, prev_y), (bx, by), bright_color, max(1, width - 2))
-
-            prev_x, prev_y = bx, by
-
-        # ---- ANIMATED DROPS with 3D sphere shading ----
-        t_now = time.time()
-        for i in range(5):
-            # Each drop has a phase offset so they fall at different times
-            phase = (t_now * 2 + i * 0.4) % 1.0
-
-            drop_x = end_x + int(math.sin(phase * math.pi) * 5) - i * 3
-            drop_y = end_y + int(phase * 80)
-            radius = max(2, 7 - i)
-
-            # 3D sphere effect: dark base, liquid color mid, bright highlight
-            dark_color   = tuple(int(c * 0.5) for c in self.liquid_color)
-            bright_color = tuple(min(255, int(c * 1.3)) for c in self.liquid_color)
-
-            cv2.circle(frame, (drop_x, drop_y), radius, dark_color, -1)
-            cv2.circle(frame, (drop_x, drop_y), max(1, radius - 1), self.liquid_color, -1)
-            # Highlight dot (top-left of sphere = light source)
-            cv2.circle(frame, (drop_x - radius//3, drop_y - radius//3),
-                    max(1, radius // 3), bright_color, -1)
-
-        # ---- SPLASH at the bottom ----
-        splash_y = end_y + 85
-        for i in range(6):
-            splash_angle = math.radians(180 + i * 30)
-            sx = int(end_x + math.cos(splash_angle) * (8 + i * 2))
-            sy = int(splash_y + math.sin(splash_angle) * 4)
-            cv2.circle(frame, (sx, sy), 2, self.liquid_color, -1)
\ No newline at end of file
+        # Bezier stream, animated drops and splash — see pour_particles.py
+        self.pour_renderer.draw(frame, (stream_x, stream_y), self.scale,
+                                self.liquid_color, self.sim_time,
+                                particles=self.show_particles)
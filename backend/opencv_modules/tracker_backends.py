@@ -0,0 +1,250 @@
+# opencv_modules/tracker_backends.py
+"""
+tracker_backends.py — Interchangeable hand-detection backends for HandTracker.
+
+Every backend turns a BGR frame into a Detection (or None when no hand is
+visible) with the same fields:
+
+    landmarks    (21, 3) float32 array of normalised x, y, z (MediaPipe's
+                 layout), or None for backends that do not produce landmarks
+    bbox         (x0, y0, x1, y1), normalised
+    confidence   0..1
+    wrist, tip   normalised (x, y) points whose direction HandTracker turns
+                 into the tilt angle — landmarks 0 and 12 when available
+
+Backends
+--------
+solutions    mp.solutions.hands.Hands, synchronous — the original tracker.
+tasks        MediaPipe Tasks HandLandmarker in LIVE_STREAM mode.  detect()
+             submits the frame and returns immediately with the newest
+             finished result, so inference never blocks the frame path
+             (results lag by about one frame).  Needs the
+             hand_landmarker.task model file (*model_path*).
+contour      No ML: skin-colour mask in YCrCb on a downscaled frame, largest
+             blob, principal axis from image moments.  Around a millisecond
+             per frame — a fallback for overloaded servers; it is fooled by
+             faces and skin-coloured backgrounds.
+
+create_backend(name, **options) builds one by name; HandTracker does that.
+"""
+
+import math
+import threading
+import time
+
+import cv2
+import numpy as np
+
+WRIST, MIDDLE_TIP = 0, 12
+
+
+class Detection:
+
+    __slots__ = ("landmarks", "bbox", "confidence", "wrist", "tip", "raw")
+
+    def __init__(self, landmarks, bbox, confidence, wrist, tip, raw=None):
+        self.landmarks  = landmarks
+        self.bbox       = bbox
+        self.confidence = confidence
+        self.wrist      = wrist
+        self.tip        = tip
+        self.raw        = raw          # backend-specific, for draw()
+
+    @classmethod
+    def from_landmarks(cls, points, confidence, raw=None):
+        """From an iterable of MediaPipe landmarks (anything with .x .y .z)."""
+        landmarks = np.array([(p.x, p.y, p.z) for p in points], dtype=np.float32)
+        (x0, y0), (x1, y1) = landmarks[:, :2].min(axis=0), landmarks[:, :2].max(axis=0)
+        return cls(landmarks, (float(x0), float(y0), float(x1), float(y1)), confidence,
+                   landmarks[WRIST, :2], landmarks[MIDDLE_TIP, :2], raw)
+
+
+class TrackerBackend:
+    """Interface; subclasses implement detect() and may override draw() / close()."""
+
+    name = "base"
+
+    def detect(self, frame):
+        """Detection for the first hand in the BGR *frame*, or None."""
+        raise NotImplementedError
+
+    def draw(self, frame, detection) -> None:
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = detection.bbox
+        cv2.rectangle(frame, (int(x0 * w), int(y0 * h)), (int(x1 * w), int(y1 * h)),
+                      (0, 200, 255), 1)
+        if detection.landmarks is not None:
+            for x, y, _ in detection.landmarks:
+                cv2.circle(frame, (int(x * w), int(y * h)), 3, (0, 255, 0), -1)
+
+    def close(self) -> None:
+        pass
+
+
+# ── MediaPipe Solutions (original) ────────────────────────────────────────────
+
+class SolutionsBackend(TrackerBackend):
+
+    name = "solutions"
+
+    def __init__(self, max_hands=1, detection_confidence=0.5, tracking_confidence=0.5,
+                 static_image_mode=False, **_):
+        import mediapipe as mp
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw  = mp.solutions.drawing_utils
+        self.hands    = self.mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_hands,
+            min_detection_confidence=detection_confidence,
+            min_tracking_confidence=tracking_confidence,
+        )
+
+    def detect(self, frame):
+        results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return None
+        hand  = results.multi_hand_landmarks[0]
+        score = (results.multi_handedness[0].classification[0].score
+                 if results.multi_handedness else 1.0)
+        return Detection.from_landmarks(hand.landmark, score, raw=hand)
+
+    def draw(self, frame, detection) -> None:
+        self.mp_draw.draw_landmarks(frame, detection.raw, self.mp_hands.HAND_CONNECTIONS)
+
+    def close(self) -> None:
+        self.hands.close()
+
+
+# ── MediaPipe Tasks, live-stream ──────────────────────────────────────────────
+
+class TasksLiveBackend(TrackerBackend):
+
+    name = "tasks"
+
+    def __init__(self, model_path=None, max_hands=1, detection_confidence=0.5,
+                 tracking_confidence=0.5, **_):
+        import mediapipe as mp
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        if not model_path:
+            raise ValueError("the 'tasks' tracker needs model_path (hand_landmarker.task)")
+        self._mp     = mp
+        self._lock   = threading.Lock()
+        self._latest = None
+        self._last_ts = 0
+        self._connections = mp.solutions.hands.HAND_CONNECTIONS
+
+        options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=str(model_path)),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_hands,
+            min_hand_detection_confidence=detection_confidence,
+            min_tracking_confidence=tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _on_result(self, result, _image, _timestamp_ms) -> None:
+        detection = None
+        if result.hand_landmarks:
+            hand  = result.hand_landmarks[0]
+            score = result.handedness[0][0].score if result.handedness else 1.0
+            detection = Detection.from_landmarks(hand, score)
+        with self._lock:
+            self._latest = detection
+
+    def detect(self, frame):
+        # Timestamps must strictly increase, even for frames in the same ms.
+        ts = max(int(time.monotonic() * 1000), self._last_ts + 1)
+        self._last_ts = ts
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.landmarker.detect_async(self._mp.Image(image_format=self._mp.ImageFormat.SRGB,
+                                                    data=rgb), ts)
+        with self._lock:
+            return self._latest
+
+    def draw(self, frame, detection) -> None:
+        h, w = frame.shape[:2]
+        pts  = [(int(x * w), int(y * h)) for x, y, _ in detection.landmarks]
+        for a, b in self._connections:
+            cv2.line(frame, pts[a], pts[b], (255, 255, 255), 2)
+        for p in pts:
+            cv2.circle(frame, p, 3, (0, 0, 255), -1)
+
+    def close(self) -> None:
+        self.landmarker.close()
+
+
+# ── Skin-colour contour fallback ──────────────────────────────────────────────
+
+class ContourBackend(TrackerBackend):
+
+    name = "contour"
+
+    # YCrCb skin range; works across skin tones under indoor light.
+    SKIN_LOW   = np.array((0, 133, 77), dtype=np.uint8)
+    SKIN_HIGH  = np.array((255, 173, 127), dtype=np.uint8)
+    WORK_WIDTH = 160          # frame is downscaled to this width first
+    MIN_AREA   = 0.02         # blob must cover this share of the frame
+
+    def __init__(self, **_):
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+    def detect(self, frame):
+        h, w  = frame.shape[:2]
+        scale = self.WORK_WIDTH / w
+        small = cv2.resize(frame, (self.WORK_WIDTH, max(1, int(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+        mask  = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb),
+                            self.SKIN_LOW, self.SKIN_HIGH)
+        mask  = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+        blob = max(contours, key=cv2.contourArea)
+        sh, sw = mask.shape
+        area   = cv2.contourArea(blob)
+        if area < self.MIN_AREA * sw * sh:
+            return None
+
+        m  = cv2.moments(blob)
+        cx, cy = m["m10"] / m["m00"], m["m01"] / m["m00"]
+        mu20, mu02, mu11 = m["mu20"] / m["m00"], m["mu02"] / m["m00"], m["mu11"] / m["m00"]
+        theta  = 0.5 * math.atan2(2 * mu11, mu20 - mu02)            # major axis
+        spread = math.sqrt(max(mu20, mu02, 1e-6))
+        vx, vy = math.cos(theta), math.sin(theta)
+        if vy > 0:                  # point the axis up, from wrist toward fingers
+            vx, vy = -vx, -vy
+
+        hull     = cv2.convexHull(blob)
+        solidity = area / max(cv2.contourArea(hull), 1e-6)
+        x, y, bw, bh = cv2.boundingRect(blob)
+        return Detection(
+            None,
+            (x / sw, y / sh, (x + bw) / sw, (y + bh) / sh),
+            round(min(1.0, solidity * area / (0.1 * sw * sh)), 2),
+            ((cx - vx * spread) / sw, (cy - vy * spread) / sh),
+            ((cx + vx * 2 * spread) / sw, (cy + vy * 2 * spread) / sh),
+        )
+
+    def draw(self, frame, detection) -> None:
+        super().draw(frame, detection)
+        h, w = frame.shape[:2]
+        (wx, wy), (tx, ty) = detection.wrist, detection.tip
+        cv2.arrowedLine(frame, (int(wx * w), int(wy * h)), (int(tx * w), int(ty * h)),
+                        (0, 255, 255), 2)
+
+
+BACKENDS = {cls.name: cls for cls in (SolutionsBackend, TasksLiveBackend, ContourBackend)}
+
+
+def create_backend(name: str = "solutions", **options) -> TrackerBackend:
+    """Build a backend by name; raises ValueError for an unknown name."""
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown tracker backend {name!r} "
+                         f"(choose from {', '.join(BACKENDS)})") from None
+    return cls(**options)
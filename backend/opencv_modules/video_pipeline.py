@@ -0,0 +1,142 @@
+# opencv_modules/video_pipeline.py
+"""
+video_pipeline.py — Threaded capture → process → display for the kiosk demo.
+
+In the single-loop demo every iteration waits for cap.read(), then tracks and
+draws, then blocks in imshow / waitKey, so camera I/O latency adds straight
+onto processing time and the loop runs well below the camera's frame rate.
+
+The threaded mode splits that into three independent cadences:
+
+    FrameGrabber thread   cap.read() as fast as the camera delivers, keeping
+                          only the NEWEST frame (older ones are dropped)
+    process thread        tracks / simulates / draws the newest frame, then
+                          publishes the result to a one-slot LatestSlot
+    main thread           shows the newest processed frame at the display
+                          rate — HighGUI must stay on the main thread
+
+RateMeter and draw_perf_overlay() give the on-screen fps / latency readout
+for both the threaded and the serial mode.
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class LatestSlot:
+    """One-item, overwrite-on-put hand-off between threads."""
+
+    def __init__(self):
+        self._cond    = threading.Condition()
+        self._item    = None
+        self._seq     = 0
+        self._taken   = True
+        self.dropped  = 0        # items overwritten before anyone took them
+        self.closed   = False
+
+    def put(self, item) -> None:
+        with self._cond:
+            if not self._taken:
+                self.dropped += 1
+            self._item  = item
+            self._seq  += 1
+            self._taken = False
+            self._cond.notify_all()
+
+    def get_newer(self, seq: int, timeout: float | None = None):
+        """
+        Wait for an item newer than *seq*.  Returns ``(item, seq)``, or
+        ``(None, seq)`` on timeout or once closed.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq or self.closed, timeout)
+            if self._seq > seq:
+                self._taken = True
+                return self._item, self._seq
+            return None, seq
+
+    def peek(self):
+        with self._cond:
+            return self._item, self._seq
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FrameGrabber:
+    """Background cap.read() loop; ``slot`` always holds the newest (frame, t_capture)."""
+
+    def __init__(self, cap):
+        self.cap     = cap
+        self.slot    = LatestSlot()
+        self.rate    = RateMeter()
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+
+    def start(self) -> "FrameGrabber":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.slot.close()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self.slot.closed:
+            ok, frame = self.cap.read()
+            if not ok:
+                break
+            self.slot.put((frame, time.perf_counter()))
+            self.rate.tick()
+        self.slot.close()
+
+
+class RateMeter:
+    """Events per second and latency percentiles over a sliding window."""
+
+    def __init__(self, window: float = 2.0):
+        self.window    = window
+        self._stamps   = deque()
+        self._latency  = deque(maxlen=120)
+
+    def tick(self, latency: float | None = None) -> None:
+        now = time.perf_counter()
+        self._stamps.append(now)
+        while now - self._stamps[0] > self.window:
+            self._stamps.popleft()
+        if latency is not None:
+            self._latency.append(latency)
+
+    def fps(self) -> float:
+        if len(self._stamps) < 2:
+            return 0.0
+        span = self._stamps[-1] - self._stamps[0]
+        return (len(self._stamps) - 1) / span if span > 0 else 0.0
+
+    def latency_ms(self, pct: float = 50) -> float:
+        if not self._latency:
+            return 0.0
+        ordered = sorted(self._latency)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def draw_perf_overlay(frame, lines, top=56) -> None:
+    """
+    Small translucent readout at the right edge, *top* px down (below the
+    demo's button row); *lines* are strings.
+    """
+    w = frame.shape[1]
+    line_h  = 18
+    box_h   = line_h * len(lines) + 8
+    box_w   = 12 + 8 * max(len(s) for s in lines)
+    x0      = max(0, w - box_w - 8)
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (x0, top), (x0 + box_w, top + box_h), (10, 10, 10), -1)
+    cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+    for i, text in enumerate(lines):
+        cv2.putText(frame, text, (x0 + 6, top + 4 + line_h * (i + 1) - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (120, 255, 160), 1, cv2.LINE_AA)
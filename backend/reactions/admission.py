@@ -0,0 +1,168 @@
+# backend/reactions/admission.py
+"""
+admission.py — CPU-aware admission control for new lab connections.
+
+The lab lock only decides WHO may connect; nothing stopped one process from
+accepting more sessions than its cores can render at the target fps, at which
+point every student's stream degrades together.
+
+AdmissionController keeps overload visible and bounded instead:
+
+  • Cost is measured, not guessed: process CPU time (time.process_time, which
+    includes MediaPipe's own graph threads) divided by frames rendered by the
+    admitted sessions, smoothed with an EWMA.
+  • capacity = floor(cores × LAB_CPU_UTILISATION / (cost × LAB_TARGET_FPS)),
+    never below one session.
+  • A connection over capacity is accepted but parked in a FIFO queue and told
+    {"type": "queued", "position": N}; it is promoted (and told "admitted")
+    as sessions leave or measured cost drops.
+  • When the queue already holds LAB_ADMISSION_QUEUE clients the socket is
+    closed with CLOSE_OVER_CAPACITY.
+
+Only sessions that render in this process are admitted here; with dedicated
+CV workers (LAB_CV_WORKERS > 0) the ASGI process does no vision work.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+CLOSE_OVER_CAPACITY = 4503
+
+ADMITTED = "admitted"
+QUEUED   = "queued"
+REJECTED = "rejected"
+
+_REFRESH_EVERY = 1.0    # seconds between cost re-measurements
+_MIN_FRAMES    = 10     # frames needed in a window before it updates the EWMA
+_EWMA_ALPHA    = 0.3
+
+
+def usable_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:   # macOS / Windows
+        return os.cpu_count() or 1
+
+
+class AdmissionController:
+
+    def __init__(self, target_fps: float, utilisation: float,
+                 initial_cost: float, max_queue: int):
+        self.cores       = usable_cores()
+        self.target_fps  = target_fps
+        self.utilisation = utilisation
+        self.max_queue   = max_queue
+        self.cost        = initial_cost   # CPU seconds per rendered frame
+
+        self._active: dict[str, object]  = {}          # sid → frame-count probe
+        self._queue: OrderedDict         = OrderedDict()  # sid → (on_admit, on_position)
+        self._last_refresh = time.monotonic()
+        self._last_cpu     = time.process_time()
+        self._last_frames  = 0
+        self._rejected     = 0
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def capacity(self) -> int:
+        per_session = self.cost * self.target_fps
+        return max(1, math.floor(self.cores * self.utilisation / per_session))
+
+    def request(self, sid: str, on_admit, on_position) -> str:
+        """
+        Ask to admit *sid*.  Returns ADMITTED, QUEUED or REJECTED.
+
+        When QUEUED, *on_position(position)* is awaited now and whenever the
+        position changes, and *on_admit()* is awaited once capacity frees up.
+        """
+        self.tick()
+        if not self._queue and len(self._active) < self.capacity():
+            self._active[sid] = None
+            return ADMITTED
+        if len(self._queue) >= self.max_queue:
+            self._rejected += 1
+            log.warning("[ADMISSION] rejected %s — active=%d capacity=%d queued=%d",
+                        sid, len(self._active), self.capacity(), len(self._queue))
+            return REJECTED
+        self._queue[sid] = (on_admit, on_position)
+        log.info("[ADMISSION] queued %s at position %d (capacity=%d)",
+                 sid, len(self._queue), self.capacity())
+        asyncio.get_running_loop().create_task(on_position(len(self._queue)))
+        return QUEUED
+
+    def observe(self, sid: str, frame_probe) -> None:
+        """Attach a zero-arg callable returning the session's rendered-frame count."""
+        if sid in self._active:
+            self._active[sid] = frame_probe
+
+    def release(self, sid: str) -> None:
+        if self._queue.pop(sid, None) is not None:
+            self._announce_positions()
+            return
+        if sid in self._active:
+            del self._active[sid]
+            self._promote()
+
+    def tick(self) -> None:
+        """Re-measure cost at most once per _REFRESH_EVERY; cheap to call per frame."""
+        now = time.monotonic()
+        if now - self._last_refresh < _REFRESH_EVERY:
+            return
+        self._last_refresh = now
+
+        cpu    = time.process_time()
+        frames = sum(probe() for probe in self._active.values() if probe is not None)
+        d_cpu, d_frames = cpu - self._last_cpu, frames - self._last_frames
+        self._last_cpu, self._last_frames = cpu, frames
+
+        if d_frames >= _MIN_FRAMES:
+            sample    = d_cpu / d_frames
+            self.cost = (1 - _EWMA_ALPHA) * self.cost + _EWMA_ALPHA * sample
+        self._promote()
+
+    def snapshot(self) -> dict:
+        return {
+            "cores":       self.cores,
+            "capacity":    self.capacity(),
+            "active":      len(self._active),
+            "queued":      len(self._queue),
+            "rejected":    self._rejected,
+            "cost_ms":     round(self.cost * 1000, 2),
+            "target_fps":  self.target_fps,
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _promote(self) -> None:
+        promoted = False
+        while self._queue and len(self._active) < self.capacity():
+            sid, (on_admit, _) = self._queue.popitem(last=False)
+            self._active[sid] = None
+            promoted = True
+            log.info("[ADMISSION] admitted %s from queue", sid)
+            asyncio.get_running_loop().create_task(on_admit())
+        if promoted:
+            self._announce_positions()
+
+    def _announce_positions(self) -> None:
+        loop = asyncio.get_running_loop()
+        for position, (_, on_position) in enumerate(self._queue.values(), start=1):
+            loop.create_task(on_position(position))
+
+
+admission = AdmissionController(
+    target_fps   = settings.LAB_TARGET_FPS,
+    utilisation  = settings.LAB_CPU_UTILISATION,
+    initial_cost = settings.LAB_INITIAL_FRAME_COST,
+    max_queue    = settings.LAB_ADMISSION_QUEUE,
+)
+metrics.register("admission", admission.snapshot)
@@ -20,41 +20,81 @@ Layer 1 · WebSocket text messages (primary, zero cross-process risk)
     Frontend → consumer JSON:
         {"type": "set_chemical",  "chemical_id": "HCl"}
         {"type": "set_reaction",  "reaction_type": "blue_litmus"}
+        {"type": "ack",           "frames": 42}    binary frames received (outbound.py)
     Consumer → frontend JSON:
         {"type": "reaction_complete", "reaction_type": "...", "chemical": {...}}
+        {"type": "lab_id", "lab_id": "...", "watch_token": "..."}
+                                                id + token spectators watch with (spectate.py)
 
 Layer 2 · Redis-backed _StateProxy (cross-process coordination)
     Keeps /reactions/status/ REST endpoint consistent across workers.
+
+Frame path
+----------
+The CV work itself lives in LabSession (lab_session.py).  By default each
+frame runs decode → process → encode inline in receive().  With
+LAB_PIPELINED=True the stages overlap across consecutive frames via
+FramePipeline (pipeline.py).  With LAB_CV_WORKERS > 0 the consumer keeps
+no CV state at all and relays frames to a dedicated worker process over the
+channel layer (workers.py), handing decoded frames over through a
+shared-memory FrameRing when both run on the same host (frame_transport.py).
+With LAB_SCHEDULER=True inline frames are offered to the per-process
+fair-share FrameScheduler (scheduler.py) instead of being processed on
+arrival.  With LAB_ADMISSION=True a process only admits as many local
+sessions as its measured CPU budget allows; the rest are queued with their
+position (admission.py).  Under load, QosController (qos.py) moves each
+session through cheaper rendering tiers and the current tier is pushed to the
+browser.  Rendered frames leave through a bounded OutboundQueue
+(outbound.py); while the client is behind, new input frames are skipped
+before any CV work.  fps/latency for every mode are logged on disconnect.
+Whatever the mode, the JPEG sent to the owner is also fanned out unchanged
+to any spectators of the lab (spectate.py).  Staff watching a lab can profile
+its next N frames with a "profile" message (profiling.py), which reaches the
+owner through the lab's control group.  A "set_hud" message
+toggles a per-stage performance HUD, drawn into the frame or sent as JSON.
+A "set_tracker" message switches the session's hand-detection backend
+(opencv_modules/tracker_backends.py), e.g. to the cheap "contour" fallback.
+The simulation state is snapshotted to the cache while the lab runs, and a
+reconnect within LAB_RESUME_GRACE continues from it (resume.py).  A lab
+that stops sending frames releases its tracker and overlay buffers after
+LAB_IDLE_RELEASE seconds and gets them back on its next frame (reaper.py).
+OpenCV / MediaPipe are imported lazily through cv_stack.py, on the first
+lab that needs them (or at startup with LAB_WARMUP=True).
 """
 
-import sys
+import asyncio
 import json
 import logging
-from pathlib import Path
+import time
 
-import cv2
-import numpy as np
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from . import cv_stack, metrics, resume
+from .admission import admission, CLOSE_OVER_CAPACITY, QUEUED, REJECTED
+from .outbound import OutboundQueue
+from .pipeline import FramePipeline, FrameStats
+from .profiling import env_spec
+from .qos import qos, tier_event
+from .reaper import reaper
+from .scheduler import scheduler
+from .spectate import SpectateFanout, control_group, lab_id_for, watch_token
+from .stream_state import state, CHEMICALS
+from .telemetry import NORMAL_CLOSE_CODES, HotLog
+from .workers import worker_channel_for
 
 log = logging.getLogger(__name__)
+hot = HotLog(log)
 
-# ── Dynamic path fix ──────────────────────────────────────────────────────────
-_OPENCV_MODULES = Path(__file__).resolve().parent.parent / 'opencv_modules'
-if str(_OPENCV_MODULES) not in sys.path:
-    sys.path.insert(0, str(_OPENCV_MODULES))
-# ─────────────────────────────────────────────────────────────────────────────
-
-from hand_tracker import HandTracker
-from test_tube import TestTube
-from litmus_paper import LitmusPaper
-from reaction_engine import (
-    CHEMICAL_COLORS,
-    REACTION_RESULT_COLOR,
-    apply_paper_init,
-    get_pour_coordinates,
-    is_reactive_pair,           # check_hit intentionally NOT imported — see docstring
-)
-from .stream_state import state, CHEMICALS
+# A remote frame whose result has not come back after this long is assumed
+# lost (worker restarted), so the next frame is forwarded anyway.
+REMOTE_FRAME_TIMEOUT = 2.0
+
+HUD_MODES    = ("off", "frame", "json")
+HUD_INTERVAL = 0.5     # seconds between HUD updates
+
+# opencv_modules/tracker_backends.BACKENDS, without importing the CV stack.
+TRACKER_BACKENDS = ("solutions", "tasks", "contour")
 
 
 class LabConsumer(AsyncWebsocketConsumer):
@@ -75,40 +115,183 @@ class LabConsumer(AsyncWebsocketConsumer):
                 return
 
         await self.accept()
+        self.session_key = session_key
+
+        # Rendered frames go out through a bounded queue (outbound.py).
+        self.outbound = OutboundQueue(self.channel_name, self._write_frame,
+                                      settings.LAB_OUTBOUND_MAX_BYTES)
+
+        # ── Spectators (spectate.py) ──────────────────────────────────────────
+        self.lab_id   = lab_id_for(session_key or self.channel_name)
+        self.spectate = SpectateFanout(self.channel_layer, self.lab_id)
+        # Staff-only controls (e.g. profiling) addressed to this lab by id.
+        await self.channel_layer.group_add(control_group(self.lab_id), self.channel_name)
+        await self.send(text_data=json.dumps({"type": "lab_id", "lab_id": self.lab_id,
+                                              "watch_token": watch_token(self.lab_id)}))
 
         # ── Per-connection state (Layer 1) ────────────────────────────────────
         # Updated by WebSocket text messages — no cross-process reads needed.
-        self.chemical_id   = state.get("chemical_id")
-        self.chemical_type = state.get("chemical_type", "neutral")
+        self.chemical_id      = state.get("chemical_id")
+        self.chemical_type    = state.get("chemical_type", "neutral")
+        self.current_reaction = state.get("reaction_type") or "red_litmus"
+        self.render_size      = settings.LAB_RENDER_SIZE
+        self.hud_mode         = "off"
+        self.tracker          = settings.LAB_TRACKER
+        self._hud_at          = 0.0
+        self._remote_hud      = {}     # last hud_snapshot() from the CV worker
+        self._resume          = None   # resume.py record to continue from
+        self._resumed_chem    = None   # first matching set_chemical is a no-op
+        await self._load_resume()
+
+        self.stats     = FrameStats()
+        self.lab       = None
+        self.pipeline  = None
+        self.scheduled = False
+
+        self.worker_channel = None
+        self._inflight_t    = None   # frame_in() timestamp of the remote frame
+        self._pending_frame = None   # newest frame waiting for the worker
+        self.ring           = None   # shared-memory hand-off to the worker
+
+        if getattr(settings, "LAB_CV_WORKERS", 0) > 0:
+            self.worker_channel = worker_channel_for(session_key or self.channel_name)
+            if getattr(settings, "LAB_SHM_TRANSPORT", False):
+                try:
+                    # NumPy / OpenCV only — MediaPipe stays unloaded here.
+                    frame_transport = await cv_stack.aload("reactions.frame_transport")
+                    self.ring = frame_transport.FrameRing.create(settings.LAB_SHM_SLOTS)
+                except (OSError, RuntimeError) as exc:
+                    log.info("[CONNECT] shared memory unavailable (%s) — using bytes", exc)
+            await self._open_remote()
+            self._log_connect()
+            return
+
+        # Cold import off the event loop, unless LAB_WARMUP already did it.
+        await cv_stack.aload()
 
-        reaction_type         = state.get("reaction_type") or "red_litmus"
-        self.current_reaction = reaction_type
-        self.reaction_triggered = False
-        self._frame_count       = 0
+        if getattr(settings, "LAB_ADMISSION", False):
+            decision = admission.request(self.channel_name, self._admitted_from_queue,
+                                         self._send_queue_position)
+            if decision == REJECTED:
+                await self.close(code=CLOSE_OVER_CAPACITY)
+                return
+            if decision == QUEUED:
+                return
 
-        # ── OpenCV objects ────────────────────────────────────────────────────
-        self.tracker = HandTracker()
-        self.tube    = TestTube(x=350, y=150, width=60, height=200)
-        self.paper   = LitmusPaper(x=310, y=420, width=90, height=130)
-        apply_paper_init(self.paper, self.current_reaction)
+        self._start_local()
+        self._log_connect()
 
+    async def _load_resume(self) -> None:
+        """Pick up the snapshot a dropped connection of this lab left behind."""
+        record = await resume.afetch(self.lab_id)
+        if record is None:
+            return
+        try:
+            snap, chemical_id = resume.unpack(record)
+        except ValueError as exc:
+            log.warning("[RESUME] lab=%s: ignoring snapshot (%s)", self.lab_id, exc)
+            return
+        self._resume          = record
+        self._resumed_chem    = chemical_id
+        self.chemical_id      = chemical_id
+        self.chemical_type    = snap["chemical_type"]
+        self.current_reaction = snap["reaction_type"]
+        state["chemical_id"]            = chemical_id
+        state["chemical_type"]          = snap["chemical_type"]
+        state["reaction_complete_flag"] = snap["reacted"]
+        await self.send(text_data=json.dumps(resume.resumed_event(snap, chemical_id)))
+
+    def _start_local(self) -> None:
+        """Build the in-process CV session once the connection is admitted."""
+        LabSession = cv_stack.load().LabSession     # already imported by connect()
+        self.lab = LabSession(self.chemical_id, self.chemical_type,
+                              self.current_reaction, self.render_size, self.tracker)
+        self.lab.recorder.label = f"lab {self.lab_id}"
+        if self._resume is not None:
+            resume.restore_into(self.lab, self._resume, f"lab {self.lab_id}")
+        if resume.enabled():
+            self.lab.resume = resume.SnapshotWriter(self.lab_id)
+        spec = env_spec()
+        if spec:
+            self.lab.start_profile({**spec, "label": self.lab_id})
+        admission.observe(self.channel_name, lambda: self.lab.frame_count)
+        qos.register(self.channel_name, self.lab, on_change=self._send_qos)
+        reaper.register(self.channel_name, self.lab)
+
+        if getattr(settings, "LAB_PIPELINED", False):
+            self.pipeline = FramePipeline(
+                self.lab, self._send_frame, self._notify_reaction, self.stats,
+            )
+            self.pipeline.start()
+        elif getattr(settings, "LAB_SCHEDULER", False):
+            self._frame_lock = asyncio.Lock()
+            scheduler.register(self.channel_name, self._run_scheduled,
+                               on_cap_change=self._send_fps_cap)
+            self.scheduled = True
+
+    def _log_connect(self) -> None:
         log.info(
-            "[CONNECT] session=%s  reaction=%s  chemical=%s(%s)",
-            session_key, self.current_reaction,
+            "[CONNECT] session=%s  reaction=%s  chemical=%s(%s)  "
+            "pipelined=%s  scheduled=%s  worker=%s  shm=%s",
+            self.session_key, self.current_reaction,
             self.chemical_id, self.chemical_type,
+            self.pipeline is not None, self.scheduled, self.worker_channel,
+            self.ring is not None,
         )
 
+    async def _admitted_from_queue(self) -> None:
+        if getattr(self, "_closed", False):
+            return   # client gave up between promotion and this callback
+        self._start_local()
+        self._log_connect()
+        await self.send(text_data=json.dumps({"type": "admitted"}))
+
+    async def _send_queue_position(self, position: int) -> None:
+        await self.send(text_data=json.dumps({
+            "type":     "queued",
+            "position": position,
+            "capacity": admission.capacity(),
+        }))
+
     async def disconnect(self, close_code):
+        self._closed = True
+        lab   = getattr(self, "lab", None)
+        stats = getattr(self, "stats", None)
         log.info(
-            "[DISCONNECT] code=%s  frames=%s  reaction_triggered=%s",
+            "[DISCONNECT] code=%s  frames=%s  idle=%s  reaction_triggered=%s  stats=%s",
             close_code,
-            getattr(self, "_frame_count", "?"),
-            getattr(self, "reaction_triggered", "?"),
+            lab.frame_count if lab else "?",
+            f"{lab.idle_ratio():.0%}" if lab else "?",
+            lab.reaction_triggered if lab else "?",
+            stats.summary() if stats else "?",
         )
-        try:
-            self.tracker.close()
-        except Exception:
-            pass
+        if getattr(self, "pipeline", None) is not None:
+            await self.pipeline.close()    # returns once no stage thread uses the lab
+        admission.release(self.channel_name)
+        qos.unregister(self.channel_name)
+        reaper.unregister(self.channel_name)
+        if getattr(self, "scheduled", False):
+            scheduler.unregister(self.channel_name)
+            # Wait for a frame already handed to a thread before closing MediaPipe.
+            async with self._frame_lock:
+                pass
+        if lab is not None:
+            abnormal = close_code not in NORMAL_CLOSE_CODES
+            if abnormal:
+                lab.recorder.dump(f"disconnect code={close_code}", force=True)
+            lab.close(keep_snapshot=abnormal)
+        if getattr(self, "worker_channel", None):
+            await self.channel_layer.send(self.worker_channel, {
+                "type": "lab.close", "session": self.channel_name, "code": close_code,
+            })
+        if getattr(self, "ring", None) is not None:
+            self.ring.close()
+            self.ring = None
+        if getattr(self, "outbound", None) is not None:
+            await self.outbound.close()
+        if getattr(self, "spectate", None) is not None:
+            await self.channel_layer.group_discard(control_group(self.lab_id), self.channel_name)
+            await self.spectate.close()
 
     # ── Message routing ───────────────────────────────────────────────────────
 
@@ -130,23 +313,39 @@ class LabConsumer(AsyncWebsocketConsumer):
 
         msg_type = msg.get("type")
 
-        if msg_type == "set_chemical":
+        if msg_type == "ack":
+            try:
+                self.outbound.ack(int(msg.get("frames") or 0))
+            except (TypeError, ValueError):
+                log.warning("[TEXT] Bad ack: %r", msg)
+
+        elif msg_type == "set_chemical":
             chemical_id = msg.get("chemical_id", "").strip()
             chem = CHEMICALS.get(chemical_id)
             if not chem:
                 log.warning("[TEXT] Unknown chemical_id: %r", chemical_id)
                 return
 
-            # Update per-connection state immediately — this is the fix.
-            self.chemical_id            = chemical_id
-            self.chemical_type          = chem["type"]
-            self.reaction_triggered     = False   # allow a new reaction
+            if chemical_id == self._resumed_chem:
+                # The browser re-sending its selection after a reconnect —
+                # applying it would clear the restored reaction.
+                self._resumed_chem = None
+                log.info("[TEXT] set_chemical → %s (kept from snapshot)", chemical_id)
+                return
+            self._resumed_chem = None
+
+            # Update per-connection state before the next frame — this is the fix.
+            self.chemical_id   = chemical_id
+            self.chemical_type = chem["type"]
+            await self._apply_control("set_chemical", chemical_id)
 
             # Keep Layer 2 (Redis) in sync for the REST /status/ endpoint.
             state["chemical_id"]            = chemical_id
             state["chemical_type"]          = chem["type"]
             state["reaction_complete_flag"] = False
 
+            await self.spectate.event({"type": "set_chemical",
+                                       "chemical": {"id": chemical_id, **chem}})
             log.info("[TEXT] set_chemical → %s (%s)", chemical_id, chem["type"])
 
         elif msg_type == "set_reaction":
@@ -155,141 +354,261 @@ class LabConsumer(AsyncWebsocketConsumer):
                 log.warning("[TEXT] Invalid reaction_type: %r", reaction_type)
                 return
 
-            if reaction_type != self.current_reaction:
-                self.current_reaction   = reaction_type
-                self.reaction_triggered = False
-                apply_paper_init(self.paper, reaction_type)
-                log.info("[TEXT] set_reaction → %s", reaction_type)
+            self.current_reaction = reaction_type
+            await self._apply_control("set_reaction", reaction_type)
+            await self.spectate.event({"type": "set_reaction", "reaction_type": reaction_type})
+            log.info("[TEXT] set_reaction → %s", reaction_type)
+
+        elif msg_type == "set_render_size":
+            # {"type": "set_render_size", "width": 320, "height": 240}; 0 / missing
+            # resets to the incoming frame size.
+            try:
+                size = (int(msg.get("width") or 0), int(msg.get("height") or 0))
+            except (TypeError, ValueError):
+                log.warning("[TEXT] Bad render size: %r", msg)
+                return
+            if size == (0, 0):
+                size = None
+            elif not all(lo <= v <= hi for v, lo, hi in
+                         zip(size, settings.LAB_RENDER_MIN, settings.LAB_RENDER_MAX)):
+                log.warning("[TEXT] Render size out of range: %r", size)
+                return
+
+            self.render_size = size
+            await self._apply_control("set_render_size", size)
+            log.info("[TEXT] set_render_size → %s", size or "input")
+
+        elif msg_type == "set_hud":
+            # {"type": "set_hud", "mode": "off" | "frame" | "json"}
+            mode = msg.get("mode", "off")
+            if mode not in HUD_MODES:
+                log.warning("[TEXT] Invalid HUD mode: %r", mode)
+                return
+            self.hud_mode = mode
+            await self._apply_control("set_hud", mode)
+            log.info("[TEXT] set_hud → %s", mode)
+
+        elif msg_type == "set_tracker":
+            # {"type": "set_tracker", "tracker": "solutions" | "tasks" | "contour"}
+            name = msg.get("tracker", "")
+            if name not in TRACKER_BACKENDS:
+                log.warning("[TEXT] Invalid tracker: %r", name)
+                return
+            self.tracker = name
+            await self._apply_control("set_tracker", name)
+            log.info("[TEXT] set_tracker → %s", name)
 
         else:
-            log.debug("[TEXT] Unknown message type: %r", msg_type)
+            hot.debug("TEXT", unknown_type=msg_type)
+
+    async def lab_profile(self, message):
+        """Channel-layer handler: a staff spectator asked to profile this lab."""
+        await self._apply_control("start_profile", {
+            "mode": message["mode"], "frames": message["frames"], "label": self.lab_id,
+        })
+
+    async def _apply_control(self, op: str, value) -> None:
+        if self.worker_channel:
+            await self.channel_layer.send(self.worker_channel, {
+                "type": "lab.control", "session": self.channel_name,
+                "op": op, "value": value,
+            })
+        elif self.lab is not None:
+            self.lab.defer(getattr(self.lab, op), value)
+        # Still queued for admission: _start_local() picks up self.chemical_*.
 
     # ── Video frame handler ───────────────────────────────────────────────────
 
     async def _handle_video_frame(self, bytes_data: bytes) -> None:
-        np_arr = np.frombuffer(bytes_data, dtype=np.uint8)
-        frame  = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        if frame is None:
-            log.warning("[FRAME] cv2.imdecode returned None — corrupt JPEG?")
+        metrics.maybe_publish()
+        if self.outbound.behind():
+            # Client hasn't drained the last frame — rendering this one would
+            # only be thrown away, so skip decode / process / encode entirely.
+            self.outbound.skip()
+            self.stats.frame_dropped()
+            return
+        if self.worker_channel:
+            await self._forward_frame(bytes_data)
+            return
+        if self.lab is None:
+            return   # queued for admission — nothing renders yet
+        admission.tick()
+        qos.tick()
+        if self.pipeline is not None:
+            self.pipeline.submit(bytes_data)
             return
 
-        self._frame_count += 1
-        frame = cv2.flip(frame, 1)
-
-        # Read chemical_type from per-connection state (set by WS text message).
-        # Never read state.get("chemical_type") here — that risks the cross-
-        # process isolation bug that was the original root cause.
-        self.tube.liquid_color = CHEMICAL_COLORS.get(
-            self.chemical_type, CHEMICAL_COLORS["neutral"]
-        )
-
-        # ── Hand tracking ─────────────────────────────────────────────────────
-        frame = self.tracker.find_hands(frame)
-        angle = self.tracker.get_hand_angle(frame)
-        self.tube.set_angle(angle)
-
-        frame = self.paper.draw(frame)
-        frame = self.tube.draw(frame)
-
-        # ── Pouring / reaction logic ──────────────────────────────────────────
-        if self.tube.is_pouring and self.tube.liquid_level > 0:
-            end_x, splash_y = get_pour_coordinates(self.tube)
-            self.paper.receive_liquid(end_x, splash_y, self.tube.liquid_color)
-
-            if self._frame_count % 15 == 0:
-                log.debug(
-                    "[POUR] frame=%d  angle=%.1f°  is_pouring=%s  "
-                    "end=(%d,%d)  level=%.2f  chemical=%s(%s)  reaction=%s",
-                    self._frame_count, self.tube.display_angle,
-                    self.tube.is_pouring, end_x, splash_y,
-                    self.tube.liquid_level,
-                    self.chemical_id, self.chemical_type,
-                    self.current_reaction,
-                )
+        t_in = self.stats.frame_in()
+        if self.scheduled:
+            if scheduler.offer(self.channel_name, (t_in, bytes_data)):
+                self.stats.frame_dropped()
+            return
+        await self._process_inline(t_in, bytes_data)
+
+    async def _run_scheduled(self, item) -> None:
+        """FrameScheduler callback — CPU work on a thread so sessions overlap."""
+        t_in, bytes_data = item
+        async with self._frame_lock:
+            await self._process_inline(t_in, bytes_data, offload=True)
+
+    async def _process_inline(self, t_in: float, bytes_data: bytes,
+                              offload: bool = False) -> None:
+        if offload:
+            payload, event = await asyncio.to_thread(self.lab.run_frame, bytes_data)
+        else:
+            payload, event = self.lab.run_frame(bytes_data)
 
-            if not self.reaction_triggered:
-                # ── THE FIX ──────────────────────────────────────────────────
-                # No check_hit here. The working main_demo.py never used it —
-                # it reacted whenever is_pouring=True AND is_reactive_pair=True.
-                # check_hit caused false negatives in the WebSocket path because
-                # the encoded→transmitted→decoded frame shifts end_x/splash_y
-                # just outside the padded bounding box on every frame.
-                reacts = is_reactive_pair(self.current_reaction, self.chemical_type)
-
-                log.debug(
-                    "[REACTION CHECK] frame=%d  is_pouring=True  "
-                    "reacts=%s  chemical=%s(%s)  reaction=%s",
-                    self._frame_count, reacts,
-                    self.chemical_id, self.chemical_type,
-                    self.current_reaction,
-                )
+        if event:
+            await self._notify_reaction(event)
+        if payload is None:
+            self.stats.frame_dropped()
+            return
 
-                if reacts:
-                    await self._trigger_reaction()
+        await self._send_frame(payload)
+        self.stats.frame_out(t_in)
+
+    async def _send_qos(self, tier: int) -> None:
+        await self.send(text_data=json.dumps(tier_event(tier)))
+
+    async def lab_qos(self, message):
+        """Channel-layer handler: a CV worker changed this session's QoS tier."""
+        await self._send_qos(message["tier"])
+
+    async def _send_fps_cap(self, fps: int) -> None:
+        """Tell the browser the scheduler's current cap so it can throttle uploads."""
+        await self.send(text_data=json.dumps({"type": "fps_cap", "fps": fps}))
+
+    async def _send_frame(self, payload: bytes) -> None:
+        self.outbound.put(payload)
+        await self.spectate.frame(payload)   # same bytes — no extra encode
+        if self.hud_mode != "off":
+            await self._update_hud()
+
+    async def _update_hud(self) -> None:
+        """
+        At most every HUD_INTERVAL: push transport stats to the LabSession
+        ("frame" mode draws them), or send the whole HUD as JSON ("json").
+        """
+        now = time.monotonic()
+        if now - self._hud_at < HUD_INTERVAL:
+            return
+        self._hud_at = now
+        stats = {
+            "fps_in":  round(self.stats.fps_in(), 1),
+            "fps_out": round(self.stats.fps(), 1),
+            "dropped": self.stats.dropped,
+            "skipped": self.outbound.skipped,
+        }
+        if self.hud_mode == "frame":
+            await self._apply_control("update_hud", stats)
+        else:
+            lab = self.lab.hud_snapshot() if self.lab is not None else self._remote_hud
+            await self.send(text_data=json.dumps({"type": "hud", **lab, **stats}))
 
-        elif self._frame_count % 30 == 0:
-            log.debug(
-                "[IDLE] frame=%d  is_pouring=%s  level=%.2f  angle=%.1f°  "
-                "chemical=%s  reaction=%s",
-                self._frame_count, self.tube.is_pouring,
-                self.tube.liquid_level, self.tube.display_angle,
-                self.chemical_type, self.current_reaction,
-            )
+    async def _write_frame(self, payload: bytes) -> None:
+        await self.send(bytes_data=payload)
 
-        # ── Reaction-complete banner on frame ─────────────────────────────────
-        if self.reaction_triggered:
-            self._draw_reaction_banner(frame)
+    # ── Remote CV worker (LAB_CV_WORKERS > 0) ─────────────────────────────────
 
-        # ── Encode and send ───────────────────────────────────────────────────
-        _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        await self.send(bytes_data=buffer.tobytes())
+    async def _open_remote(self) -> None:
+        await self.channel_layer.send(self.worker_channel, {
+            "type":          "lab.open",
+            "session":       self.channel_name,
+            "chemical_id":   self.chemical_id,
+            "chemical_type": self.chemical_type,
+            "reaction_type": self.current_reaction,
+            "render_size":   self.render_size,
+            "tracker":       self.tracker,
+            "resume":        self._resume,
+            "lab_id":        self.lab_id,
+            "shm":           self.ring.name if self.ring else None,
+            "shm_slots":     self.ring.slots if self.ring else 0,
+        })
+
+    async def _forward_frame(self, bytes_data: bytes) -> None:
+        stalled = (self._inflight_t is not None and
+                   time.perf_counter() - self._inflight_t > REMOTE_FRAME_TIMEOUT)
+        if self._inflight_t is not None and not stalled:
+            # Worker still busy with our previous frame — keep only the newest.
+            if self._pending_frame is not None:
+                self.stats.frame_dropped()
+            self._pending_frame = bytes_data
+            return
+        if stalled:
+            self.stats.frame_dropped()
+
+        self._inflight_t = self.stats.frame_in()
+        slot    = self.ring.acquire() if self.ring is not None else None
+        message = {"type": "lab.frame", "session": self.channel_name, "frame": bytes_data}
+        if slot is not None:
+            frame_transport = cv_stack.load("reactions.frame_transport")
+            try:
+                seq = await asyncio.to_thread(frame_transport.decode_into,
+                                              self.ring, slot, bytes_data)
+            except frame_transport.FrameTooLarge:
+                # Bigger than a ring slot — this frame goes as bytes.
+                hot.debug("TRANSPORT", oversize=len(bytes_data))
+            else:
+                if seq is None:
+                    self.stats.frame_dropped()
+                    self._inflight_t = None
+                    return
+                message = {"type": "lab.frame", "session": self.channel_name,
+                           "slot": slot, "seq": seq}
+        await self.channel_layer.send(self.worker_channel, message)
+
+    async def lab_result(self, message):
+        """Channel-layer handler for rendered frames coming back from a worker."""
+        if message.get("hud"):
+            self._remote_hud = message["hud"]
+        event = message.get("event")
+        if event and event.get("type") == "lab.reopen":
+            # The worker expired or lost the session; it saved a snapshot on
+            # the way out, so the new one continues from there.  It never read
+            # the slot our frame was in, so that is ours to free.
+            if message.get("slot") is not None and self.ring is not None:
+                self.ring.release(message["slot"])
+            self._resume = await resume.afetch(self.lab_id)
+            await self._open_remote()
+        elif event:
+            await self._notify_reaction(event)
+
+        if message.get("frame") is not None:
+            await self._send_frame(message["frame"])
+            if self._inflight_t is not None:
+                self.stats.frame_out(self._inflight_t)
+        else:
+            self.stats.frame_dropped()
+        self._inflight_t = None
 
-    # ── Reaction trigger ──────────────────────────────────────────────────────
+        if self._pending_frame is not None:
+            data, self._pending_frame = self._pending_frame, None
+            await self._forward_frame(data)
 
-    async def _trigger_reaction(self) -> None:
-        self.reaction_triggered = True
+    async def lab_transport(self, message):
+        """Worker could not attach our FrameRing (different host) — send bytes."""
+        if not message.get("shm") and self.ring is not None:
+            log.info("[TRANSPORT] falling back to bytes for %s", self.channel_name)
+            self.ring.close()
+            self.ring = None
 
-        # Set paper target colour immediately so next paper.draw() picks it up.
-        self.paper.target_color = list(REACTION_RESULT_COLOR[self.current_reaction])
+    # ── Reaction notification ─────────────────────────────────────────────────
 
+    async def _notify_reaction(self, event: dict) -> None:
         # Layer 2: persist flag for REST /status/ endpoint.
         state["reaction_complete_flag"] = True
 
-        chem_meta = None
-        if self.chemical_id and self.chemical_id in CHEMICALS:
-            m = CHEMICALS[self.chemical_id]
-            chem_meta = {
-                "id":      self.chemical_id,
-                "label":   m["label"],
-                "type":    m["type"],
-                "formula": m["formula"],
-            }
-
         log.info(
-            "[REACTION] TRIGGERED ✓  frame=%d  reaction=%s  chemical=%s  "
-            "target_color=%s",
-            self._frame_count, self.current_reaction,
-            self.chemical_id, self.paper.target_color,
+            "[REACTION] TRIGGERED ✓  frame=%s  reaction=%s  chemical=%s",
+            event.get("frame"), event["reaction_type"],
+            (event.get("chemical") or {}).get("id"),
         )
 
         # Push JSON event — frontend reveal banner fires immediately.
-        await self.send(text_data=json.dumps({
+        message = {
             "type":          "reaction_complete",
-            "reaction_type": self.current_reaction,
-            "chemical":      chem_meta,
-        }))
-
-    # ── Drawing helper ────────────────────────────────────────────────────────
-
-    def _draw_reaction_banner(self, frame: np.ndarray) -> None:
-        fh, fw  = frame.shape[:2]
-        by      = fh // 2 - 38
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, by), (fw, by + 68), (8, 8, 8), -1)
-        cv2.addWeighted(overlay, 0.72, frame, 0.28, 0, frame)
-        cv2.putText(frame, "REACTION COMPLETE",
-                    (fw // 2 - 188, by + 46),
-                    cv2.FONT_HERSHEY_DUPLEX, 1.25, (0, 180, 80), 4, cv2.LINE_AA)
-        cv2.putText(frame, "REACTION COMPLETE",
-                    (fw // 2 - 188, by + 46),
-                    cv2.FONT_HERSHEY_DUPLEX, 1.25, (0, 255, 120), 2, cv2.LINE_AA)
\ No newline at end of file
+            "reaction_type": event["reaction_type"],
+            "chemical":      event["chemical"],
+        }
+        await self.send(text_data=json.dumps(message))
+        await self.spectate.event(message)
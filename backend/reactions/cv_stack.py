@@ -0,0 +1,144 @@
+# backend/reactions/cv_stack.py
+"""
+cv_stack.py — Lazy loading, warm-up and import-time report for the CV stack.
+
+NumPy, OpenCV and MediaPipe take seconds and a few hundred MB to import.
+They used to load at module import through config.asgi → routing →
+consumers → lab_session, so every process paid for them: HTTP-only workers,
+`manage.py migrate`, the CV-worker supervisor.
+
+Now nothing outside this module imports them at load time.  Code that needs
+the stack calls
+
+    load("reactions.lab_session")         # blocking, thread-safe, once
+    await aload("reactions.frame_transport")   # same, off the event loop
+
+which imports STACK up to and including that module and records how long
+each step took.  Processes that will host lab sessions can pay the cost at
+startup instead of on the first student's connect: with LAB_WARMUP=True,
+config.asgi calls warm_up_in_background(), which imports everything and runs
+one blank frame through a LabSession (MediaPipe graph, JPEG codec).
+
+report() — per-module import ms, warm-up ms, RSS — is published through
+metrics.py under "cv_stack"; `manage.py cv_startup_report` prints it for a
+cold process.
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+# Import order; each entry is timed on its own, so later entries only count
+# what the earlier ones did not already import.
+STACK = (
+    "numpy",
+    "cv2",
+    "reactions.frame_transport",
+    "mediapipe",
+    "reactions.lab_session",
+)
+
+_OPENCV_MODULES = Path(__file__).resolve().parent.parent / 'opencv_modules'
+
+_lock   = threading.Lock()
+_report = {"import_ms": {}, "warm_up_ms": None, "rss_mb": None}
+
+
+def ensure_path() -> None:
+    """Make the flat opencv_modules/ imports (hand_tracker, scene, …) resolvable."""
+    if str(_OPENCV_MODULES) not in sys.path:
+        sys.path.insert(0, str(_OPENCV_MODULES))
+
+
+def is_loaded(name: str = STACK[-1]) -> bool:
+    return name in _report["import_ms"]
+
+
+def load(name: str = STACK[-1]):
+    """Import STACK up to *name* (once per process) and return that module."""
+    if not is_loaded(name):
+        with _lock:
+            ensure_path()
+            for mod in STACK[:STACK.index(name) + 1]:
+                if mod in _report["import_ms"]:
+                    continue
+                t0 = time.perf_counter()
+                importlib.import_module(mod)
+                _report["import_ms"][mod] = round((time.perf_counter() - t0) * 1000, 1)
+            _report["rss_mb"] = rss_mb()
+            log.info("[CV_STACK] loaded up to %s  %s  rss=%sMB",
+                     name, _report["import_ms"], _report["rss_mb"])
+    return sys.modules[name]
+
+
+async def aload(name: str = STACK[-1]):
+    """load() without blocking the event loop on a cold import."""
+    if is_loaded(name):
+        return sys.modules[name]
+    return await asyncio.to_thread(load, name)
+
+
+# ── Warm-up ───────────────────────────────────────────────────────────────────
+
+def warm_up() -> None:
+    """Import everything and push one blank frame through a LabSession."""
+    if _report["warm_up_ms"] is not None:
+        return
+    t0 = time.perf_counter()
+    lab_session = load()
+    import numpy as np
+    lab = lab_session.LabSession()
+    try:
+        frame, _ = lab.process(np.zeros((480, 640, 3), dtype=np.uint8))
+        lab.encode(frame)
+    finally:
+        lab.close()
+    _report["warm_up_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    _report["rss_mb"]     = rss_mb()
+    log.info("[CV_STACK] warm-up done in %.0f ms  rss=%sMB",
+             _report["warm_up_ms"], _report["rss_mb"])
+
+
+def warm_up_in_background() -> threading.Thread:
+    def _run():
+        try:
+            warm_up()
+        except Exception:
+            log.exception("[CV_STACK] warm-up failed — the stack will load on first use")
+
+    thread = threading.Thread(target=_run, name="cv-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+        return round(pages * resource.getpagesize() / 2**20, 1)
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+def report() -> dict:
+    return {
+        "loaded":     is_loaded(),
+        "import_ms":  dict(_report["import_ms"]),
+        "total_ms":   round(sum(_report["import_ms"].values()), 1),
+        "warm_up_ms": _report["warm_up_ms"],
+        "rss_mb":     rss_mb(),
+    }
+
+
+metrics.register("cv_stack", report)
@@ -0,0 +1,174 @@
+# backend/reactions/frame_transport.py
+"""
+frame_transport.py — Zero-copy frame hand-off between processes on one node.
+
+Sending a frame to a CV worker as bytes over the channel layer means it is
+serialised by msgpack, copied into Redis, copied out again and deserialised
+before the worker can even decode it.  FrameRing replaces that with a
+multiprocessing.shared_memory ring buffer owned by the producer (the ASGI
+consumer).  Each slot holds ONE decoded BGR frame plus a small header:
+
+    offset 0   state  u8    0 = free, 1 = filled (owned by the reader)
+    offset 2   height u16
+    offset 4   width  u16
+    offset 6   chans  u16
+    offset 8   seq    u32   producer sequence number, for sanity checks
+    offset 16  pixels height × width × chans bytes (row-major, uint8)
+
+Only the slot index travels over the channel layer.  The producer decodes the
+JPEG straight into the slot (cv2.flip writes into the shared buffer as its
+dst), and the reader gets a numpy view over the same memory — no pickling,
+no copy.  The reader releases the slot by setting state back to 0.
+
+Shared memory only works between processes on the same host.  When it cannot
+be created (no /dev/shm, sandboxed runtime) or the worker cannot attach
+(worker on another node), callers fall back to sending JPEG bytes — as they
+do for a single frame larger than a slot (FrameTooLarge).
+"""
+
+import logging
+import struct
+
+import cv2
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:   # pragma: no cover — platforms without _posixshmem
+    shared_memory = None
+    resource_tracker = None
+
+log = logging.getLogger(__name__)
+
+_HEADER      = struct.Struct("<BxHHHI")
+_HEADER_SIZE = 16
+_ALIGN       = 64
+
+SLOT_FREE   = 0
+SLOT_FILLED = 1
+
+# Largest frame a slot can hold (1280×720 BGR).
+MAX_FRAME_SHAPE = (720, 1280, 3)
+
+
+class FrameTooLarge(ValueError):
+    """The frame has more pixels than a ring slot holds (MAX_FRAME_SHAPE)."""
+
+
+def shm_available() -> bool:
+    return shared_memory is not None
+
+
+class FrameRing:
+    """Fixed-size ring of shared-memory frame slots."""
+
+    def __init__(self, shm, slots: int, slot_size: int, owner: bool):
+        self._shm       = shm
+        self.slots      = slots
+        self._slot_size = slot_size
+        self._owner     = owner
+        self._seq       = 0
+        self._next      = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # ── Construction ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _slot_size(max_shape) -> int:
+        raw = _HEADER_SIZE + int(np.prod(max_shape))
+        return (raw + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    @classmethod
+    def create(cls, slots: int = 3, max_shape=MAX_FRAME_SHAPE) -> "FrameRing":
+        """Producer side.  Raises OSError/RuntimeError if shm is unavailable."""
+        if shared_memory is None:
+            raise RuntimeError("multiprocessing.shared_memory is not available")
+        slot_size = cls._slot_size(max_shape)
+        shm = shared_memory.SharedMemory(create=True, size=slots * slot_size)
+        return cls(shm, slots, slot_size, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, slots: int, max_shape=MAX_FRAME_SHAPE) -> "FrameRing":
+        """Reader side.  Raises FileNotFoundError when on a different host."""
+        if shared_memory is None:
+            raise RuntimeError("multiprocessing.shared_memory is not available")
+        shm = shared_memory.SharedMemory(name=name)
+        # The producer owns the segment's lifetime; stop this process's
+        # resource tracker from unlinking it when the worker exits.
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(shm, slots, cls._slot_size(max_shape), owner=False)
+
+    def close(self) -> None:
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+    # ── Slot access ──────────────────────────────────────────────────────────
+
+    def _offset(self, slot: int) -> int:
+        return slot * self._slot_size
+
+    def _state(self, slot: int) -> int:
+        return self._shm.buf[self._offset(slot)]
+
+    def acquire(self):
+        """Producer: index of a free slot, or None if the reader holds them all."""
+        for i in range(self.slots):
+            slot = (self._next + i) % self.slots
+            if self._state(slot) == SLOT_FREE:
+                self._next = (slot + 1) % self.slots
+                return slot
+        return None
+
+    def slot_array(self, slot: int, shape) -> np.ndarray:
+        """Writable numpy view over the pixel area of *slot*, shaped *shape*."""
+        start = self._offset(slot) + _HEADER_SIZE
+        count = int(np.prod(shape))
+        if count > self._slot_size - _HEADER_SIZE:
+            raise FrameTooLarge(f"frame {shape} does not fit in a ring slot")
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf,
+                          offset=start)
+
+    def commit(self, slot: int, shape) -> int:
+        """Producer: mark *slot* filled with a frame of *shape*; returns seq."""
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        h, w, c = shape
+        _HEADER.pack_into(self._shm.buf, self._offset(slot),
+                          SLOT_FILLED, h, w, c, self._seq)
+        return self._seq
+
+    def view(self, slot: int) -> np.ndarray:
+        """Reader: zero-copy view of the frame in a filled slot."""
+        state, h, w, c, _seq = _HEADER.unpack_from(self._shm.buf, self._offset(slot))
+        if state != SLOT_FILLED:
+            raise ValueError(f"ring slot {slot} is not filled")
+        return self.slot_array(slot, (h, w, c))
+
+    def release(self, slot: int) -> None:
+        """Reader: hand *slot* back to the producer."""
+        self._shm.buf[self._offset(slot)] = SLOT_FREE
+
+
+def decode_into(ring: FrameRing, slot: int, bytes_data: bytes):
+    """
+    Decode a JPEG and write it, mirrored, directly into *slot*.
+
+    Returns the seq number, or None for a corrupt JPEG.  Raises FrameTooLarge
+    (slot left free) when the frame does not fit.  The only pixel copy is the
+    one cv2.flip performs into the shared buffer.
+    """
+    frame = cv2.imdecode(np.frombuffer(bytes_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        log.warning("[FRAME] cv2.imdecode returned None — corrupt JPEG?")
+        return None
+    cv2.flip(frame, 1, dst=ring.slot_array(slot, frame.shape))
+    return ring.commit(slot, frame.shape)
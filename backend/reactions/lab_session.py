@@ -0,0 +1,564 @@
+# backend/reactions/lab_session.py
+"""
+lab_session.py — Per-connection CV state for one student's lab.
+
+LabSession owns the HandTracker and a LabSimulation (tube, paper and reaction
+state — opencv_modules/lab_simulation.py) for a single WebSocket connection
+and exposes the frame path as three synchronous stages:
+
+    decode(bytes)  → BGR frame (or None on a corrupt JPEG)
+    process(frame) → (frame, reacted)   tracking + simulation + drawing
+    encode(frame)  → JPEG bytes
+
+None of the stages touch the network, the event loop or the Redis-backed
+_StateProxy, so they can run inline on the consumer (serial mode) or on
+worker threads (pipelined mode, see pipeline.py) without any change.
+
+Control messages (set_chemical / set_reaction) are applied through
+defer() so that, in pipelined mode, they land between two frames of the
+process stage instead of racing a frame that is already being drawn.
+
+Each stage keeps an EWMA of its wall time (stage_time); QosController
+(qos.py) uses their sum as the frame's cost — wall, not CPU, time; see there
+why — to pick a quality tier, applied with set_tier().
+
+The scene is laid out in normalised coordinates (opencv_modules/scene.py).
+process() renders at the session's render size — the incoming frame size by
+default, or set_render_size() — times the QoS render scale, so a smaller
+internal resolution saves CPU without breaking layout or pour physics.
+
+Simulation advances by the wall time between processed frames (SimClock,
+opencv_modules/sim_clock.py), so dropped frames, skipped inference and the
+low-fps tier do not change how fast the tube tilts or how long a pour lasts.
+
+While the scene is idle (no change in simulation state) the tube / paper
+overlay is copied from a cached layer instead of being redrawn
+(opencv_modules/overlay_cache.py); idle_ratio() reports how often.
+
+With set_hud("frame") a performance HUD — decode / track / paper / tube /
+encode ms, fps in/out and drops pushed by the owner through update_hud(),
+inference skip ratio, JPEG size — is drawn into each frame; with "json"
+the owner sends hud_snapshot() to the browser instead.
+
+The hand-detection backend (opencv_modules/tracker_backends.py) is
+LAB_TRACKER by default and can be switched per session with set_tracker();
+a backend that cannot start (missing model file, no MediaPipe Tasks) falls
+back to "solutions".
+
+restore() continues from a LabSimulation snapshot after a reconnect; an
+attached resume.SnapshotWriter keeps one in the shared cache (resume.py).
+
+After LAB_IDLE_RELEASE seconds without frames reaper.py calls release(),
+which hands the HandTracker to a shared pool and drops the overlay layers;
+the next process() takes a tracker back before doing anything else.
+
+Per-frame logging goes through telemetry.HotLog (lazy, rate-limited), and
+every frame's stage times land in a FlightRecorder that is only written out
+on slow frames, decode failures and abnormal disconnects.
+
+Importing this module loads OpenCV and MediaPipe.  Server code reaches it
+through cv_stack.load() / aload() so only processes that host labs pay that.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+from . import cv_stack, resume
+from .profiling import FrameProfile
+from .telemetry import FlightRecorder, HotLog
+
+log = logging.getLogger(__name__)
+hot = HotLog(log)
+
+cv_stack.ensure_path()
+
+from hand_tracker import HandTracker
+from lab_simulation import LabSimulation
+from overlay_cache import OverlayCache
+from sim_clock import SimClock
+from video_pipeline import draw_perf_overlay
+from .qos import (
+    TIER_HALF_INFERENCE,
+    TIER_LOW_FPS,
+    TIER_LOW_RES,
+    TIER_NO_LANDMARKS,
+    TIER_NO_PARTICLES,
+)
+from .reaper import reaper, tracker_pool
+from .stream_state import CHEMICALS
+
+JPEG_QUALITY  = 80
+LOW_RES_SCALE = 0.5     # internal render scale at the low_res QoS tier
+LOW_FPS       = 8       # frames/s processed at the lowest QoS tier
+_TIME_ALPHA   = 0.2     # EWMA weight for stage timings
+
+
+def _make_tracker(name: str) -> HandTracker:
+    pooled = tracker_pool.acquire(name)
+    if pooled is not None:
+        return pooled
+    try:
+        return HandTracker(backend=name, model_path=settings.LAB_HAND_MODEL)
+    except Exception as exc:
+        if name == "solutions":
+            raise
+        log.warning("[TRACKER] %r unavailable (%s) — using 'solutions'", name, exc)
+        return HandTracker(backend="solutions")
+
+
+class LabSession:
+
+    def __init__(self, chemical_id=None, chemical_type="neutral",
+                 reaction_type="red_litmus", render_size=None, tracker=None):
+        self.chemical_id        = chemical_id
+        self.chemical_type      = chemical_type
+        self.current_reaction   = reaction_type
+        self.frame_count        = 0
+
+        # EWMA wall seconds per stage.  Each key is written only by its own
+        # stage, so pipelined stage threads never race on it.
+        self.stage_time = {"decode": 0.0, "process": 0.0, "encode": 0.0}
+        self.last_time  = {"decode": 0.0, "process": 0.0, "encode": 0.0}
+
+        # Quality knobs — see set_tier().
+        self.tier           = 0
+        self.draw_landmarks = True
+        self.infer_every    = 1
+        self.render_scale   = 1.0
+        self.min_interval   = 0.0
+        self._last_run      = 0.0
+
+        self.tracker = _make_tracker(tracker or settings.LAB_TRACKER)
+        self.tracker_name = self.tracker.backend_name
+        self.clock   = SimClock()
+        self.sim     = LabSimulation(chemical_type, reaction_type)
+        self.overlay = OverlayCache()
+        self.profile = None               # FrameProfile while a capture is armed
+        self.tube    = self.sim.tube      # render views over the simulation
+        self.paper   = self.sim.paper
+
+        # Last frames' telemetry, dumped on anomalies; owners relabel it with
+        # the lab id.
+        self.recorder = FlightRecorder(f"lab {id(self):x}", settings.LAB_FLIGHT_FRAMES)
+
+        # Performance HUD (set_hud): EWMA seconds of the sub-steps of
+        # process(), plus the owner's transport stats from update_hud().
+        self.hud_mode    = "off"
+        self.hud_stats   = {}
+        self.detail_time = {"track": 0.0, "sim": 0.0, "paper": 0.0, "tube": 0.0, "composite": 0.0}
+        self.inferred    = 0
+        self.jpeg_bytes  = 0
+        self._draw_time  = {}
+
+        self.render_size = tuple(render_size) if render_size else None   # None = input size
+
+        # Reconnect snapshots (resume.py); the owner attaches a SnapshotWriter.
+        self.resume = None
+
+        # Idle release (reaper.py): tracker and overlay layers are dropped
+        # after LAB_IDLE_RELEASE s without frames and re-acquired on the next.
+        self.last_active = time.monotonic()
+        self.released    = False
+        self._wake_lock  = threading.Lock()
+
+        # deque.append / popleft are atomic, so the event loop can defer()
+        # while a worker thread is inside process().
+        self._pending = deque()
+
+    def close(self, keep_snapshot: bool = False) -> None:
+        """
+        Release the tracker.  *keep_snapshot* (abnormal disconnect) writes a
+        final resume record for the reconnect; otherwise the record is deleted.
+        A profile capture still running is stopped and written as partial.
+        """
+        profile, self.profile = self.profile, None
+        if profile is not None:
+            profile.finish(self._profile_meta())
+        if self.resume is not None:
+            if keep_snapshot:
+                self.resume.save(self)
+            else:
+                resume.discard(self.resume.lab_id)
+        with self._wake_lock:
+            tracker, self.tracker, self.released = self.tracker, None, True
+        if tracker is not None:
+            try:
+                tracker_pool.release(tracker)
+            except Exception:
+                pass
+
+    def release(self, idle_before: float = float("inf")) -> bool:
+        """
+        Drop the heavy per-session state if no frame arrived since
+        *idle_before* (monotonic); the next process() restores it.
+        """
+        with self._wake_lock:
+            if self.released or self.last_active >= idle_before:
+                return False
+            tracker, self.tracker, self.released = self.tracker, None, True
+            self.overlay.invalidate()
+            self._draw_time = {}
+        tracker_pool.release(tracker)
+        return True
+
+    def _touch(self) -> None:
+        # Under the lock, so release() never takes the tracker of a frame
+        # that is already being processed.
+        with self._wake_lock:
+            self.last_active = time.monotonic()
+            if not self.released:
+                return
+            self.tracker = _make_tracker(self.tracker_name)
+            self.tracker.prev_angle = self.tube.display_angle
+            self.released = False
+        reaper.woke()
+        log.info("[IDLE] %s woke up, tracker=%s", self.recorder.label, self.tracker_name)
+
+    # ── Control ───────────────────────────────────────────────────────────────
+
+    def defer(self, fn, *args) -> None:
+        """Queue a state change to run at the start of the next process()."""
+        self._pending.append((fn, args))
+
+    def _apply_pending(self) -> None:
+        while self._pending:
+            fn, args = self._pending.popleft()
+            fn(*args)
+
+    @property
+    def reaction_triggered(self) -> bool:
+        return self.sim.reacted
+
+    def set_chemical(self, chemical_id: str) -> None:
+        chem = CHEMICALS[chemical_id]
+        self.chemical_id   = chemical_id
+        self.chemical_type = chem["type"]
+        self.sim.set_chemical(chem["type"])   # allows a new reaction
+
+    def set_reaction(self, reaction_type: str) -> None:
+        self.current_reaction = reaction_type
+        self.sim.set_reaction(reaction_type)
+
+    def start_profile(self, spec: dict) -> None:
+        """
+        Profile the next ``spec["frames"]`` frames (profiling.py).  *spec* is
+        ``{"mode", "frames", "label"}``; a capture already running is kept.
+        """
+        if self.profile is not None:
+            log.info("[PROFILE] %s: capture already running", spec.get("label"))
+            return
+        self.profile = FrameProfile(spec.get("label") or "lab", spec.get("mode", "sample"),
+                                    spec.get("frames", 300))
+
+    def restore(self, snap: dict, chemical_id=None) -> None:
+        """Continue from LabSimulation.snapshot() — used on reconnect, before any frame."""
+        self.sim              = LabSimulation.restore(snap)
+        self.tube             = self.sim.tube
+        self.paper            = self.sim.paper
+        self.chemical_id      = chemical_id
+        self.chemical_type    = self.sim.chemical_type
+        self.current_reaction = self.sim.reaction_type
+        self.tracker.prev_angle = self.tube.display_angle
+
+    def state_signature(self) -> tuple:
+        """Changes whenever a reconnect snapshot would differ in what it shows."""
+        return (self.sim.signature(), self.sim.reacted, self.chemical_id,
+                self.sim.chemical_type, self.sim.reaction_type)
+
+    def set_tracker(self, name: str) -> None:
+        """Swap the hand-detection backend between two frames."""
+        if name == self.tracker_name:
+            return
+        old, self.tracker = self.tracker, _make_tracker(name)
+        self.tracker.prev_angle = old.prev_angle     # no jump in the tube's tilt
+        self.tracker_name = self.tracker.backend_name
+        try:
+            tracker_pool.release(old)
+        except Exception:
+            pass
+        log.info("[TRACKER] %s → %s", old.backend_name, self.tracker_name)
+
+    def set_hud(self, mode: str) -> None:
+        """"off", "frame" (drawn into the frame) or "json" (hud_snapshot())."""
+        self.hud_mode = mode
+
+    def update_hud(self, stats: dict) -> None:
+        """Owner-side numbers this session cannot see: fps in/out, drops."""
+        self.hud_stats = stats
+
+    def set_render_size(self, size) -> None:
+        """Render at a fixed ``(width, height)``, or ``None`` for the input size."""
+        self.render_size = tuple(size) if size else None
+
+    def _fit_render_size(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        tw, th = self.render_size or (w, h)
+        if self.render_scale != 1.0:
+            tw, th = int(tw * self.render_scale), int(th * self.render_scale)
+        if (tw, th) != (w, h):
+            frame = cv2.resize(frame, (tw, th), interpolation=cv2.INTER_AREA)
+        self.sim.relayout(tw, th)
+        return frame
+
+    def idle_ratio(self) -> float:
+        """Share of frames whose tube / paper overlay came from the cache."""
+        return self.overlay.idle_ratio()
+
+    def chemical_meta(self):
+        if not self.chemical_id or self.chemical_id not in CHEMICALS:
+            return None
+        m = CHEMICALS[self.chemical_id]
+        return {
+            "id":      self.chemical_id,
+            "label":   m["label"],
+            "type":    m["type"],
+            "formula": m["formula"],
+        }
+
+    def reaction_event(self) -> dict:
+        """JSON event pushed to the browser when the reaction fires."""
+        return {
+            "type":          "reaction_complete",
+            "reaction_type": self.current_reaction,
+            "chemical":      self.chemical_meta(),
+            "frame":         self.frame_count,
+        }
+
+    def set_tier(self, tier: int) -> None:
+        """Apply a QoS tier (qos.TIERS); every knob is cumulative with the tier."""
+        self.tier                = tier
+        self.draw_landmarks      = tier < TIER_NO_LANDMARKS
+        self.tube.show_particles = tier < TIER_NO_PARTICLES
+        self.infer_every         = 2 if tier >= TIER_HALF_INFERENCE else 1
+        self.render_scale        = LOW_RES_SCALE if tier >= TIER_LOW_RES else 1.0
+        self.min_interval        = 1.0 / LOW_FPS if tier >= TIER_LOW_FPS else 0.0
+
+    def shed(self) -> bool:
+        """True if this frame should be skipped to honour the low_fps tier."""
+        if not self.min_interval:
+            return False
+        now = time.monotonic()
+        if now - self._last_run < self.min_interval:
+            return True
+        self._last_run = now
+        return False
+
+    def frame_cost(self) -> float:
+        """
+        Smoothed wall seconds for one frame through all three stages — QoS's
+        stand-in for CPU time, including GIL and thread-pool waits (qos.py).
+        """
+        return sum(self.stage_time.values())
+
+    def _timed(self, stage: str, t0: float) -> None:
+        elapsed = time.perf_counter() - t0
+        prev    = self.stage_time[stage]
+        self.last_time[stage] = elapsed
+        self.stage_time[stage] = elapsed if prev == 0.0 else \
+            prev + _TIME_ALPHA * (elapsed - prev)
+
+    # ── Frame stages ──────────────────────────────────────────────────────────
+
+    def decode(self, bytes_data: bytes):
+        if self.profile is not None:
+            return self.profile.run("decode", self._decode, bytes_data)
+        return self._decode(bytes_data)
+
+    def _decode(self, bytes_data: bytes):
+        t0     = time.perf_counter()
+        np_arr = np.frombuffer(bytes_data, dtype=np.uint8)
+        frame  = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        if frame is None:
+            hot.warning("FRAME", error="cv2.imdecode returned None — corrupt JPEG?",
+                        size=len(bytes_data))
+            self.recorder.dump("decode failure")
+            return None
+        frame = cv2.flip(frame, 1)
+        self._timed("decode", t0)
+        return frame
+
+    def process(self, frame: np.ndarray):
+        """
+        Track the hand, advance the tube/paper simulation and draw the scene.
+
+        Returns ``(frame, reacted)`` where *reacted* is True only on the frame
+        that triggered the reaction; the caller is responsible for notifying
+        the client and the shared state.
+        """
+        t0      = time.perf_counter()
+        profile = self.profile
+        try:
+            if profile is None:
+                return self._process(frame)
+            return profile.run("process", self._process, frame)
+        finally:
+            self._timed("process", t0)
+            self._record()
+            if self.resume is not None:
+                self.resume.maybe_save(self)
+            if profile is not None and profile.frame_done(self._profile_meta()):
+                self.profile = None
+
+    def _detail(self, step: str, elapsed: float) -> None:
+        prev = self.detail_time[step]
+        self.detail_time[step] = elapsed if prev == 0.0 else prev + _TIME_ALPHA * (elapsed - prev)
+
+    def hud_snapshot(self) -> dict:
+        """Per-stage ms (EWMA) and session counters for the performance HUD."""
+        d = self.detail_time
+        features = self.tracker.features if self.tracker is not None else None
+        stages = {
+            "decode": self.stage_time["decode"],
+            "track":  d["track"],
+            "sim":    d["sim"],
+            "paper":  d["paper"],
+            "tube":   d["tube"],
+            "cached": d["composite"],
+            "encode": self.stage_time["encode"],
+        }
+        return {
+            "stage_ms":   {k: round(v * 1000, 2) for k, v in stages.items()},
+            "infer_skip": round(1 - self.inferred / self.frame_count, 2) if self.frame_count else 0.0,
+            "idle":       round(self.idle_ratio(), 2),
+            "jpeg_kb":    round(self.jpeg_bytes / 1024, 1),
+            "tier":       self.tier,
+            "tracker":    self.tracker_name,
+            "gesture":    features.as_dict() if features is not None else None,
+            "frames":     self.frame_count,
+        }
+
+    def _draw_hud(self, frame: np.ndarray) -> None:
+        snap, st = self.hud_snapshot(), self.hud_stats
+        sm = snap["stage_ms"]
+        draw_perf_overlay(frame, [
+            f"decode {sm['decode']:5.1f} ms",
+            f"track  {sm['track']:5.1f} ms  {snap['tracker']}",
+            f"paper  {sm['paper']:5.1f} ms",
+            f"tube   {sm['tube']:5.1f} ms",
+            f"encode {sm['encode']:5.1f} ms",
+            f"fps in {st.get('fps_in', 0):4.1f} out {st.get('fps_out', 0):4.1f}",
+            f"drop   {st.get('dropped', 0)}  skip {st.get('skipped', 0)}",
+            f"infer skip {snap['infer_skip']:.0%}",
+            f"jpeg   {snap['jpeg_kb']:.1f} KB  tier {snap['tier']}",
+        ], top=8)
+
+    def _record(self) -> None:
+        last = self.last_time
+        self.recorder.record(
+            self.frame_count, time.monotonic(),
+            last["decode"] * 1000, last["process"] * 1000, last["encode"] * 1000,
+            self.tier, self.tube.display_angle, self.tube.liquid_level, self.tube.is_pouring,
+        )
+        if last["process"] * 1000 > settings.LAB_SLOW_FRAME_MS:
+            self.recorder.dump(f"slow frame ({last['process'] * 1000:.0f} ms in process)")
+
+    def _profile_meta(self) -> dict:
+        return {
+            "stage_ms":    {k: round(v * 1000, 2) for k, v in self.stage_time.items()},
+            "tier":        self.tier,
+            "tracker":     self.tracker_name,
+            "render_size": list(self.render_size) if self.render_size else None,
+            "frame_count": self.frame_count,
+        }
+
+    def _process(self, frame: np.ndarray):
+        self._touch()
+        self._apply_pending()
+        self.frame_count += 1
+        frame = self._fit_render_size(frame)
+        dt    = self.clock.tick()
+
+        # ── Hand tracking ─────────────────────────────────────────────────────
+        # At TIER_HALF_INFERENCE the previous landmarks are reused on odd
+        # frames; get_hand_angle() still smooths toward them over dt.
+        t0 = time.perf_counter()
+        if self.tracker.results is None or self.frame_count % self.infer_every == 0:
+            frame = self.tracker.find_hands(frame, draw=self.draw_landmarks)
+            self.inferred += 1
+        angle = self.tracker.get_hand_angle(frame, dt)
+        t1 = time.perf_counter()
+        self._detail("track", t1 - t0)
+
+        # ── Simulate ──────────────────────────────────────────────────────────
+        # chemical_type / current_reaction reach the simulation through
+        # set_chemical() / set_reaction() — never state.get(...) here, which
+        # risks the cross-process isolation bug that was the original root cause.
+        events  = self.sim.step(dt, angle)
+        reacted = any(e["type"] == "reaction_complete" for e in events)
+        self._detail("sim", time.perf_counter() - t1)
+
+        for event in events:
+            hot.debug("SIM", frame=self.frame_count, event=event["type"],
+                      level=self.tube.liquid_level, angle=self.tube.display_angle,
+                      chemical=self.chemical_id, reaction=self.current_reaction)
+        if self.tube.is_pouring and self.frame_count % 15 == 0:
+            hot.debug("POUR", frame=self.frame_count, angle=self.tube.display_angle,
+                      end=self.sim.pour_point(), level=self.tube.liquid_level)
+
+        # ── Draw (cached overlay while idle) ──────────────────────────────────
+        frame, _ = self.overlay.render(frame, self.sim, self._draw_time)
+        for step, elapsed in self._draw_time.items():
+            self._detail(step, elapsed)
+
+        # ── Reaction-complete banner on frame ─────────────────────────────────
+        if self.sim.reacted:
+            self._draw_reaction_banner(frame)
+
+        if self.hud_mode == "frame":
+            self._draw_hud(frame)
+
+        return frame, reacted
+
+    def encode(self, frame: np.ndarray) -> bytes:
+        if self.profile is not None:
+            return self.profile.run("encode", self._encode, frame)
+        return self._encode(frame)
+
+    def _encode(self, frame: np.ndarray) -> bytes:
+        t0 = time.perf_counter()
+        _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        payload = buffer.tobytes()
+        self.jpeg_bytes = len(payload)
+        self._timed("encode", t0)
+        return payload
+
+    def run_frame(self, bytes_data: bytes):
+        """
+        All three stages back to back.
+
+        Returns ``(jpeg, event)``: *jpeg* is None for an undecodable or shed
+        frame and *event* is the reaction_event() dict on the frame that reacted.
+        """
+        if self.shed():
+            return None, None
+
+        frame = self.decode(bytes_data)
+        if frame is None:
+            return None, None
+        frame, reacted = self.process(frame)
+        return self.encode(frame), (self.reaction_event() if reacted else None)
+
+    # ── Drawing helper ────────────────────────────────────────────────────────
+
+    def _draw_reaction_banner(self, frame: np.ndarray) -> None:
+        fh, fw  = frame.shape[:2]
+        k       = self.tube.scale    # banner was tuned for 640×480
+        by      = fh // 2 - int(38 * k)
+        tx      = fw // 2 - int(188 * k)
+        overlay = frame.copy()
+        cv2.rectangle(overlay, (0, by), (fw, by + int(68 * k)), (8, 8, 8), -1)
+        cv2.addWeighted(overlay, 0.72, frame, 0.28, 0, frame)
+        cv2.putText(frame, "REACTION COMPLETE",
+                    (tx, by + int(46 * k)),
+                    cv2.FONT_HERSHEY_DUPLEX, 1.25 * k, (0, 180, 80),
+                    max(1, int(4 * k)), cv2.LINE_AA)
+        cv2.putText(frame, "REACTION COMPLETE",
+                    (tx, by + int(46 * k)),
+                    cv2.FONT_HERSHEY_DUPLEX, 1.25 * k, (0, 255, 120),
+                    max(1, int(2 * k)), cv2.LINE_AA)
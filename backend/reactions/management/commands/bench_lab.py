@@ -0,0 +1,182 @@
+# backend/reactions/management/commands/bench_lab.py
+"""
+Compare serial vs pipelined LabSession throughput and latency.
+
+    python manage.py bench_lab --video clip.mp4 --frames 300 --input-fps 30
+
+Frames are JPEG-encoded up front (like the browser does) and offered at
+--input-fps, so the pipelined numbers include realistic intake drops.
+Without --video a synthetic 640×480 frame is used; MediaPipe will find no
+hand, which still exercises decode, inference, drawing and encode.
+
+    python manage.py bench_lab --video clip.mp4 --trackers solutions,tasks,contour
+
+compares hand-detection backends (opencv_modules/tracker_backends.py) on the
+same decoded frames instead: ms per frame, share of frames with a hand, and
+how far each backend's tilt angle and pouring state stray from the first
+backend's.  "tasks" runs in live-stream mode, so its ms only covers
+submitting the frame and its angles lag by about a frame.
+"""
+
+import asyncio
+import statistics
+import time
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reactions.lab_session import LabSession
+from reactions.pipeline import FramePipeline, FrameStats
+
+from hand_tracker import HandTracker     # on sys.path once lab_session is imported
+
+
+def _load_frames(video: str | None, count: int) -> list[bytes]:
+    frames = []
+    if video:
+        cap = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = cv2.resize(frame, (640, 480))
+            frames.append(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 50])[1].tobytes())
+        cap.release()
+        if not frames:
+            raise CommandError(f"Could not read any frames from {video!r}")
+    else:
+        rng   = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        jpeg  = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 50])[1].tobytes()
+        frames = [jpeg] * count
+    return frames
+
+
+async def _run_serial(frames, interval) -> FrameStats:
+    lab   = LabSession()
+    stats = FrameStats(window=len(frames))
+    start = time.perf_counter()
+    try:
+        for i, data in enumerate(frames):
+            # A serial consumer cannot receive while it is busy, so late
+            # frames are simply processed late rather than dropped.
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            t_in  = stats.frame_in()
+            frame = lab.decode(data)
+            if frame is None:          # undecodable — the consumer drops these too
+                stats.frame_dropped()
+                continue
+            frame, _ = lab.process(frame)
+            lab.encode(frame)
+            stats.frame_out(t_in)
+    finally:
+        lab.close()
+    return stats
+
+
+async def _run_pipelined(frames, interval) -> FrameStats:
+    lab   = LabSession()
+    stats = FrameStats(window=len(frames))
+
+    async def _noop(*_args):
+        return None
+
+    pipeline = FramePipeline(lab, _noop, _noop, stats)
+    pipeline.start()
+    start = time.perf_counter()
+    try:
+        for i, data in enumerate(frames):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pipeline.submit(data)
+        # Let the last frames drain.
+        while stats.frames_out + stats.dropped < stats.frames_in:
+            await asyncio.sleep(0.005)
+    finally:
+        await pipeline.close()
+        lab.close()
+    return stats
+
+
+def _run_tracker(name, frames) -> dict:
+    tracker = HandTracker(backend=name, model_path=settings.LAB_HAND_MODEL)
+    times, angles = [], []
+    try:
+        for frame in frames:
+            t0 = time.perf_counter()
+            tracker.find_hands(frame, draw=False)
+            times.append(time.perf_counter() - t0)
+            angles.append(tracker.measure_angle(frame))
+    finally:
+        tracker.close()
+    times.sort()
+    return {
+        "p50_ms": round(times[len(times) // 2] * 1000, 2),
+        "p95_ms": round(times[int(len(times) * 0.95)] * 1000, 2),
+        "hand":   sum(a is not None for a in angles) / len(angles),
+        "angles": angles,
+    }
+
+
+def _agreement(angles, reference) -> tuple:
+    """Mean |Δangle| on frames where both saw a hand, and pouring agreement."""
+    both  = [(a, b) for a, b in zip(angles, reference) if a is not None and b is not None]
+    diff  = statistics.fmean(abs(a - b) for a, b in both) if both else None
+    pour  = sum((a is not None and a < 50) == (b is not None and b < 50)
+                for a, b in zip(angles, reference)) / len(reference)
+    return diff, pour
+
+
+class Command(BaseCommand):
+    help = "Benchmark serial vs pipelined lab frame processing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--video", default=None, help="Video file to replay.")
+        parser.add_argument("--frames", type=int, default=300)
+        parser.add_argument("--input-fps", type=float, default=30.0,
+                            help="Rate at which frames are offered (0 = as fast as possible).")
+        parser.add_argument("--mode", choices=("serial", "pipelined", "both"), default="both")
+        parser.add_argument("--trackers", default=None,
+                            help="Compare hand trackers instead, e.g. solutions,contour.")
+
+    def handle(self, *args, **opts):
+        frames   = _load_frames(opts["video"], opts["frames"])
+        if opts["trackers"]:
+            self._compare_trackers(opts["trackers"].split(","), frames)
+            return
+        interval = 1.0 / opts["input_fps"] if opts["input_fps"] > 0 else 0.0
+
+        modes = ("serial", "pipelined") if opts["mode"] == "both" else (opts["mode"],)
+        for mode in modes:
+            runner = _run_serial if mode == "serial" else _run_pipelined
+            stats  = asyncio.run(runner(frames, interval))
+            s      = stats.summary()
+            self.stdout.write(
+                f"{mode:<10} in={s['frames_in']:<5} out={s['frames_out']:<5} "
+                f"dropped={s['dropped']:<5} fps={s['fps']:<6} "
+                f"p50={s['latency_p50_ms']}ms  p95={s['latency_p95_ms']}ms"
+            )
+
+    def _compare_trackers(self, names, frames):
+        decoded = [cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) for data in frames]
+        reference = None
+        for name in names:
+            try:
+                r = _run_tracker(name.strip(), decoded)
+            except (ValueError, RuntimeError, OSError) as exc:
+                self.stderr.write(f"{name:<10} unavailable: {exc}")
+                continue
+            line = (f"{name:<10} p50={r['p50_ms']}ms  p95={r['p95_ms']}ms  "
+                    f"hand={r['hand']:.0%}")
+            if reference is None:
+                reference = (name, r["angles"])
+            else:
+                diff, pour = _agreement(r["angles"], reference[1])
+                line += (f"  vs {reference[0]}: |Δangle|="
+                         f"{'n/a' if diff is None else f'{diff:.1f}°'}  pouring agrees {pour:.0%}")
+            self.stdout.write(line)
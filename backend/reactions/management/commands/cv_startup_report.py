@@ -0,0 +1,61 @@
+# backend/reactions/management/commands/cv_startup_report.py
+"""
+Measure cold-start cost of a lab worker process.
+
+    python manage.py cv_startup_report            # imports + warm-up
+    python manage.py cv_startup_report --no-warm-up
+
+Imports config.asgi the way the ASGI server does and checks it pulled in no
+CV modules, then loads the CV stack step by step (reactions/cv_stack.py) and
+runs the warm-up frame, printing wall time and resident memory for each.
+Run it on the instance type you autoscale, from a fresh process.
+"""
+
+import importlib
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reactions import cv_stack
+
+_HEAVY = ("cv2", "mediapipe", "numpy")
+
+
+class Command(BaseCommand):
+    help = "Report import and warm-up time of the CV stack in a cold process."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--no-warm-up", action="store_true",
+                            help="Only time the imports.")
+
+    def handle(self, *args, **opts):
+        already = [m for m in _HEAVY if m in sys.modules]
+        if already:
+            self.stderr.write(f"warning: {', '.join(already)} already imported — "
+                              "numbers below are not cold")
+
+        rss0 = cv_stack.rss_mb()
+        t0   = time.perf_counter()
+        importlib.import_module("config.asgi")
+        asgi_ms = (time.perf_counter() - t0) * 1000
+        leaked  = [m for m in _HEAVY if m in sys.modules and m not in already]
+        self.stdout.write(f"config.asgi              {asgi_ms:8.1f} ms   "
+                          f"CV modules loaded: {', '.join(leaked) or 'none'}")
+        if leaked and not settings.LAB_WARMUP:
+            self.stderr.write("warning: config.asgi imported CV modules eagerly")
+
+        cv_stack.load()
+        for name, ms in cv_stack.report()["import_ms"].items():
+            self.stdout.write(f"{name:<24} {ms:8.1f} ms")
+
+        if not opts["no_warm_up"]:
+            cv_stack.warm_up()
+        r = cv_stack.report()
+        self.stdout.write(f"{'imports total':<24} {r['total_ms']:8.1f} ms")
+        if r["warm_up_ms"] is not None:
+            # load() already ran above, so this is the first frame alone.
+            self.stdout.write(f"{'warm-up frame':<24} {r['warm_up_ms']:8.1f} ms")
+        if rss0 is not None:
+            self.stdout.write(f"{'rss':<24} {rss0:8.1f} MB → {r['rss_mb']} MB")
@@ -0,0 +1,87 @@
+# backend/reactions/management/commands/lab_profiles.py
+"""
+List and summarise captured lab profiles (reactions/profiling.py).
+
+    python manage.py lab_profiles                      # list captures, newest first
+    python manage.py lab_profiles 20261019-101500-ab12cd34ef56-sample
+    python manage.py lab_profiles <name> --top 40 --sort tottime
+
+A capture name is its file stem in LAB_PROFILE_DIR (a unique prefix works).
+cProfile captures are printed with pstats; sampled captures show the
+functions with the most samples on top of the stack (self) and anywhere in
+the stack (inclusive), as a share of all samples.
+"""
+
+import json
+import pstats
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "List or summarise lab frame profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Capture to summarise (stem or prefix).")
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument("--sort", choices=("cumulative", "tottime", "ncalls"),
+                            default="cumulative", help="pstats sort key for cProfile captures.")
+
+    def handle(self, *args, **opts):
+        out_dir = Path(settings.LAB_PROFILE_DIR)
+        metas   = sorted(out_dir.glob("*.json"), reverse=True) if out_dir.is_dir() else []
+        if not opts["name"]:
+            self._list(out_dir, metas)
+            return
+
+        matches = [m for m in metas if m.stem.startswith(opts["name"])]
+        if len(matches) != 1:
+            raise CommandError(f"{len(matches)} captures match {opts['name']!r}.")
+        meta = json.loads(matches[0].read_text())
+        self._header(matches[0].stem, meta)
+        data = out_dir / meta["data"]
+        if meta["mode"] == "cprofile":
+            pstats.Stats(str(data), stream=self.stdout).sort_stats(opts["sort"]).print_stats(opts["top"])
+        else:
+            self._summarise_samples(data, opts["top"])
+
+    def _list(self, out_dir, metas):
+        if not metas:
+            self.stdout.write(f"No profiles in {out_dir}")
+            return
+        for path in metas:
+            m = json.loads(path.read_text())
+            per_frame = sum((m.get("stage_ms") or {}).values())
+            self.stdout.write(
+                f"{path.stem:<48} frames={m['frames']:<5} wall={m['wall_s']:>7}s  "
+                f"frame≈{per_frame:.1f}ms  tier={m.get('tier')}"
+            )
+
+    def _header(self, name, meta):
+        self.stdout.write(f"{name}  ({meta['mode']}, {meta['frames']} frames, {meta['wall_s']}s)")
+        for stage, ms in (meta.get("stage_ms") or {}).items():
+            self.stdout.write(f"  {stage:<8} {ms:7.2f} ms/frame (EWMA)")
+        self.stdout.write("")
+
+    def _summarise_samples(self, data: Path, top: int):
+        own, inclusive, total = Counter(), Counter(), 0
+        for line in data.read_text().splitlines():
+            stack, _, count = line.rpartition(" ")
+            frames = stack.split(";")
+            count  = int(count)
+            total += count
+            own[frames[-1]] += count
+            for fn in set(frames[1:]):          # frames[0] is the stage
+                inclusive[fn] += count
+        if not total:
+            self.stdout.write("No samples.")
+            return
+        self.stdout.write(f"{total} samples\n\n   self%  function")
+        for fn, n in own.most_common(top):
+            self.stdout.write(f"  {100 * n / total:6.1f}  {fn}")
+        self.stdout.write("\n   incl%  function")
+        for fn, n in inclusive.most_common(top):
+            self.stdout.write(f"  {100 * n / total:6.1f}  {fn}")
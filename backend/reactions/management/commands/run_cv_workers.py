@@ -0,0 +1,82 @@
+# backend/reactions/management/commands/run_cv_workers.py
+"""
+Launch and supervise the dedicated CV worker processes.
+
+    python manage.py run_cv_workers                # all LAB_CV_WORKERS channels
+    python manage.py run_cv_workers --start 4 --count 4   # this node's share
+
+Each worker is a `runworker lab-cv-<i>` process serving exactly one channel,
+so sticky session routing maps to exactly one process.  Crashed workers are
+restarted; Ctrl-C / SIGTERM stops them all.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reactions.workers import worker_channel_name
+
+RESTART_DELAY = 1.0   # seconds — avoid a hot crash loop
+
+
+class Command(BaseCommand):
+    help = "Run N channel-layer CV workers for the lab pipeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=int, default=0,
+                            help="First worker index served by this node.")
+        parser.add_argument("--count", type=int, default=None,
+                            help="Number of workers on this node (default: all).")
+
+    def handle(self, *args, **opts):
+        total = settings.LAB_CV_WORKERS
+        if total <= 0:
+            raise CommandError("LAB_CV_WORKERS must be > 0 to run CV workers.")
+
+        start = opts["start"]
+        count = opts["count"] if opts["count"] is not None else total - start
+        if start < 0 or count <= 0 or start + count > total:
+            raise CommandError(f"Worker range {start}..{start + count - 1} "
+                               f"is outside 0..{total - 1}.")
+
+        channels = [worker_channel_name(i) for i in range(start, start + count)]
+        procs    = {ch: self._spawn(ch) for ch in channels}
+        stopping = False
+
+        def _stop(*_):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(f"Running {count} CV workers: {', '.join(channels)}")
+        try:
+            while not stopping:
+                for ch, proc in procs.items():
+                    if proc.poll() is not None:
+                        self.stderr.write(f"{ch} exited ({proc.returncode}); restarting")
+                        time.sleep(RESTART_DELAY)
+                        procs[ch] = self._spawn(ch)
+                time.sleep(0.5)
+        finally:
+            for proc in procs.values():
+                proc.terminate()
+            for proc in procs.values():
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    @staticmethod
+    def _spawn(channel: str) -> subprocess.Popen:
+        # Workers exist only to run labs: load the CV stack before serving.
+        return subprocess.Popen(
+            [sys.executable, str(settings.BASE_DIR / "manage.py"), "runworker", channel],
+            env={**os.environ, "LAB_WARMUP": "True"},
+        )
@@ -0,0 +1,105 @@
+# backend/reactions/metrics.py
+"""
+metrics.py — Per-process lab metrics, published through the shared cache.
+
+Each ASGI / CV worker process owns its own scheduler, sessions and counters,
+so nothing here is shared memory.  Subsystems register a *provider* — a
+zero-argument callable returning a JSON-safe dict — and the process
+periodically publishes a snapshot of all providers to the cache under
+"gestured:metrics:<worker id>", the same Redis the _StateProxy uses.
+
+GET /api/reactions/metrics/ then collects the snapshots of every live worker,
+regardless of which process happens to serve the HTTP request.
+
+maybe_publish() is called from the frame and login paths.  The snapshot is
+taken there, on the event loop that owns the counters, but the cache round
+trips run on a thread in a background task — a Redis hiccup must not stall
+every socket of the worker.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+
+log = logging.getLogger(__name__)
+
+WORKER_ID       = f"{socket.gethostname()}:{os.getpid()}"
+PUBLISH_EVERY   = 2.0    # seconds between snapshots from one process
+STALE_AFTER     = 30.0   # seconds — workers silent for longer are dropped
+
+_PREFIX    = "gestured:metrics:"
+_INDEX_KEY = f"{_PREFIX}workers"
+
+_providers: dict = {}
+_last_publish = 0.0
+_publishing   = None     # asyncio.Task of the write in progress
+
+
+def register(name: str, provider) -> None:
+    """Add a named section to this process's snapshot."""
+    _providers[name] = provider
+
+
+def snapshot() -> dict:
+    data = {"worker": WORKER_ID, "ts": time.time()}
+    for name, provider in _providers.items():
+        try:
+            data[name] = provider()
+        except Exception:
+            log.exception("[METRICS] provider %s failed", name)
+    return data
+
+
+def publish(snap: dict | None = None) -> None:
+    """Write *snap* (default: a fresh snapshot()) to the cache; blocking."""
+    from django.core.cache import cache
+    snap = snapshot() if snap is None else snap
+    cache.set(f"{_PREFIX}{WORKER_ID}", snap, int(STALE_AFTER * 2))
+
+    # Read-modify-write of the index is racy across processes, but each
+    # worker re-adds itself every PUBLISH_EVERY seconds, so a lost update
+    # only hides a worker for one interval.
+    index = cache.get(_INDEX_KEY) or {}
+    index[WORKER_ID] = snap["ts"]
+    cutoff = snap["ts"] - STALE_AFTER
+    index  = {w: ts for w, ts in index.items() if ts >= cutoff}
+    cache.set(_INDEX_KEY, index, int(STALE_AFTER * 2))
+
+
+def _publish_logged(snap: dict) -> None:
+    try:
+        publish(snap)
+    except Exception:
+        log.exception("[METRICS] publish failed")
+
+
+def maybe_publish() -> None:
+    """
+    Cheap enough to call from the frame path; publishes at most every
+    PUBLISH_EVERY s.  Inside an event loop the cache writes run on a thread
+    and this returns at once; a write still in progress skips the interval.
+    """
+    global _last_publish, _publishing
+    now = time.monotonic()
+    if now - _last_publish < PUBLISH_EVERY:
+        return
+    _last_publish = now
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:        # sync caller (management command)
+        _publish_logged(snapshot())
+        return
+    if _publishing is not None and not _publishing.done():
+        return
+    _publishing = loop.create_task(asyncio.to_thread(_publish_logged, snapshot()))
+
+
+def collect() -> list[dict]:
+    """Snapshots of every worker that published recently."""
+    from django.core.cache import cache
+    index  = cache.get(_INDEX_KEY) or {}
+    cutoff = time.time() - STALE_AFTER
+    keys   = [f"{_PREFIX}{w}" for w, ts in index.items() if ts >= cutoff]
+    return [snap for snap in cache.get_many(keys).values() if snap]
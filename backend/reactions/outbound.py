@@ -0,0 +1,157 @@
+# backend/reactions/outbound.py
+"""
+outbound.py — Bounded per-connection outbound frame queue with backpressure.
+
+LabConsumer used to await self.send(bytes_data=...) for every rendered frame
+with no idea how much was still buffered toward the browser.  On a bad
+network the ASGI server's write buffer grew, and with it memory and
+glass-to-glass latency, while the server kept rendering frames nobody would
+see in time.
+
+OutboundQueue sits between the frame path and the socket:
+
+  • put() never blocks.  A single sender task writes frames to the socket;
+    while it is busy, at most ONE newer frame waits, and a still newer frame
+    replaces it (counted as ``replaced``).
+  • A frame counts as in flight from the moment it is handed to the socket
+    until the browser acknowledges it with {"type": "ack", "frames": N} (N =
+    binary frames received so far on this connection; ack()).  Under Daphne
+    send() returns as soon as the frame is queued on the transport, so the
+    time spent awaiting it says nothing about the network — only the
+    browser can tell what actually arrived.  Until the first ack (an older
+    client) only the frame being written is counted.
+  • bytes_in_flight() is the unacknowledged frames plus the waiting one.
+  • behind() is True while a frame is already waiting or the bytes in flight
+    exceed LAB_OUTBOUND_MAX_BYTES.  The consumer checks it BEFORE decoding,
+    so a client that cannot keep up costs no render or encode work
+    (``skipped``) — it simply gets fewer, fresher frames.
+
+Per-session backlog, send time and counters are reported through metrics.py.
+JSON control messages are small and still go straight to the socket.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+_SEND_ALPHA   = 0.2   # EWMA weight for per-frame send time
+_UNACKED_KEEP = 64    # sizes remembered for a client that has not acked yet
+
+_queues: dict = {}
+
+
+class OutboundQueue:
+
+    def __init__(self, sid: str, send, max_bytes: int):
+        """*send(payload)* is the coroutine that actually writes to the socket."""
+        self.sid       = sid
+        self.max_bytes = max_bytes
+
+        self._send     = send
+        self._pending  = None
+        self._sending  = 0          # size of the frame currently being written
+        self._unacked  = deque()    # sizes of written frames not yet acked, oldest first
+        self._unacked_bytes = 0
+        self._acked    = 0          # frames acked (or forgotten) so far
+        self.acks      = False      # the browser acknowledges frames
+        self._wake     = asyncio.Event()
+        self._task     = asyncio.get_running_loop().create_task(self._run())
+
+        self.sent      = 0
+        self.replaced  = 0
+        self.skipped   = 0
+        self.bytes_out = 0
+        self.send_time = 0.0        # EWMA seconds per frame write
+        _queues[sid] = self
+
+    # ── Frame path ────────────────────────────────────────────────────────────
+
+    def put(self, payload: bytes) -> None:
+        if self._pending is not None:
+            self.replaced += 1
+        self._pending = payload
+        self._wake.set()
+
+    def behind(self) -> bool:
+        return self._pending is not None or self.bytes_in_flight() > self.max_bytes
+
+    def skip(self) -> None:
+        """Record an input frame dropped before rendering because we are behind()."""
+        self.skipped += 1
+
+    def bytes_in_flight(self) -> int:
+        written = self._unacked_bytes if self.acks else self._sending
+        return written + (len(self._pending) if self._pending is not None else 0)
+
+    def ack(self, frames: int) -> None:
+        """The browser has received *frames* binary frames on this connection."""
+        self.acks = True
+        while self._acked < frames and self._unacked:
+            self._unacked_bytes -= self._unacked.popleft()
+            self._acked += 1
+
+    async def close(self) -> None:
+        _queues.pop(self.sid, None)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    # ── Sender ────────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            payload, self._pending = self._pending, None
+            if payload is None:
+                continue
+            self._sending = len(payload)
+            self._unacked.append(len(payload))
+            self._unacked_bytes += len(payload)
+            if not self.acks and len(self._unacked) > _UNACKED_KEEP:
+                self._unacked_bytes -= self._unacked.popleft()
+                self._acked += 1
+            t0 = time.perf_counter()
+            try:
+                await self._send(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.info("[OUTBOUND] send failed for %s — stopping sender", self.sid)
+                return
+            finally:
+                self._sending = 0
+            self.send_time = ((1 - _SEND_ALPHA) * self.send_time
+                              + _SEND_ALPHA * (time.perf_counter() - t0))
+            self.sent      += 1
+            self.bytes_out += len(payload)
+
+    def snapshot(self) -> dict:
+        return {
+            "backlog_bytes": self.bytes_in_flight(),
+            "unacked":       len(self._unacked) if self.acks else None,
+            "behind":        self.behind(),
+            "send_ms":       round(self.send_time * 1000, 2),
+            "sent":          self.sent,
+            "replaced":      self.replaced,
+            "skipped":       self.skipped,
+            "bytes_out":     self.bytes_out,
+        }
+
+
+def snapshot() -> dict:
+    sessions = {sid: q.snapshot() for sid, q in _queues.items()}
+    return {
+        "backlog_bytes": sum(s["backlog_bytes"] for s in sessions.values()),
+        "sessions":      sessions,
+    }
+
+
+metrics.register("outbound", snapshot)
@@ -0,0 +1,187 @@
+# backend/reactions/pipeline.py
+"""
+pipeline.py — Optional pipelined frame path for LabConsumer.
+
+In serial mode a session runs decode → find_hands/draw → encode back to back,
+so per-session fps is capped by the SUM of the stage times.  FramePipeline
+runs the three LabSession stages as separate asyncio tasks, each offloading
+its CPU work to a thread (cv2 and MediaPipe release the GIL), so that
+
+    frame N+1 is decoding   while
+    frame N   is in MediaPipe while
+    frame N-1 is encoding.
+
+Stages are connected by single-slot asyncio queues.  The intake slot keeps
+only the newest frame (a stale, not-yet-decoded frame is dropped and counted);
+the inner slots apply backpressure, so frames leave in the order they arrived
+and the simulation in the process stage is always advanced in order.  A
+frame whose stage raises is logged and counted as dropped; the stage goes on
+with the next one.
+
+Enable with LAB_PIPELINED=True.  Trade-off: throughput approaches
+1 / max(stage) instead of 1 / sum(stages), at the cost of roughly one extra
+frame of end-to-end latency.  FrameStats records both so the two modes can be
+compared — see the bench_lab management command.
+
+Cancelling a stage does not stop a thread it has already started, so close()
+also waits for those (_offload()) — the caller closes the LabSession, and
+with it the tracker, only after the last stage call has returned.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class FrameStats:
+    """
+    Rolling fps / latency counters for one session.
+
+    Latency is measured from frame_in() (bytes received) to frame_out()
+    (JPEG handed to the socket), over the last *window* frames.
+    """
+
+    def __init__(self, window: int = 120):
+        self.frames_in  = 0
+        self.frames_out = 0
+        self.dropped    = 0
+        self._latencies = deque(maxlen=window)
+        self._sent_at   = deque(maxlen=window)
+        self._recv_at   = deque(maxlen=window)
+
+    def frame_in(self) -> float:
+        self.frames_in += 1
+        now = time.perf_counter()
+        self._recv_at.append(now)
+        return now
+
+    def frame_dropped(self) -> None:
+        self.dropped += 1
+
+    def frame_out(self, t_in: float) -> None:
+        now = time.perf_counter()
+        self.frames_out += 1
+        self._latencies.append(now - t_in)
+        self._sent_at.append(now)
+
+    @staticmethod
+    def _rate(stamps) -> float:
+        if len(stamps) < 2:
+            return 0.0
+        span = stamps[-1] - stamps[0]
+        return (len(stamps) - 1) / span if span > 0 else 0.0
+
+    def fps(self) -> float:
+        """Frames out per second."""
+        return self._rate(self._sent_at)
+
+    def fps_in(self) -> float:
+        return self._rate(self._recv_at)
+
+    def latency_ms(self, pct: float = 50) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        idx     = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[idx] * 1000
+
+    def summary(self) -> dict:
+        return {
+            "frames_in":      self.frames_in,
+            "frames_out":     self.frames_out,
+            "dropped":        self.dropped,
+            "fps":            round(self.fps(), 1),
+            "latency_p50_ms": round(self.latency_ms(50), 1),
+            "latency_p95_ms": round(self.latency_ms(95), 1),
+        }
+
+
+class FramePipeline:
+    """
+    Three-stage decode / process / encode pipeline over one LabSession.
+
+    *send_frame* and *send_event* are the consumer's coroutines for binary
+    frames and JSON events; the pipeline never touches the socket directly.
+    """
+
+    def __init__(self, session, send_frame, send_event, stats: FrameStats):
+        self._session    = session
+        self._send_frame = send_frame
+        self._send_event = send_event
+        self.stats       = stats
+
+        self._decode_q  = asyncio.Queue(maxsize=1)
+        self._process_q = asyncio.Queue(maxsize=1)
+        self._encode_q  = asyncio.Queue(maxsize=1)
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: set[asyncio.Task] = set()     # stage calls running on a thread
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._run(self._decode_q, self._decode_stage)),
+            asyncio.create_task(self._run(self._process_q, self._process_stage)),
+            asyncio.create_task(self._run(self._encode_q, self._encode_stage)),
+        ]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # A cancelled stage leaves its thread running; wait until it is done
+        # with the session.
+        await asyncio.gather(*self._jobs, return_exceptions=True)
+
+    def submit(self, bytes_data: bytes) -> None:
+        """Offer a received frame; replaces any frame still waiting to decode."""
+        t_in = self.stats.frame_in()
+        if self._decode_q.full():
+            self._decode_q.get_nowait()
+            self.stats.frame_dropped()
+        self._decode_q.put_nowait((t_in, bytes_data))
+
+    # ── Stages ────────────────────────────────────────────────────────────────
+
+    async def _offload(self, fn, *args):
+        """to_thread(fn, *args) that close() can wait for after cancelling a stage."""
+        job = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        return await asyncio.shield(job)
+
+    async def _run(self, queue: asyncio.Queue, stage) -> None:
+        # One frame's failure must not end the stage — the socket would stay
+        # open with no frames coming back.
+        while True:
+            t_in, item = await queue.get()
+            try:
+                await stage(t_in, item)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("[PIPELINE] %s failed — frame dropped", stage.__name__)
+                self.stats.frame_dropped()
+
+    async def _decode_stage(self, t_in: float, data: bytes) -> None:
+        if self._session.shed():
+            self.stats.frame_dropped()
+            return
+        frame = await self._offload(self._session.decode, data)
+        if frame is None:
+            self.stats.frame_dropped()
+            return
+        await self._process_q.put((t_in, frame))
+
+    async def _process_stage(self, t_in: float, frame) -> None:
+        frame, reacted = await self._offload(self._session.process, frame)
+        if reacted:
+            await self._send_event(self._session.reaction_event())
+        await self._encode_q.put((t_in, frame))
+
+    async def _encode_stage(self, t_in: float, frame) -> None:
+        payload = await self._offload(self._session.encode, frame)
+        await self._send_frame(payload)
+        self.stats.frame_out(t_in)
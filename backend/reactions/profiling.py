@@ -0,0 +1,207 @@
+# backend/reactions/profiling.py
+"""
+profiling.py — On-demand profiling of one lab session's next N frames.
+
+LabSession only checks ``self.profile is not None`` per stage, so with no
+capture armed the frame path pays one attribute test — cheap enough to leave
+the switches in production.  A capture is armed in one of two ways:
+
+  • LAB_PROFILE="sample:300" (or "cprofile:300") — every new lab session in
+    the process profiles its first 300 frames.
+  • A staff user watching a lab (ws/lab/watch/<lab id>/, spectate.py) sends
+    {"type": "profile", "mode": "sample", "frames": 300}; that lab is
+    profiled, on whichever process — ASGI or CV worker — runs its LabSession.
+
+Modes
+-----
+cprofile   deterministic; every function call in the profiled stages is
+           counted.  Only one profiler can be active per interpreter, so
+           stages of a cprofile capture run one at a time (pipelined
+           sessions lose their overlap while it lasts).  Saved as a pstats
+           file (.prof).
+sample     statistical; a background thread samples the stacks of threads
+           that are inside a stage every LAB_PROFILE_INTERVAL seconds.
+           Much lower overhead.  Saved as collapsed stacks (.folded), ready
+           for flamegraph.pl / speedscope.
+
+Each capture also writes a .json sidecar (session, mode, frames, wall time,
+stage EWMAs, QoS tier).  A session that closes before its N frames calls
+finish(): the sampler stops and what was collected is written, marked
+"partial".  Files go to LAB_PROFILE_DIR; list and summarise
+them with `manage.py lab_profiles`.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sample")
+
+_CPROFILE_LOCK = threading.Lock()
+
+
+def parse_spec(spec: str) -> dict:
+    """"sample:300" → {"mode": "sample", "frames": 300}; raises ValueError."""
+    mode, _, frames = spec.partition(":")
+    mode = mode.strip() or "sample"
+    if mode not in MODES:
+        raise ValueError(f"unknown profile mode {mode!r}")
+    return {"mode": mode, "frames": int(frames or 300)}
+
+
+def env_spec() -> dict | None:
+    """The LAB_PROFILE capture armed for every new session, if any."""
+    if not settings.LAB_PROFILE:
+        return None
+    try:
+        return parse_spec(settings.LAB_PROFILE)
+    except ValueError as exc:
+        log.warning("[PROFILE] ignoring LAB_PROFILE=%r: %s", settings.LAB_PROFILE, exc)
+        return None
+
+
+class FrameProfile:
+    """One capture over the next *frames* process() calls of a LabSession."""
+
+    def __init__(self, label: str, mode: str = "sample", frames: int = 300):
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode {mode!r}")
+        self.label   = label
+        self.mode    = mode
+        self.frames  = max(1, min(int(frames), settings.LAB_PROFILE_MAX_FRAMES))
+        self.done    = False
+        self.path    = None
+
+        self._seen    = 0
+        self._active  = 0
+        self._lock    = threading.Lock()
+        self._started = time.time()
+        self._t0      = time.perf_counter()
+        self._meta    = {}
+
+        self._profile  = cProfile.Profile() if mode == "cprofile" else None
+        self._threads  = {}            # sample: thread id → stage
+        self._stacks   = Counter()
+        self._samples  = 0
+        self._sampler  = None
+        if mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop,
+                                             name="lab-profiler", daemon=True)
+            self._sampler.start()
+        log.info("[PROFILE] %s: %s over %d frames", label, mode, self.frames)
+
+    # ── Stage hook (called from LabSession) ───────────────────────────────────
+
+    def run(self, stage: str, fn, arg):
+        with self._lock:
+            self._active += 1
+            self._threads[threading.get_ident()] = stage
+        try:
+            if self._profile is not None:
+                with _CPROFILE_LOCK:
+                    return self._profile.runcall(fn, arg)
+            return fn(arg)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._threads.pop(threading.get_ident(), None)
+            self._maybe_write()
+
+    def frame_done(self, meta: dict) -> bool:
+        """Count one processed frame; True once the capture has enough."""
+        self._seen += 1
+        if self._seen < self.frames:
+            return False
+        self._meta = meta
+        self.done  = True
+        self._maybe_write()
+        return True
+
+    def finish(self, meta: dict) -> None:
+        """End the capture early (the session is closing) and write what it has."""
+        if self.done:
+            return
+        self._meta = {**meta, "partial": True}
+        self.done  = True
+        self._maybe_write()
+        log.info("[PROFILE] %s: stopped after %d of %d frames", self.label,
+                 self._seen, self.frames)
+
+    def _maybe_write(self) -> None:
+        # Written once, by whichever thread leaves the last running stage.
+        with self._lock:
+            write = self.done and self._active == 0 and self.path is None
+            if write:
+                self.path = ""
+        if write:
+            self._write()
+
+    # ── Sampler ───────────────────────────────────────────────────────────────
+
+    def _sample_loop(self) -> None:
+        interval = settings.LAB_PROFILE_INTERVAL
+        while not self.done:
+            time.sleep(interval)
+            with self._lock:
+                threads = dict(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for tid, stage in threads.items():
+                frame = frames.get(tid)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(stage)
+                self._stacks[";".join(reversed(stack))] += 1
+                self._samples += 1
+
+    # ── Output ────────────────────────────────────────────────────────────────
+
+    def _write(self) -> None:
+        if self._sampler is not None:
+            self._sampler.join(timeout=1.0)
+        out_dir = settings.LAB_PROFILE_DIR
+        stem = os.path.join(out_dir, "{}-{}-{}".format(
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started)),
+            self.label, self.mode))
+
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            if self._profile is not None:
+                path = f"{stem}.prof"
+                pstats.Stats(self._profile).dump_stats(path)
+            else:
+                path = f"{stem}.folded"
+                with open(path, "w") as f:
+                    for stack, count in self._stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+
+            with open(f"{stem}.json", "w") as f:
+                json.dump({
+                    "label":    self.label,
+                    "mode":     self.mode,
+                    "frames":   self._seen,
+                    "started":  self._started,
+                    "wall_s":   round(time.perf_counter() - self._t0, 3),
+                    "samples":  self._samples if self.mode == "sample" else None,
+                    "data":     os.path.basename(path),
+                    **self._meta,
+                }, f, indent=2)
+        except OSError:
+            log.exception("[PROFILE] %s: could not write profile to %s", self.label, out_dir)
+            return
+        self.path = path
+        log.info("[PROFILE] %s: %d frames → %s", self.label, self._seen, path)
@@ -0,0 +1,148 @@
+# backend/reactions/qos.py
+"""
+qos.py — Per-process load-shedding quality tiers for the render pipeline.
+
+Every session used to get full-fidelity rendering until the whole worker fell
+over.  QosController instead watches each session's CPU load and walks it
+through progressively cheaper tiers while the process is over budget, then
+back up once load drops:
+
+    0  full            everything
+    1  no_landmarks    skip mp_draw.draw_landmarks in HandTracker.find_hands
+    2  no_particles    drop the animated drops and splash of the pour
+    3  half_inference  run MediaPipe on every other frame, reuse landmarks
+    4  low_res         render (and encode) at half the internal resolution
+    5  low_fps         process at most lab_session.LOW_FPS frames per second
+
+A session's load is (EWMA seconds per frame) × (frames processed per second).
+The seconds per frame are WALL time (LabSession.frame_cost(), the sum of the
+three stage EWMAs), used as a stand-in for CPU time: MediaPipe runs its graph
+on its own threads while the calling thread waits, so time.thread_time() of
+a stage would miss the inference that dominates the cost.  Wall time also
+counts GIL waits and thread-pool queueing, so under contention a session's
+load reads high and tiers step down earlier — which is when shedding helps.
+In pipelined mode the stages overlap in time but each still spends its own
+time on every frame, so the sum is still the per-frame cost.  Its share is
+the process budget
+(cores × LAB_CPU_UTILISATION) split evenly across sessions, capped at one
+core because a session's frames are processed in order.  Hysteresis keeps a
+session from flapping: UP_AFTER consecutive over-budget ticks step down one
+tier, DOWN_AFTER consecutive ticks under RECOVER_RATIO × share step back up.
+
+The current tier is pushed to the browser as {"type": "qos", ...} and
+reported in the metrics.
+"""
+
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+
+from . import metrics
+from .admission import usable_cores
+
+log = logging.getLogger(__name__)
+
+TIERS = ("full", "no_landmarks", "no_particles", "half_inference", "low_res", "low_fps")
+
+TIER_NO_LANDMARKS   = 1
+TIER_NO_PARTICLES   = 2
+TIER_HALF_INFERENCE = 3
+TIER_LOW_RES        = 4
+TIER_LOW_FPS        = 5
+
+TICK_EVERY    = 1.0   # seconds between evaluations
+UP_AFTER      = 2     # over-budget ticks before degrading
+DOWN_AFTER    = 5     # comfortably-under ticks before recovering
+RECOVER_RATIO = 0.6
+
+
+class _Tracked:
+
+    __slots__ = ("lab", "on_change", "frames", "over", "under", "load")
+
+    def __init__(self, lab, on_change):
+        self.lab       = lab
+        self.on_change = on_change
+        self.frames    = lab.frame_count
+        self.over      = 0
+        self.under     = 0
+        self.load      = 0.0
+
+
+class QosController:
+
+    def __init__(self, utilisation: float):
+        self.cores       = usable_cores()
+        self.utilisation = utilisation
+        self._sessions: dict[str, _Tracked] = {}
+        self._last_tick = time.monotonic()
+
+    def register(self, sid: str, lab, on_change=None) -> None:
+        """*lab* is a LabSession; *on_change(tier)* is an optional coroutine."""
+        self._sessions[sid] = _Tracked(lab, on_change)
+
+    def unregister(self, sid: str) -> None:
+        self._sessions.pop(sid, None)
+
+    def share(self) -> float:
+        n = max(1, len(self._sessions))
+        return min(1.0, self.cores * self.utilisation / n)
+
+    def tick(self) -> None:
+        """Re-evaluate every session at most once per TICK_EVERY; cheap per frame."""
+        now = time.monotonic()
+        dt  = now - self._last_tick
+        if dt < TICK_EVERY:
+            return
+        self._last_tick = now
+
+        share = self.share()
+        for sid, t in self._sessions.items():
+            frames, t.frames = t.lab.frame_count - t.frames, t.lab.frame_count
+            t.load = t.lab.frame_cost() * frames / dt
+
+            if t.load > share:
+                t.over, t.under = t.over + 1, 0
+            elif t.load < share * RECOVER_RATIO:
+                t.over, t.under = 0, t.under + 1
+            else:
+                t.over = t.under = 0
+
+            tier = t.lab.tier
+            if t.over >= UP_AFTER and tier < len(TIERS) - 1:
+                self._set_tier(sid, t, tier + 1, share)
+            elif t.under >= DOWN_AFTER and tier > 0:
+                self._set_tier(sid, t, tier - 1, share)
+
+    def snapshot(self) -> dict:
+        by_tier = {name: 0 for name in TIERS}
+        for t in self._sessions.values():
+            by_tier[TIERS[t.lab.tier]] += 1
+        return {
+            "share":    round(self.share(), 3),
+            "by_tier":  by_tier,
+            "sessions": {
+                sid: {"tier": TIERS[t.lab.tier], "load": round(t.load, 3),
+                      "idle_ratio": round(t.lab.idle_ratio(), 3)}
+                for sid, t in self._sessions.items()
+            },
+        }
+
+    def _set_tier(self, sid: str, t: _Tracked, tier: int, share: float) -> None:
+        log.info("[QOS] session=%s  %s → %s  load=%.2f share=%.2f",
+                 sid, TIERS[t.lab.tier], TIERS[tier], t.load, share)
+        t.lab.set_tier(tier)
+        t.over = t.under = 0
+        if t.on_change is not None:
+            asyncio.get_running_loop().create_task(t.on_change(tier))
+
+
+def tier_event(tier: int) -> dict:
+    """JSON message telling the browser which quality tier it is on."""
+    return {"type": "qos", "tier": tier, "label": TIERS[tier], "max_tier": len(TIERS) - 1}
+
+
+qos = QosController(utilisation=settings.LAB_CPU_UTILISATION)
+metrics.register("qos", qos.snapshot)
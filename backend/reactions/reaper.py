@@ -0,0 +1,151 @@
+# backend/reactions/reaper.py
+"""
+reaper.py — Release the heavy state of lab sessions that stopped sending frames.
+
+A student whose tab is in the background or whose camera is paused stays
+connected, and their LabSession used to keep its MediaPipe graph and cached
+overlay layers for as long as the socket lived.  Memory grew with connected
+tabs instead of active students.
+
+IdleReaper watches every registered LabSession's last_active stamp from a
+background task (CHECK_EVERY seconds — an idle session sends no frames that
+could drive it).  After LAB_IDLE_RELEASE seconds without a processed frame it
+calls LabSession.release(): the HandTracker goes back to a TrackerPool and
+the overlay layers are dropped.  The simulation itself — tube, paper,
+reaction flag, a few KB — is kept, so nothing the student did is lost.  The
+next frame re-acquires a tracker (from the pool when one is parked there)
+before it is processed.
+
+TrackerPool keeps up to LAB_TRACKER_POOL released trackers per backend, so
+sessions waking up or new connections skip building a MediaPipe graph;
+beyond that, released trackers are closed.  LabSession.close() returns its
+tracker to the pool too.
+
+report() — sessions, idle sessions, releases / wake-ups, RSS freed by
+releases, pooled trackers — is published through metrics.py as "idle".
+LAB_IDLE_RELEASE = 0 turns the reaper off.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from . import metrics
+from .cv_stack import rss_mb
+
+log = logging.getLogger(__name__)
+
+CHECK_EVERY = 5.0      # seconds between sweeps
+
+
+class TrackerPool:
+    """Bounded per-backend pool of HandTrackers no session is using."""
+
+    def __init__(self, size: int):
+        self.size   = size
+        self._free  = {}         # backend name → [HandTracker]
+        self._lock  = threading.Lock()
+        self.reused = 0
+
+    def acquire(self, name: str):
+        """A parked tracker for backend *name*, or None."""
+        with self._lock:
+            free = self._free.get(name)
+            if not free:
+                return None
+            self.reused += 1
+            return free.pop()
+
+    def release(self, tracker) -> None:
+        """Park *tracker* for reuse, or close it when the pool is full."""
+        tracker.reset()
+        with self._lock:
+            free = self._free.setdefault(tracker.backend_name, [])
+            if len(free) < self.size:
+                free.append(tracker)
+                return
+        tracker.close()
+
+    def count(self) -> dict:
+        with self._lock:
+            return {name: len(free) for name, free in self._free.items() if free}
+
+
+class IdleReaper:
+
+    def __init__(self, idle_after: float):
+        self.idle_after = idle_after
+        self._sessions  = {}      # sid → LabSession
+        self._task      = None
+        self.released   = 0
+        self.woken      = 0
+        self.freed_mb   = 0.0
+
+    def enabled(self) -> bool:
+        return self.idle_after > 0
+
+    def register(self, sid: str, lab) -> None:
+        """Watch *lab*; call from the event loop that owns it."""
+        if not self.enabled():
+            return
+        self._sessions[sid] = lab
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unregister(self, sid: str) -> None:
+        self._sessions.pop(sid, None)
+
+    def woke(self) -> None:
+        """Called by LabSession when a released session gets a frame again."""
+        self.woken += 1
+
+    async def _run(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(CHECK_EVERY)
+            try:
+                self.sweep()
+            except Exception:
+                log.exception("[IDLE] sweep failed")
+
+    def sweep(self, now: float | None = None) -> int:
+        """Release every session idle for longer than idle_after; returns how many."""
+        now    = time.monotonic() if now is None else now
+        cutoff = now - self.idle_after
+        idle   = [(sid, lab) for sid, lab in self._sessions.items()
+                  if not lab.released and lab.last_active < cutoff]
+        if not idle:
+            return 0
+        before   = rss_mb()
+        released = 0
+        for sid, lab in idle:
+            if lab.release(idle_before=cutoff):
+                released += 1
+                log.info("[IDLE] released session=%s after %.0fs without frames",
+                         sid, now - lab.last_active)
+        after = rss_mb()
+        self.released += released
+        if before is not None and after is not None:
+            self.freed_mb += max(0.0, before - after)
+        return released
+
+    def report(self) -> dict:
+        labs = list(self._sessions.values())
+        return {
+            "enabled":       self.enabled(),
+            "sessions":      len(labs),
+            "idle":          sum(1 for lab in labs if lab.released),
+            "released":      self.released,
+            "woken":         self.woken,
+            "rss_freed_mb":  round(self.freed_mb, 1),
+            "pooled":        tracker_pool.count(),
+            "pool_reused":   tracker_pool.reused,
+            "rss_mb":        rss_mb(),
+        }
+
+
+tracker_pool = TrackerPool(settings.LAB_TRACKER_POOL)
+reaper       = IdleReaper(settings.LAB_IDLE_RELEASE)
+metrics.register("idle", reaper.report)
@@ -0,0 +1,233 @@
+# backend/reactions/resume.py
+"""
+resume.py — Keep a lab's simulation state across WebSocket reconnects.
+
+A dropped connection (school Wi-Fi) used to cost the student the whole
+experiment: the new connection built a fresh LabSession, so the liquid
+level, the paper's colour and wet spots and the reaction flag were gone.
+
+Now the process that owns a LabSession — the consumer, or the CV worker —
+gives it a SnapshotWriter.  At most every LAB_SNAPSHOT_INTERVAL seconds, and
+only if the scene changed since the last write (LabSession.state_signature()),
+LabSimulation.snapshot() is packed into a small binary record (pack(); a
+few hundred bytes) and stored in the shared cache under the lab's public id,
+expiring after LAB_RESUME_GRACE seconds.  LabSession.close() writes a final
+one after an abnormal disconnect and deletes the record after a normal close
+(1000 / 1001 — the student left); starting or stopping a reaction deletes it
+too (views.py), so a new experiment never picks up the previous one.
+
+On connect LabConsumer fetches the record for its lab id (lab_id_for() is
+derived from the Django session, so the new connection finds it) and the new
+LabSession restores it instead of starting over.  Only a connection that
+dropped — an abnormal close such as 1006 — leaves a record behind; a page
+reload closes with 1001 and starts a fresh experiment; with CV workers the
+record travels to the worker inside lab.open.  The browser is told with a
+{"type": "resumed", ...} message.  No frames are replayed.
+
+LAB_RESUME_GRACE = 0 turns the feature off.
+"""
+
+import asyncio
+import logging
+import struct
+import time
+
+from django.conf import settings
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+RECORD_VERSION = 1
+_PREFIX        = "gestured:lab-resume:"
+
+# version, sim snapshot version, flags, time, width, height,
+# tube: level, colour, display / current angle, sim_time,
+# paper: base colour, current colour (eased, float), target colour,
+# then three length-prefixed strings and the wet spots.
+_HEAD = struct.Struct("<BBBdHHf3Bffd3B3f3BH")
+_SPOT = struct.Struct("<hhfff3B")       # x, y (pixels), radius, max_radius, alpha, colour
+
+_REACTED, _POURING = 1, 2
+
+_stats = {"saved": 0, "skipped": 0, "restored": 0, "bytes": 0}
+
+
+# ── Record format ─────────────────────────────────────────────────────────────
+
+def _str(value) -> bytes:
+    data = (value or "").encode()[:255]
+    return bytes((len(data),)) + data
+
+
+def _byte(value) -> int:
+    return max(0, min(255, int(value)))
+
+
+def pack(snap: dict, chemical_id=None) -> bytes:
+    """LabSimulation.snapshot() (+ the session's chemical id) → compact bytes."""
+    tube, paper = snap["tube"], snap["paper"]
+    flags = (_REACTED if snap["reacted"] else 0) | (_POURING if tube["is_pouring"] else 0)
+    spots = paper["wet_spots"]
+    parts = [
+        _HEAD.pack(
+            RECORD_VERSION, snap["version"], flags, snap["time"], *snap["size"],
+            tube["liquid_level"], *map(_byte, tube["liquid_color"]),
+            tube["display_angle"], tube["current_angle"], tube["sim_time"],
+            *map(_byte, paper["base_color"]), *paper["current_color"],
+            *map(_byte, paper["target_color"]), len(spots),
+        ),
+        _str(chemical_id), _str(snap["chemical_type"]), _str(snap["reaction_type"]),
+    ]
+    parts += [_SPOT.pack(int(s["x"]), int(s["y"]), s["radius"], s["max_radius"], s["alpha"],
+                         *map(_byte, s["color"])) for s in spots]
+    return b"".join(parts)
+
+
+def unpack(data: bytes) -> tuple[dict, str | None]:
+    """Inverse of pack(): (snapshot dict, chemical id); raises ValueError."""
+    try:
+        head = _HEAD.unpack_from(data)
+        if head[0] != RECORD_VERSION:
+            raise ValueError(f"unsupported resume record version {head[0]}")
+        offset  = _HEAD.size
+        strings = []
+        for _ in range(3):
+            n = data[offset]
+            strings.append(data[offset + 1:offset + 1 + n].decode())
+            offset += 1 + n
+        spots = []
+        for _ in range(head[-1]):
+            x, y, radius, max_radius, alpha, *color = _SPOT.unpack_from(data, offset)
+            spots.append({"x": x, "y": y, "radius": radius, "max_radius": max_radius,
+                          "color": color, "alpha": alpha})
+            offset += _SPOT.size
+    except (struct.error, IndexError, UnicodeDecodeError) as exc:
+        raise ValueError(f"corrupt resume record: {exc}") from None
+
+    (_, sim_version, flags, sim_time, width, height,
+     level, c0, c1, c2, display_angle, current_angle, tube_time,
+     b0, b1, b2, k0, k1, k2, t0, t1, t2, _count) = head
+    chemical_id, chemical_type, reaction_type = strings
+    return {
+        "version":       sim_version,
+        "chemical_type": chemical_type,
+        "reaction_type": reaction_type,
+        "reacted":       bool(flags & _REACTED),
+        "time":          sim_time,
+        "size":          [width, height],
+        "tube": {
+            "liquid_level":  level,
+            "liquid_color":  [c0, c1, c2],
+            "display_angle": display_angle,
+            "current_angle": current_angle,
+            "is_pouring":    bool(flags & _POURING),
+            "sim_time":      tube_time,
+        },
+        "paper": {
+            "base_color":    [b0, b1, b2],
+            "current_color": [k0, k1, k2],
+            "target_color":  [t0, t1, t2],
+            "wet_spots":     spots,
+        },
+    }, chemical_id or None
+
+
+# ── Storage ───────────────────────────────────────────────────────────────────
+
+def _key(lab_id: str) -> str:
+    return f"{_PREFIX}{lab_id}"
+
+
+def enabled() -> bool:
+    return settings.LAB_RESUME_GRACE > 0
+
+
+def fetch(lab_id: str) -> bytes | None:
+    """The stored record for *lab_id*, if one is still within the grace window."""
+    if not enabled():
+        return None
+    from django.core.cache import cache
+    try:
+        return cache.get(_key(lab_id))
+    except Exception:
+        log.exception("[RESUME] fetch failed for lab=%s", lab_id)
+        return None
+
+
+async def afetch(lab_id: str) -> bytes | None:
+    return await asyncio.to_thread(fetch, lab_id)
+
+
+def discard(lab_id: str) -> None:
+    """Forget *lab_id*'s record — the experiment ended or was restarted."""
+    from django.core.cache import cache
+    try:
+        cache.delete(_key(lab_id))
+    except Exception:
+        log.exception("[RESUME] discard failed for lab=%s", lab_id)
+
+
+def restore_into(lab, record: bytes, label: str) -> dict | None:
+    """Restore *record* into a fresh LabSession; returns the "resumed" event."""
+    try:
+        snap, chemical_id = unpack(record)
+        lab.restore(snap, chemical_id)
+    except (ValueError, KeyError) as exc:
+        log.warning("[RESUME] %s: discarding snapshot (%s)", label, exc)
+        return None
+    _stats["restored"] += 1
+    log.info("[RESUME] %s: restored chemical=%s reaction=%s reacted=%s level=%.2f",
+             label, chemical_id, snap["reaction_type"], snap["reacted"],
+             snap["tube"]["liquid_level"])
+    return resumed_event(snap, chemical_id)
+
+
+def resumed_event(snap: dict, chemical_id) -> dict:
+    return {
+        "type":          "resumed",
+        "chemical_id":   chemical_id,
+        "reaction_type": snap["reaction_type"],
+        "reacted":       snap["reacted"],
+        "liquid_level":  round(snap["tube"]["liquid_level"], 3),
+    }
+
+
+class SnapshotWriter:
+    """Periodic, change-only snapshot of one LabSession into the cache."""
+
+    def __init__(self, lab_id: str):
+        self.lab_id     = lab_id
+        self._last_at   = 0.0
+        self._last_sig  = None
+
+    def maybe_save(self, lab) -> None:
+        """Cheap per-frame check; writes at most every LAB_SNAPSHOT_INTERVAL s."""
+        now = time.monotonic()
+        if now - self._last_at < settings.LAB_SNAPSHOT_INTERVAL:
+            return
+        self._last_at = now
+        self.save(lab)
+
+    def save(self, lab) -> None:
+        sig = lab.state_signature()
+        if sig == self._last_sig:
+            _stats["skipped"] += 1
+            return
+        record = pack(lab.sim.snapshot(), lab.chemical_id)
+        from django.core.cache import cache
+        try:
+            cache.set(_key(self.lab_id), record, settings.LAB_RESUME_GRACE)
+        except Exception:
+            log.exception("[RESUME] save failed for lab=%s", self.lab_id)
+            return
+        self._last_sig    = sig
+        _stats["saved"]  += 1
+        _stats["bytes"]   = len(record)
+
+
+def report() -> dict:
+    return {"enabled": enabled(), **_stats}
+
+
+metrics.register("resume", report)
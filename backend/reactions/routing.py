@@ -1,8 +1,16 @@
 # backend/reactions/routing.py
 
+from django.conf import settings
 from django.urls import re_path
-from . import consumers
+from . import consumers, spectate, workers
 
 websocket_urlpatterns = [
     re_path(r'^ws/lab/$', consumers.LabConsumer.as_asgi()),
+    re_path(r'^ws/lab/watch/(?P<lab_id>[0-9a-f]{12})/$', spectate.SpectatorConsumer.as_asgi()),
 ]
+
+# Background CV worker channels — served by `manage.py run_cv_workers`.
+channel_routes = {
+    workers.worker_channel_name(i): workers.LabWorkerConsumer.as_asgi()
+    for i in range(settings.LAB_CV_WORKERS)
+}
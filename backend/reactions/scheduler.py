@@ -0,0 +1,215 @@
+# backend/reactions/scheduler.py
+"""
+scheduler.py — Per-process fair-share frame scheduler across lab sessions.
+
+Without it, every LabConsumer processes each frame the moment it arrives, so
+whichever browser sends fastest gets the most CPU and one heavy client can
+starve everyone else sharing the worker.
+
+With LAB_SCHEDULER=True the consumer only *offers* frames:
+
+  • Each session has ONE pending slot; a newer frame replaces an unprocessed
+    older one (counted as dropped) — there is no per-session queue to grow.
+  • A single loop picks the next session by weighted fair queuing: the
+    eligible session with the smallest virtual time goes first, and serving
+    it advances its virtual time by 1 / weight.
+  • A token bucket enforces the process-wide LAB_FPS_BUDGET.
+  • Each session also has an fps cap.  When the budget cannot cover every
+    session at full rate, caps are lowered to the highest entry in
+    LAB_FPS_TIERS that fits the session's fair share, and raised again as
+    sessions leave.  The consumer forwards cap changes to the browser so it
+    can stop uploading frames that would only be dropped.
+  • At most one frame per session is in flight, so simulation state is
+    always advanced in order.
+
+Per-session service rates are published through metrics.py.
+
+Only the inline frame path is scheduled.  Pipelined mode targets a single
+kiosk session, and CV workers already see at most one in-flight frame per
+session, so channel-layer FIFO order gives them round-robin service.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from django.conf import settings
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+RATE_WINDOW = 2.0   # seconds of history used for service / offer rates
+
+
+class _Session:
+
+    __slots__ = ("sid", "callback", "on_cap_change", "weight", "fps_cap",
+                 "pending", "busy", "vtime", "last_served", "served_at",
+                 "offered_at", "dropped")
+
+    def __init__(self, sid, callback, on_cap_change, weight, fps_cap, vtime):
+        self.sid           = sid
+        self.callback      = callback
+        self.on_cap_change = on_cap_change
+        self.weight        = weight
+        self.fps_cap       = fps_cap
+        self.pending       = None
+        self.busy          = False
+        self.vtime         = vtime
+        self.last_served   = 0.0
+        self.served_at     = deque()
+        self.offered_at    = deque()
+        self.dropped       = 0
+
+    def eligible(self, now: float) -> bool:
+        return (self.pending is not None and not self.busy and
+                now - self.last_served >= 1.0 / self.fps_cap)
+
+    def rate(self, stamps: deque, now: float) -> float:
+        while stamps and now - stamps[0] > RATE_WINDOW:
+            stamps.popleft()
+        return len(stamps) / RATE_WINDOW
+
+
+class FrameScheduler:
+
+    def __init__(self, fps_budget: float, tiers, concurrency: int):
+        self.fps_budget  = float(fps_budget)
+        self.tiers       = sorted(tiers, reverse=True)
+        self.concurrency = max(1, concurrency)
+
+        self._sessions: dict[str, _Session] = {}
+        self._wake    = None
+        self._task    = None
+        self._running = 0
+        self._tokens  = 0.0
+        self._refill  = time.monotonic()
+
+    # ── Session API ───────────────────────────────────────────────────────────
+
+    def register(self, sid: str, callback, on_cap_change=None, weight: float = 1.0) -> None:
+        """
+        *callback(item)* is awaited to process one offered item; *on_cap_change(fps)*
+        (optional coroutine) is awaited when the session's fps cap changes.
+        """
+        vtime = min((s.vtime for s in self._sessions.values()), default=0.0)
+        self._sessions[sid] = _Session(sid, callback, on_cap_change, weight,
+                                       self.tiers[0], vtime)
+        self._ensure_running()
+        self._rebalance()
+
+    def unregister(self, sid: str) -> None:
+        if self._sessions.pop(sid, None) is not None:
+            self._rebalance()
+
+    def offer(self, sid: str, item) -> bool:
+        """Replace *sid*'s pending item.  Returns True if an older one was dropped."""
+        sess = self._sessions.get(sid)
+        if sess is None:
+            return False
+        replaced = sess.pending is not None
+        if replaced:
+            sess.dropped += 1
+        sess.pending = item
+        sess.offered_at.append(time.monotonic())
+        self._wake.set()
+        return replaced
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "fps_budget": self.fps_budget,
+            "sessions": {
+                s.sid: {
+                    "weight":      s.weight,
+                    "fps_cap":     s.fps_cap,
+                    "served_fps":  round(s.rate(s.served_at, now), 1),
+                    "offered_fps": round(s.rate(s.offered_at, now), 1),
+                    "dropped":     s.dropped,
+                }
+                for s in self._sessions.values()
+            },
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    def _rebalance(self) -> None:
+        """Lower / raise every session's fps cap to its fair share of the budget."""
+        total_weight = sum(s.weight for s in self._sessions.values()) or 1.0
+        for sess in self._sessions.values():
+            share = self.fps_budget * sess.weight / total_weight
+            cap   = next((t for t in self.tiers if t <= share), self.tiers[-1])
+            if cap != sess.fps_cap:
+                log.info("[SCHED] session=%s fps_cap %s → %s (share=%.1f)",
+                         sess.sid, sess.fps_cap, cap, share)
+                sess.fps_cap = cap
+                if sess.on_cap_change is not None:
+                    asyncio.get_running_loop().create_task(sess.on_cap_change(cap))
+
+    def _take_token(self, now: float) -> float:
+        """Consume one token; return 0, or the seconds to wait for the next."""
+        burst = max(1.0, self.fps_budget / 10)
+        self._tokens  = min(burst, self._tokens + (now - self._refill) * self.fps_budget)
+        self._refill  = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.fps_budget
+
+    def _next_wait(self, now: float) -> float | None:
+        """Seconds until a pending-but-capped session becomes eligible."""
+        waits = [s.last_served + 1.0 / s.fps_cap - now
+                 for s in self._sessions.values() if s.pending is not None and not s.busy]
+        return max(0.0, min(waits)) if waits else None
+
+    async def _loop(self) -> None:
+        while True:
+            now = time.monotonic()
+            ready = [s for s in self._sessions.values() if s.eligible(now)]
+            if not ready or self._running >= self.concurrency:
+                timeout = None if self._running >= self.concurrency else self._next_wait(now)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            wait = self._take_token(now)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            sess = min(ready, key=lambda s: s.vtime)
+            sess.vtime      += 1.0 / sess.weight
+            sess.last_served = now
+            sess.busy        = True
+            item, sess.pending = sess.pending, None
+            self._running += 1
+            asyncio.get_running_loop().create_task(self._serve(sess, item))
+
+    async def _serve(self, sess: _Session, item) -> None:
+        try:
+            await sess.callback(item)
+        except Exception:
+            log.exception("[SCHED] frame callback failed for %s", sess.sid)
+        finally:
+            sess.busy = False
+            sess.served_at.append(time.monotonic())
+            self._running -= 1
+            self._wake.set()
+
+
+scheduler = FrameScheduler(
+    fps_budget  = settings.LAB_FPS_BUDGET,
+    tiers       = settings.LAB_FPS_TIERS,
+    concurrency = settings.LAB_SCHEDULER_CONCURRENCY,
+)
+metrics.register("scheduler", scheduler.snapshot)
@@ -0,0 +1,289 @@
+# backend/reactions/spectate.py
+"""
+spectate.py — Read-only spectator fan-out for projecting a lab to the class.
+
+Without this, every viewer would need its own LabConsumer and with it its
+own hand tracking, drawing and JPEG encode of the same picture.
+
+Instead, the lab owner's consumer is the only producer:
+
+  • Each lab has a public id — a short hash of the owner's session, never the
+    session key itself — and a channel-layer group "lab-watch-<lab id>".
+  • SpectateFanout (owner side) group_send()s the JPEG the owner is already
+    sending to its own browser, so a frame is encoded once however many
+    viewers there are.  Control events (chemical / litmus changes, reaction
+    complete) are fanned out the same way as small JSON messages.
+  • Nothing is sent while nobody watches: the viewer count lives in the
+    shared cache and is re-read at most every VIEWER_REFRESH seconds, in a
+    background task so the owner's frame path never waits on the cache.
+    Frames are also capped at LAB_SPECTATE_FPS.
+  • SpectatorConsumer keeps ONE pending frame per viewer.  Its channel
+    handler only stores the newest frame, and a separate sender task writes
+    it to the socket, so a slow viewer drops frames without stalling the
+    group or the other viewers.
+
+    ws/lab/watch/<lab id>/?token=<watch token>
+
+Watching needs either a staff login or a watch token: the owner's browser is
+told {"type": "lab_id", "lab_id": ..., "watch_token": ...} and shares the
+link.  The token is the lab id signed with SECRET_KEY (watch_token()) and
+expires after LAB_SPECTATE_TOKEN_TTL seconds, so a lab id seen over a
+shoulder — or guessed — is not enough to watch someone's camera.
+
+Staff viewers may also send {"type": "profile", "mode": "sample", "frames":
+300} to profile the lab's next frames (profiling.py).  The request goes to
+the lab's control group (control_group()), which the owner's LabConsumer
+joins; no LabSession is built for the viewer.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.core import signing
+
+from . import metrics
+from .profiling import parse_spec
+
+log = logging.getLogger(__name__)
+
+CLOSE_FORBIDDEN   = 4403
+CLOSE_NO_LAB      = 4404
+CLOSE_LAB_FULL    = 4503
+VIEWER_REFRESH    = 1.0    # seconds between viewer-count reads on the owner side
+
+_GROUP_PREFIX  = "lab-watch-"
+_VIEWERS_KEY   = "gestured:spectators:"
+_TOKEN_SALT    = "gestured.spectate"
+
+_local = {"viewers": 0, "frames_out": 0, "dropped": 0, "fanouts": 0, "refused": 0}
+
+
+def lab_id_for(key: str) -> str:
+    """Public, non-reversible id of the lab owned by session / channel *key*."""
+    return hashlib.sha256(f"{settings.SECRET_KEY}:{key}".encode()).hexdigest()[:12]
+
+
+def group_name(lab_id: str) -> str:
+    return f"{_GROUP_PREFIX}{lab_id}"
+
+
+def control_group(lab_id: str) -> str:
+    """Group of the lab's owner consumer, for staff controls such as profiling."""
+    return f"lab-ctl-{lab_id}"
+
+
+# ── Access ────────────────────────────────────────────────────────────────────
+
+def watch_token(lab_id: str) -> str:
+    """Token the owner shares so others can watch *lab_id*."""
+    return signing.TimestampSigner(salt=_TOKEN_SALT).sign(lab_id)
+
+
+def token_allows(token: str | None, lab_id: str) -> bool:
+    if not token:
+        return False
+    try:
+        signed = signing.TimestampSigner(salt=_TOKEN_SALT).unsign(
+            token, max_age=settings.LAB_SPECTATE_TOKEN_TTL)
+    except signing.BadSignature:        # includes SignatureExpired
+        return False
+    return signed == lab_id
+
+
+async def _is_staff(scope) -> bool:
+    user = scope.get("user")
+    return user is not None and await database_sync_to_async(
+        lambda: user.is_authenticated and user.is_staff)()
+
+
+async def _may_watch(scope, lab_id: str, staff: bool) -> bool:
+    """Staff may watch any lab; everyone else needs the owner's token."""
+    if staff:
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return token_allows((query.get("token") or [None])[0], lab_id)
+
+
+# ── Viewer count (shared cache) ───────────────────────────────────────────────
+
+def _viewers_key(lab_id: str) -> str:
+    return f"{_VIEWERS_KEY}{lab_id}"
+
+
+async def viewer_count(lab_id: str) -> int:
+    from django.core.cache import cache
+    return max(0, await cache.aget(_viewers_key(lab_id)) or 0)
+
+
+async def _viewer_delta(lab_id: str, delta: int) -> int:
+    from django.core.cache import cache
+    key = _viewers_key(lab_id)
+    await cache.aadd(key, 0, 3600)
+    try:
+        return await cache.aincr(key, delta)
+    except ValueError:          # expired between add() and incr()
+        await cache.aset(key, max(0, delta), 3600)
+        return max(0, delta)
+
+
+# ── Owner side ────────────────────────────────────────────────────────────────
+
+class SpectateFanout:
+    """Publishes one lab's frames and events to its spectator group."""
+
+    def __init__(self, channel_layer, lab_id: str):
+        self.channel_layer = channel_layer
+        self.lab_id        = lab_id
+        self.group         = group_name(lab_id)
+        self.viewers       = 0
+        self._checked      = 0.0
+        self._last_frame   = 0.0
+        self._interval     = 1.0 / settings.LAB_SPECTATE_FPS
+        self._counting     = None    # asyncio.Task re-reading the viewer count
+
+    def _refresh(self, now: float) -> None:
+        # Frames go out against the last known count; a fresh one arrives
+        # from the background task.
+        if now - self._checked >= VIEWER_REFRESH and (
+                self._counting is None or self._counting.done()):
+            self._checked  = now
+            self._counting = asyncio.get_running_loop().create_task(self._count())
+
+    async def _count(self) -> None:
+        try:
+            self.viewers = await viewer_count(self.lab_id)
+        except Exception:
+            log.exception("[WATCH] viewer count failed for lab=%s", self.lab_id)
+
+    async def frame(self, payload: bytes) -> None:
+        now = time.monotonic()
+        self._refresh(now)
+        if not self.viewers or now - self._last_frame < self._interval:
+            return
+        self._last_frame = now
+        _local["fanouts"] += 1
+        await self.channel_layer.group_send(self.group, {
+            "type": "spectate.frame", "frame": payload,
+        })
+
+    async def event(self, event: dict) -> None:
+        self._refresh(time.monotonic())
+        if self.viewers:
+            await self.channel_layer.group_send(self.group, {
+                "type": "spectate.event", "event": event,
+            })
+
+    async def close(self) -> None:
+        if self._counting is not None:
+            self._counting.cancel()
+        await self.event({"type": "lab_closed"})
+
+
+# ── Viewer side ───────────────────────────────────────────────────────────────
+
+class SpectatorConsumer(AsyncWebsocketConsumer):
+    """Read-only viewer of one lab.  Only staff "profile" requests are read."""
+
+    async def connect(self):
+        self.lab_id = self.scope["url_route"]["kwargs"].get("lab_id")
+        self.joined = False
+        if not self.lab_id:
+            await self.close(code=CLOSE_NO_LAB)
+            return
+        self.staff = await _is_staff(self.scope)
+        if not await _may_watch(self.scope, self.lab_id, self.staff):
+            _local["refused"] += 1
+            log.warning("[WATCH] refused viewer for lab=%s (no staff login or valid token)",
+                        self.lab_id)
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
+
+        if await _viewer_delta(self.lab_id, 1) > settings.LAB_SPECTATORS_MAX:
+            await _viewer_delta(self.lab_id, -1)
+            log.warning("[WATCH] lab=%s full (%d viewers)", self.lab_id,
+                        settings.LAB_SPECTATORS_MAX)
+            await self.close(code=CLOSE_LAB_FULL)
+            return
+        self.joined = True
+        _local["viewers"] += 1
+
+        self._latest  = None
+        self._wake    = asyncio.Event()
+        self._dropped = 0
+        await self.channel_layer.group_add(group_name(self.lab_id), self.channel_name)
+        await self.accept()
+        self._sender = asyncio.get_running_loop().create_task(self._send_loop())
+        await self.send(text_data=json.dumps({"type": "watching", "lab_id": self.lab_id}))
+        log.info("[WATCH] viewer joined lab=%s", self.lab_id)
+
+    async def disconnect(self, close_code):
+        if not getattr(self, "joined", False):
+            return
+        self.joined = False
+        _local["viewers"] -= 1
+        await _viewer_delta(self.lab_id, -1)
+        self._sender.cancel()
+        await self.channel_layer.group_discard(group_name(self.lab_id), self.channel_name)
+        log.info("[WATCH] viewer left lab=%s  dropped=%d", self.lab_id, self._dropped)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        if text_data is None or not self.staff:
+            return
+        try:
+            msg = json.loads(text_data)
+        except (json.JSONDecodeError, ValueError):
+            return
+        if isinstance(msg, dict) and msg.get("type") == "profile":
+            await self._request_profile(msg)
+
+    async def _request_profile(self, msg: dict) -> None:
+        # {"type": "profile", "mode": "sample"|"cprofile", "frames": 300}
+        try:
+            spec = parse_spec(f"{msg.get('mode') or 'sample'}:{int(msg.get('frames') or 300)}")
+        except (TypeError, ValueError) as exc:
+            log.warning("[PROFILE] bad request %r: %s", msg, exc)
+            return
+        await self.channel_layer.group_send(control_group(self.lab_id),
+                                            {"type": "lab.profile", **spec})
+        await self.send(text_data=json.dumps({"type": "profile_requested",
+                                              "lab_id": self.lab_id, **spec}))
+        log.info("[PROFILE] %s over %d frames requested for lab=%s",
+                 spec["mode"], spec["frames"], self.lab_id)
+
+    # ── Channel-layer handlers ────────────────────────────────────────────────
+
+    async def spectate_frame(self, message):
+        if self._latest is not None:
+            self._dropped += 1
+            _local["dropped"] += 1
+        self._latest = message["frame"]
+        self._wake.set()
+
+    async def spectate_event(self, message):
+        await self.send(text_data=json.dumps(message["event"]))
+
+    # ── Sender ────────────────────────────────────────────────────────────────
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                frame, self._latest = self._latest, None
+                if frame is not None:
+                    await self.send(bytes_data=frame)
+                    _local["frames_out"] += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            log.exception("[WATCH] sender failed for lab=%s", self.lab_id)
+
+
+metrics.register("spectate", lambda: dict(_local))
@@ -34,7 +34,10 @@ ownership, start/stop, and polling status.
 import logging
 import time
 
+from .telemetry import HotLog
+
 log = logging.getLogger(__name__)
+hot = HotLog(log)
 
 # ── Canonical chemical catalogue ──────────────────────────────────────────────
 # Single source of truth for both views.py and consumers.py.
@@ -112,7 +115,7 @@ class _StateProxy:
     def __setitem__(self, key: str, value) -> None:
         from django.core.cache import cache
         cache.set(self._k(key), value, self._TTL)
-        log.debug("[STATE] set %s = %r", key, value)
+        hot.debug("STATE", key=key, value=value)
 
     def get_all(self) -> dict:
         """Return a snapshot of all known keys (useful for debugging)."""
@@ -0,0 +1,139 @@
+# backend/reactions/telemetry.py
+"""
+telemetry.py — Cheap hot-path logging and a per-session flight recorder.
+
+Per-frame log lines used to be a measurable share of frame time: every call
+built its message and went through the handler chain, with the lab loggers
+forced to DEBUG in production.
+
+HotLog wraps a logger for code that runs per frame:
+
+  • nothing is formatted unless the level is enabled — fields are kept as a
+    dict and only rendered ("[POUR] frame=120 angle=31.0") when a handler
+    actually emits the record;
+  • each event name is rate-limited by a token bucket (HOT_LOG_RATE per
+    second, bursts of HOT_LOG_BURST); suppressed calls are counted and
+    reported on the next line that gets through ("suppressed=37").
+
+FlightRecorder keeps the last LAB_FLIGHT_FRAMES frames of telemetry per
+session in a ring buffer — one tuple append per frame, no logging — and
+writes them out as a single WARNING only when something goes wrong: a slow
+frame, a decode failure, an abnormal disconnect.  Dumps are rate-limited per
+session, so a session stuck slow does not flood the log either.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+HOT_LOG_RATE  = 1.0      # events per second per event name
+HOT_LOG_BURST = 5
+DUMP_INTERVAL = 30.0     # seconds between flight-recorder dumps of one session
+
+# WebSocket close codes for a tab closed / navigated away; any other
+# disconnect dumps the session's flight recorder.
+NORMAL_CLOSE_CODES = (1000, 1001)
+
+
+class _Fields:
+    """Log message rendered only when a handler formats the record."""
+
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name, fields):
+        self.name   = name
+        self.fields = fields
+
+    def __str__(self):
+        return f"[{self.name}] " + " ".join(f"{k}={_fmt(v)}" for k, v in self.fields.items())
+
+
+def _fmt(value):
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+class HotLog:
+    """Rate-limited, lazily formatted structured logging for the frame path."""
+
+    def __init__(self, logger: logging.Logger, rate: float = HOT_LOG_RATE,
+                 burst: int = HOT_LOG_BURST):
+        self.logger   = logger
+        self.rate     = rate
+        self.burst    = burst
+        self._buckets = {}     # name → [tokens, last refill, suppressed]
+
+    def _allow(self, name: str) -> int | None:
+        """Suppressed count since the last emitted *name*, or None to drop."""
+        now    = time.monotonic()
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = [float(self.burst), now, 0]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            bucket[2] += 1
+            return None
+        bucket[0] -= 1.0
+        suppressed, bucket[2] = bucket[2], 0
+        return suppressed
+
+    def event(self, level: int, name: str, **fields) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        suppressed = self._allow(name)
+        if suppressed is None:
+            return
+        if suppressed:
+            fields["suppressed"] = suppressed
+        self.logger.log(level, _Fields(name, fields))
+
+    def debug(self, name: str, **fields) -> None:
+        self.event(logging.DEBUG, name, **fields)
+
+    def info(self, name: str, **fields) -> None:
+        self.event(logging.INFO, name, **fields)
+
+    def warning(self, name: str, **fields) -> None:
+        self.event(logging.WARNING, name, **fields)
+
+
+class FlightRecorder:
+    """Ring buffer of the last *size* frames' telemetry for one session."""
+
+    COLUMNS = ("frame", "t", "decode_ms", "process_ms", "encode_ms",
+               "tier", "angle", "level", "pouring")
+
+    def __init__(self, label: str, size: int = 120):
+        self.label      = label
+        self.frames     = deque(maxlen=size)
+        self.dumps      = 0
+        self._last_dump = float("-inf")
+        self._lock      = threading.Lock()
+
+    def record(self, *row) -> None:
+        """One row per frame, in COLUMNS order.  deque.append is atomic."""
+        self.frames.append(row)
+
+    def dump(self, reason: str, force: bool = False) -> bool:
+        """
+        Log the buffered frames as one WARNING.  At most one dump per
+        DUMP_INTERVAL unless *force*; returns True if something was written.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self.frames or (not force and now - self._last_dump < DUMP_INTERVAL):
+                return False
+            self._last_dump = now
+            self.dumps     += 1
+            rows = list(self.frames)
+        t_end = rows[-1][1]
+        lines = [" ".join(f"{c:>10}" for c in self.COLUMNS)]
+        for row in rows:
+            row = (row[0], t_end - row[1]) + row[2:]
+            lines.append(" ".join(f"{_fmt(v):>10}" for v in row))
+        log.warning("[FLIGHT] %s: %s — last %d frames (t = seconds before the last)\n%s",
+                    self.label, reason, len(rows), "\n".join(lines))
+        return True
@@ -10,4 +10,5 @@ urlpatterns = [
     path("chemicals/",    views.chemicals_view,        name="chemicals"),
     path("set-chemical/", views.set_chemical_view,     name="set_chemical"),
     path("status/",       views.status_view,           name="status"),
+    path("metrics/",      views.metrics_view,          name="metrics"),
 ]
\ No newline at end of file
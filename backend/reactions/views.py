@@ -2,12 +2,15 @@
 
 import time
 
-from rest_framework.decorators import api_view
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from . import stream_state
+from . import metrics, resume, stream_state
 from .stream_state import state, CHEMICALS, set_chemical, set_reaction, reset_session
 from .opencv_handler import start_lab, stop_lab
+from .spectate import lab_id_for
 
 LAB_BUSY_MSG = "The lab is currently in use by another student."
 
@@ -46,6 +49,7 @@ def start_reaction_view(request):
     state["running"]                = True
     state["owner"]                  = requester
     state["last_heartbeat"]         = time.time()
+    resume.discard(lab_id_for(requester))   # a new experiment starts from scratch
 
     start_lab()
 
@@ -61,6 +65,7 @@ def stop_reaction_view(request):
 
     stop_lab()
     reset_session()   # clears all keys to their defaults in cache
+    resume.discard(lab_id_for(requester))
 
     return Response({"message": "Reaction stopped."})
 
@@ -157,4 +162,16 @@ def status_view(request):
         "complete":      state.get("reaction_complete_flag", False),
         "chemical":      chemical_meta,
         "reaction_type": state.get("reaction_type"),
-    })
\ No newline at end of file
+    })
+
+
+@api_view(['GET'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """
+    Per-worker lab metrics (scheduler service rates, …) collected from the
+    snapshots each ASGI / CV worker process publishes to the shared cache.
+    Staff only: it lists every session on every worker.
+    """
+    return Response({"workers": metrics.collect()})
@@ -0,0 +1,221 @@
+# backend/reactions/workers.py
+"""
+workers.py — Dedicated CV worker processes fed through the channel layer.
+
+With LAB_CV_WORKERS = N > 0 the ASGI process that owns the WebSocket no
+longer runs any vision code.  LabConsumer forwards frames and control
+messages to one of N background channels ("lab-cv-0" … "lab-cv-{N-1}"),
+each served by a `runworker` process running LabWorkerConsumer, and relays
+the rendered JPEG back to the browser.
+
+Routing is sticky: a session always hashes to the same worker channel, so the
+worker can keep that student's LabSession (MediaPipe graph, tube, paper) in
+memory.  With the Redis channel layer the worker processes may live on other
+nodes; launch them with `python manage.py run_cv_workers`.
+
+Message protocol (all on the channel layer)
+-------------------------------------------
+ASGI → worker channel:
+    {"type": "lab.open",    "session": <reply channel>, "chemical_id", "chemical_type", "reaction_type",
+                            "render_size", "tracker", "resume": <resume.py record> | None, "lab_id", "shm": <FrameRing name> | None, "shm_slots": int}
+    {"type": "lab.control", "session": ..., "op": "set_chemical"|"set_reaction"|"set_render_size"
+                            |"set_tracker"|"set_hud"|"update_hud"|"start_profile", "value": ...}
+    {"type": "lab.frame",   "session": ..., "frame": <jpeg bytes>}       (fallback)
+    {"type": "lab.frame",   "session": ..., "slot": int, "seq": int}     (shared memory)
+    {"type": "lab.close",   "session": ..., "code": <WebSocket close code>}
+worker → ASGI reply channel:
+    {"type": "lab.result",    "frame": <jpeg bytes> | None, "event": dict | None,
+                              "hud": dict | None}     hud_snapshot() in "json" HUD mode
+                              (event lab.reopen also carries the unread "slot")
+    {"type": "lab.transport", "shm": False}    worker could not attach the ring
+    {"type": "lab.qos",       "tier": int}     QoS tier changed (qos.py)
+
+When both processes share a host, decoded frames travel through a FrameRing
+(frame_transport.py) and only slot indices cross the channel layer.
+
+At most one frame per session is in flight; LabConsumer keeps only the newest
+frame while it waits, so the worker channel never fills up.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from typing import TYPE_CHECKING
+
+from channels.consumer import AsyncConsumer
+from django.conf import settings
+
+from . import cv_stack, metrics, resume
+from .profiling import env_spec
+from .qos import qos
+from .reaper import reaper
+from .telemetry import NORMAL_CLOSE_CODES
+
+if TYPE_CHECKING:       # both pull in the CV stack, which cv_stack loads lazily
+    from .frame_transport import FrameRing
+    from .lab_session import LabSession
+
+log = logging.getLogger(__name__)
+
+SESSION_IDLE_TIMEOUT = 60   # seconds — drop sessions whose socket vanished silently
+
+
+def worker_channel_name(index: int) -> str:
+    return f"{settings.LAB_CV_CHANNEL_PREFIX}{index}"
+
+
+def worker_channel_for(key: str) -> str:
+    """Sticky mapping from a session key to one of the worker channels."""
+    index = zlib.crc32(key.encode()) % settings.LAB_CV_WORKERS
+    return worker_channel_name(index)
+
+
+class LabWorkerConsumer(AsyncConsumer):
+    """
+    Runs LabSession instances for every session routed to this worker channel.
+
+    One instance serves the whole channel; messages are dispatched one at a
+    time, and the CPU work runs on a thread so the channel-layer connection
+    stays responsive while a frame is being processed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sessions: dict[str, "LabSession"] = {}
+        self.last_seen: dict[str, float]       = {}
+        self.rings: dict[str, "FrameRing"]     = {}
+
+    async def lab_open(self, message):
+        sid = message["session"]
+        self._drop(sid)
+        lab_session = await cv_stack.aload()
+        self.sessions[sid] = lab_session.LabSession(
+            chemical_id   = message.get("chemical_id"),
+            chemical_type = message.get("chemical_type") or "neutral",
+            reaction_type = message.get("reaction_type") or "red_litmus",
+            render_size   = message.get("render_size"),
+            tracker       = message.get("tracker"),
+        )
+        self.sessions[sid].recorder.label = f"lab {message.get('lab_id') or sid}"
+        if message.get("resume"):
+            resume.restore_into(self.sessions[sid], message["resume"],
+                                f"lab {message.get('lab_id') or sid}")
+        if message.get("lab_id") and resume.enabled():
+            self.sessions[sid].resume = resume.SnapshotWriter(message["lab_id"])
+        spec = env_spec()
+        if spec:
+            self.sessions[sid].start_profile({**spec, "label": message.get("lab_id") or "lab"})
+        self.last_seen[sid] = time.monotonic()
+        qos.register(sid, self.sessions[sid], on_change=lambda tier: self.channel_layer.send(
+            sid, {"type": "lab.qos", "tier": tier}))
+        reaper.register(sid, self.sessions[sid])
+
+        if message.get("shm"):
+            try:
+                frame_transport = cv_stack.load("reactions.frame_transport")
+                self.rings[sid] = frame_transport.FrameRing.attach(message["shm"], message["shm_slots"])
+            except (OSError, RuntimeError) as exc:
+                log.info("[WORKER] shm attach failed for %s (%s) — using bytes", sid, exc)
+                await self.channel_layer.send(sid, {"type": "lab.transport", "shm": False})
+
+        log.info("[WORKER] open session=%s  active=%d  shm=%s",
+                 sid, len(self.sessions), sid in self.rings)
+
+    async def lab_control(self, message):
+        lab = self.sessions.get(message["session"])
+        if lab is None:
+            return
+        op = message.get("op")
+        if op == "set_chemical":
+            lab.defer(lab.set_chemical, message["value"])
+        elif op == "set_reaction":
+            lab.defer(lab.set_reaction, message["value"])
+        elif op == "set_render_size":
+            lab.defer(lab.set_render_size, message["value"])
+        elif op == "set_tracker":
+            lab.defer(lab.set_tracker, message["value"])
+        elif op == "set_hud":
+            lab.defer(lab.set_hud, message["value"])
+        elif op == "update_hud":
+            lab.update_hud(message["value"])
+        elif op == "start_profile":
+            lab.defer(lab.start_profile, message["value"])
+        else:
+            log.debug("[WORKER] Unknown control op: %r", op)
+
+    async def lab_frame(self, message):
+        sid = message["session"]
+        lab = self.sessions.get(sid)
+        if lab is None:
+            # Worker restarted or session expired — tell the consumer to reopen
+            # and hand back the ring slot we will never read.
+            await self.channel_layer.send(sid, {"type": "lab.result", "frame": None,
+                                                "event": {"type": "lab.reopen"},
+                                                "slot": message.get("slot")})
+            return
+
+        self.last_seen[sid] = time.monotonic()
+        qos.tick()
+        metrics.maybe_publish()
+        try:
+            if "slot" in message:
+                ring = self.rings.get(sid)
+                if ring is None:
+                    payload, event = None, None
+                else:
+                    payload, event = await asyncio.to_thread(
+                        self._run_shared_frame, lab, ring, message["slot"])
+            else:
+                payload, event = await asyncio.to_thread(lab.run_frame, message["frame"])
+        except Exception:
+            # Still reply: the consumer waits for this frame before sending the next.
+            log.exception("[WORKER] frame failed for session=%s", sid)
+            payload, event = None, None
+        await self.channel_layer.send(sid, {
+            "type": "lab.result", "frame": payload, "event": event,
+            "hud":  lab.hud_snapshot() if lab.hud_mode == "json" else None,
+        })
+        self._expire_idle()
+
+    async def lab_close(self, message):
+        lab      = self.sessions.get(message["session"])
+        abnormal = message.get("code") not in NORMAL_CLOSE_CODES
+        if lab is not None and abnormal:
+            lab.recorder.dump(f"disconnect code={message.get('code')}", force=True)
+        self._drop(message["session"], keep_snapshot=abnormal)
+        log.info("[WORKER] close session=%s  active=%d",
+                 message["session"], len(self.sessions))
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _run_shared_frame(lab: "LabSession", ring: "FrameRing", slot: int):
+        try:
+            if lab.shed():
+                return None, None
+            frame, reacted = lab.process(ring.view(slot))
+            return lab.encode(frame), (lab.reaction_event() if reacted else None)
+        finally:
+            # Drawing happened in place on the shared slot; the JPEG is our
+            # own copy, so the slot can go back to the producer now.
+            ring.release(slot)
+
+    def _drop(self, sid: str, keep_snapshot: bool = True) -> None:
+        # Expired sessions keep their resume record: the consumer reopens
+        # them from it on the next frame (lab.reopen).
+        lab = self.sessions.pop(sid, None)
+        self.last_seen.pop(sid, None)
+        qos.unregister(sid)
+        reaper.unregister(sid)
+        ring = self.rings.pop(sid, None)
+        if ring is not None:
+            ring.close()
+        if lab is not None:
+            lab.close(keep_snapshot=keep_snapshot)
+
+    def _expire_idle(self) -> None:
+        cutoff = time.monotonic() - SESSION_IDLE_TIMEOUT
+        for sid in [s for s, t in self.last_seen.items() if t < cutoff]:
+            log.info("[WORKER] expiring idle session=%s", sid)
+            self._drop(sid)
@@ -4,6 +4,7 @@ import { BrowserRouter, Routes, Route, Navigate } from 'react-router-dom';
 import Auth from './components/Auth';
 import Dashboard from './components/Dashboard';
 import Lab from './components/Lab';
+import Spectate from './components/Spectate';
 import './index.css';
 
 export default function App() {
@@ -13,6 +14,7 @@ export default function App() {
         <Route path="/" element={<Auth />} />
         <Route path="/dashboard" element={<Dashboard />} />
         <Route path="/lab" element={<Lab />} />
+        <Route path="/watch/:labId" element={<Spectate />} />
         {/* Catch-all: redirect unknown routes to login */}
         <Route path="*" element={<Navigate to="/" replace />} />
       </Routes>
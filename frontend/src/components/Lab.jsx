@@ -109,6 +109,7 @@ function getWsUrl() {
 
 const FRAME_W = 640;
 const FRAME_H = 480;
+const HUD_MODES = ['off', 'frame', 'json'];
 
 // ── Styles ────────────────────────────────────────────────────────────────────
 const s = {
@@ -134,6 +135,8 @@ const s = {
   wDot:          (c) => ({ width: '10px', height: '10px', borderRadius: '50%', background: c, opacity: 0.7 }),
   wTitle:        { marginLeft: 'auto', fontSize: '0.62rem', fontFamily: 'var(--mono)', color: 'var(--text-muted)', letterSpacing: '0.12em', textTransform: 'uppercase' },
   canvas:        { display: 'block', width: '100%', minHeight: '280px', background: '#000' },
+  hudBtn:        (on) => ({ marginLeft: '0.8rem', background: 'none', border: `1px solid ${on ? 'var(--accent-green)' : 'var(--border)'}`, color: on ? 'var(--accent-green)' : 'var(--text-muted)', padding: '0.1rem 0.5rem', borderRadius: '3px', fontSize: '0.6rem', fontFamily: 'var(--mono)', letterSpacing: '0.1em', textTransform: 'uppercase', cursor: 'pointer' }),
+  hudPanel:      { margin: 0, padding: '0.55rem 1rem', borderTop: '1px solid var(--border)', fontSize: '0.68rem', fontFamily: 'var(--mono)', color: 'var(--accent-green)', whiteSpace: 'pre-wrap' },
 
   // Reaction hint panel — shown as soon as a chemical is selected
   hintPanel:     (color) => ({
@@ -199,6 +202,13 @@ export default function Lab() {
   const [revealData,   setRevealData]   = useState(null);
   const [reactionType, setReactionType] = useState(null);
   const [wsStatus,     setWsStatus]     = useState('connecting');
+  const [queuePos,     setQueuePos]     = useState(null);
+  const [labId,        setLabId]        = useState(null);   // spectators watch /watch/<labId>?token=<watchToken>
+  const [watchToken,   setWatchToken]   = useState(null);
+  const [hudMode,      setHudMode]      = useState('off');  // performance HUD: off | frame | json
+  const [hudData,      setHudData]      = useState(null);
+  const [resumed,      setResumed]      = useState(null);   // server kept our experiment
+  const [qos,          setQos]          = useState(null);   // server's rendering tier (qos.py) when degraded
 
   // Keep refs in sync with state.
   useEffect(() => { reactionTypeRef.current = reactionType; }, [reactionType]);
@@ -217,6 +227,14 @@ export default function Lab() {
     }
   }, []);
 
+  // Performance HUD — drawn into the frame by the server, or sent as JSON.
+  const cycleHud = () => {
+    const next = HUD_MODES[(HUD_MODES.indexOf(hudMode) + 1) % HUD_MODES.length];
+    setHudMode(next);
+    setHudData(null);
+    wsSend({ type: 'set_hud', mode: next });
+  };
+
   // ── Camera + WebSocket pipeline ─────────────────────────────────────────────
   const startPipeline = useCallback(async () => {
     try {
@@ -238,6 +256,7 @@ export default function Lab() {
       const ws      = new WebSocket(getWsUrl());
       ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
+      let framesIn  = 0;   // acked to the server, which paces output on it (outbound.py)
 
       function sendFrame() {
         if (!wsReady.current || ws.readyState !== WebSocket.OPEN || sendingRef.current) return;
@@ -256,6 +275,9 @@ export default function Lab() {
       ws.onopen = () => {
         wsReady.current = true;
         setWsStatus('live');
+        setHudMode('off');   // a new connection starts without the HUD
+        setHudData(null);
+        setQos(null);
 
         // Push current reaction type and chemical into the consumer immediately.
         const rt = reactionTypeRef.current;
@@ -276,11 +298,33 @@ export default function Lab() {
               const chemical = msg.chemical || activeChemRef.current;
               const rt       = msg.reaction_type || reactionTypeRef.current;
               setRevealData(buildRevealMessage(chemical, rt));
+            } else if (msg.type === 'lab_id') {
+              setLabId(msg.lab_id);
+              setWatchToken(msg.watch_token);
+            } else if (msg.type === 'resumed') {
+              setResumed(msg);
+            } else if (msg.type === 'hud') {
+              setHudData(msg);
+            } else if (msg.type === 'queued') {
+              setQueuePos(msg.position);
+              setWsStatus('queued');
+            } else if (msg.type === 'qos') {
+              // Server is shedding load for this session — show which tier.
+              setQos(msg.tier > 0 ? msg : null);
+            } else if (msg.type === 'admitted') {
+              setQueuePos(null);
+              setWsStatus('live');
+            } else if (msg.type === 'fps_cap' && msg.fps > 0) {
+              // Server scheduler lowered/raised our share — don't upload frames it would drop.
+              clearInterval(frameTimerRef.current);
+              frameTimerRef.current = setInterval(sendFrame, Math.max(66, Math.round(1000 / msg.fps)));
             }
           } catch { /* not JSON */ }
           return;
         }
         // ── Binary: processed video frame ───────────────────────────────────
+        framesIn += 1;
+        ws.send(JSON.stringify({ type: 'ack', frames: framesIn }));
         createImageBitmap(new Blob([evt.data], { type: 'image/jpeg' })).then((bitmap) => {
           const canvas = canvasRef.current;
           if (canvas) {
@@ -291,7 +335,10 @@ export default function Lab() {
       };
 
       ws.onerror = () => setWsStatus('error');
-      ws.onclose = () => { wsReady.current = false; setWsStatus('error'); };
+      ws.onclose = (evt) => {
+        wsReady.current = false;
+        setWsStatus(evt.code === 4503 ? 'full' : 'error');
+      };
 
     } catch (err) {
       console.error('Camera / WebSocket error:', err);
@@ -327,6 +374,16 @@ export default function Lab() {
     wsSend({ type: 'set_reaction', reaction_type: reactionType });
   }, [reactionType, wsSend]);
 
+  // Reconnected within the grace window: the server restored the tube and
+  // paper, so reflect its chemical / litmus choice (once chemicals are loaded).
+  useEffect(() => {
+    if (!resumed) return;
+    const chem = chemicals.find((c) => c.id === resumed.chemical_id);
+    if (chem) { setActiveId(chem.id); setActiveChem(chem); }
+    if (resumed.reaction_type) setReactionType(resumed.reaction_type);
+    if (resumed.reacted && chem) setRevealData(buildRevealMessage(chem, resumed.reaction_type));
+  }, [resumed, chemicals]);
+
   // ── Polling fallback (safety net if WS push message is lost) ────────────────
   useEffect(() => {
     pollRef.current = setInterval(async () => {
@@ -392,10 +449,12 @@ export default function Lab() {
 
   // ── Render ──────────────────────────────────────────────────────────────────
   const statusColor = wsStatus === 'live'  ? 'var(--accent-green)'
-                    : wsStatus === 'error' ? '#f87171'
+                    : wsStatus === 'error' || wsStatus === 'full' ? '#f87171'
                     : '#fbbf24';
-  const statusLabel = wsStatus === 'live'  ? 'Live Stream'
-                    : wsStatus === 'error' ? 'Connection Error'
+  const statusLabel = wsStatus === 'live'   ? 'Live Stream'
+                    : wsStatus === 'error'  ? 'Connection Error'
+                    : wsStatus === 'full'   ? 'Lab Server Full — Try Again Shortly'
+                    : wsStatus === 'queued' ? `Waiting for a Free Slot (#${queuePos})`
                     : 'Connecting…';
 
   return (
@@ -440,9 +499,21 @@ export default function Lab() {
           <span style={s.wDot('#4ade80')} />
           <span style={s.wTitle}>
             {activeId ? `// loaded: ${activeId}` : '// webcam feed — select a substance'}
+            {labId && watchToken && `  ·  watch: /watch/${labId}?token=${encodeURIComponent(watchToken)}`}
+            {qos && `  ·  reduced quality: ${qos.label.replace('_', ' ')} (${qos.tier}/${qos.max_tier})`}
           </span>
+          <button style={s.hudBtn(hudMode !== 'off')} onClick={cycleHud} title="Performance HUD">
+            hud: {hudMode}
+          </button>
         </div>
         <canvas ref={canvasRef} width={FRAME_W} height={FRAME_H} style={s.canvas} />
+        {hudMode === 'json' && hudData && (
+          <pre style={s.hudPanel}>
+            {Object.entries(hudData.stage_ms || {}).map(([k, v]) => `${k} ${v}ms`).join('  ·  ')}
+            {`\nfps in ${hudData.fps_in}  out ${hudData.fps_out}  ·  dropped ${hudData.dropped}  skipped ${hudData.skipped}`}
+            {`  ·  infer skip ${Math.round((hudData.infer_skip || 0) * 100)}%  ·  jpeg ${hudData.jpeg_kb} KB  ·  tier ${hudData.tier}`}
+          </pre>
+        )}
       </div>
 
       {/* ── Reaction hint panel ──────────────────────────────────────────────
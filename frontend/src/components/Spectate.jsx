@@ -0,0 +1,116 @@
+// frontend/src/components/Spectate.jsx
+// Read-only view of a student's lab for projecting to the class.
+// Frames arrive already rendered and encoded by the owner's session
+// (backend/reactions/spectate.py) — this page never touches the camera.
+// The link needs the owner's watch token (?token=…) unless the viewer is staff.
+
+import { useState, useEffect, useRef } from 'react';
+import { useNavigate, useParams, useSearchParams } from 'react-router-dom';
+
+function getWatchUrl(labId, token) {
+  const proto = window.location.protocol === 'https:' ? 'wss' : 'ws';
+  const host  = import.meta.env.VITE_WS_HOST || window.location.host;
+  const query = token ? `?token=${encodeURIComponent(token)}` : '';
+  return `${proto}://${host}/ws/lab/watch/${labId}/${query}`;
+}
+
+const FRAME_W = 640;
+const FRAME_H = 480;
+
+const s = {
+  page:      { minHeight: '100vh', display: 'flex', flexDirection: 'column', alignItems: 'center', padding: '1.5rem', gap: '1rem', paddingTop: '2rem' },
+  topBar:    { display: 'flex', alignItems: 'center', justifyContent: 'space-between', width: '100%', maxWidth: '1100px' },
+  backBtn:   { background: 'none', border: '1px solid var(--border)', color: 'var(--text-muted)', padding: '0.45rem 1.1rem', borderRadius: '3px', fontSize: '0.72rem', fontFamily: 'var(--mono)', letterSpacing: '0.1em', textTransform: 'uppercase', cursor: 'pointer' },
+  statusRow: { display: 'flex', alignItems: 'center', gap: '0.5rem', fontSize: '0.7rem', fontFamily: 'var(--mono)', letterSpacing: '0.1em', textTransform: 'uppercase' },
+  liveDot:   { width: '7px', height: '7px', borderRadius: '50%', animation: 'pulse 1.5s ease-in-out infinite' },
+  card:      { width: '100%', maxWidth: '1100px', background: 'var(--surface)', border: '1px solid var(--border)', borderRadius: '6px', overflow: 'hidden', boxShadow: 'var(--glow-blue)' },
+  caption:   { padding: '0.55rem 1rem', borderBottom: '1px solid var(--border)', fontSize: '0.7rem', fontFamily: 'var(--mono)', color: 'var(--text-muted)', letterSpacing: '0.1em' },
+  canvas:    { display: 'block', width: '100%', background: '#000' },
+  banner:    { width: '100%', maxWidth: '1100px', padding: '0.8rem 1.2rem', border: '1px solid #4ade8055', borderRadius: '6px', color: 'var(--accent-green)', fontFamily: 'var(--sans)', fontWeight: 700 },
+};
+
+export default function Spectate() {
+  const navigate  = useNavigate();
+  const { labId } = useParams();
+  const [params]  = useSearchParams();
+  const token     = params.get('token');
+  const canvasRef = useRef(null);
+
+  const [status,   setStatus]   = useState('connecting');
+  const [chemical, setChemical] = useState(null);
+  const [litmus,   setLitmus]   = useState(null);
+  const [reacted,  setReacted]  = useState(null);
+
+  useEffect(() => {
+    const ws = new WebSocket(getWatchUrl(labId, token));
+    ws.binaryType = 'arraybuffer';
+    let drawing = false;
+
+    ws.onmessage = (evt) => {
+      if (typeof evt.data === 'string') {
+        try {
+          const msg = JSON.parse(evt.data);
+          if (msg.type === 'watching')               setStatus('live');
+          else if (msg.type === 'set_chemical')      { setChemical(msg.chemical); setReacted(null); }
+          else if (msg.type === 'set_reaction')      { setLitmus(msg.reaction_type); setReacted(null); }
+          else if (msg.type === 'reaction_complete') setReacted(msg);
+          else if (msg.type === 'lab_closed')        setStatus('ended');
+        } catch { /* not JSON */ }
+        return;
+      }
+      // Skip a frame while the previous one is still being decoded.
+      if (drawing) return;
+      drawing = true;
+      createImageBitmap(new Blob([evt.data], { type: 'image/jpeg' })).then((bitmap) => {
+        const canvas = canvasRef.current;
+        if (canvas) canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+        bitmap.close();
+      }).finally(() => { drawing = false; });
+    };
+    ws.onclose = (evt) => setStatus(evt.code === 4403 ? 'denied'
+                                  : evt.code === 4404 ? 'nolab'
+                                  : evt.code === 4503 ? 'full' : 'ended');
+    ws.onerror = () => setStatus('error');
+
+    return () => ws.close();
+  }, [labId, token]);
+
+  const statusColor = status === 'live' ? 'var(--accent-green)'
+                    : status === 'connecting' ? '#fbbf24'
+                    : '#f87171';
+  const statusLabel = status === 'live'  ? 'Watching Live'
+                    : status === 'nolab' ? 'No Lab Running'
+                    : status === 'full'  ? 'Too Many Viewers'
+                    : status === 'denied' ? 'Link Expired or Invalid'
+                    : status === 'ended' ? 'Lab Ended'
+                    : status === 'error' ? 'Connection Error'
+                    : 'Connecting…';
+
+  return (
+    <div style={s.page}>
+      <div style={s.topBar}>
+        <button style={s.backBtn} onClick={() => navigate('/dashboard')}>← Back</button>
+        <div style={{ ...s.statusRow, color: statusColor }}>
+          <span style={{ ...s.liveDot, background: statusColor }} />
+          {statusLabel}
+        </div>
+      </div>
+
+      <div style={s.card}>
+        <div style={s.caption}>
+          {'// spectator view'}
+          {chemical && `  ·  ${chemical.label} (${chemical.formula})`}
+          {litmus && `  ·  ${litmus === 'red_litmus' ? 'Red' : 'Blue'} litmus`}
+        </div>
+        <canvas ref={canvasRef} width={FRAME_W} height={FRAME_H} style={s.canvas} />
+      </div>
+
+      {reacted && (
+        <div style={s.banner}>
+          Reaction complete — {reacted.chemical?.label ?? 'substance'} on{' '}
+          {reacted.reaction_type === 'red_litmus' ? 'red' : 'blue'} litmus
+        </div>
+      )}
+    </div>
+  );
+}